@@ -0,0 +1,85 @@
+# apps/analytics/management/commands/partitions.py
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from metro.partitioning import add_months, archive_months, compact, ensure_partitions, month_start, partitioned_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the coming months' partitions of the usage record and transaction tables, "
+        "and archive months older than the retention period to gzipped CSV files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help="Months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.PARTITION_RETAIN_MONTHS,
+            help="Months to keep in the database, the current one included; 0 keeps everything",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.PARTITION_ARCHIVE_DIR,
+            help="Persistent directory the archived months are written to (default: PARTITION_ARCHIVE_DIR)",
+        )
+        parser.add_argument(
+            "--detach-only",
+            action="store_true",
+            help="Detach old partitions but leave them in the database instead of archiving them",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show which months would be archived without changing anything",
+        )
+
+    def handle(self, *args, **options):
+        retain = options["retain_months"]
+        before = add_months(month_start(timezone.now()), 1 - retain) if retain > 0 else None
+
+        if not options["dry_run"]:
+            for model in partitioned_models():
+                for month in ensure_partitions(model, options["ahead"]):
+                    self.stdout.write(f"{model._meta.db_table}: created partition for {month:%Y-%m}")
+        if before is None:
+            self.stdout.write(self.style.SUCCESS("Retention disabled, nothing archived"))
+            return
+
+        archived = 0
+        for model in partitioned_models():
+            table = model._meta.db_table
+            try:
+                months = archive_months(
+                    model,
+                    before,
+                    archive_dir=options["archive_dir"],
+                    detach_only=options["detach_only"],
+                    dry_run=options["dry_run"],
+                )
+            except ImproperlyConfigured as e:
+                raise CommandError(f"{str(e)}, or use --detach-only or --retain-months 0")
+            for month, path in months:
+                if options["dry_run"]:
+                    self.stdout.write(f"{table}: would archive {month:%Y-%m}")
+                elif path is None:
+                    self.stdout.write(f"{table}: detached {month:%Y-%m}")
+                else:
+                    self.stdout.write(f"{table}: archived {month:%Y-%m} to {path}")
+            archived += len(months)
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{archived} months to archive"))
+            return
+        if archived:
+            compact()
+        self.stdout.write(self.style.SUCCESS(f"{archived} months archived"))
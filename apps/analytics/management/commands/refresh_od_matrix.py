@@ -0,0 +1,23 @@
+# apps/analytics/management/commands/refresh_od_matrix.py
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.od_matrix import ODMatrixService
+
+
+class Command(BaseCommand):
+    help = "Add trips completed since the last refresh to the origin-destination matrices"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the matrices and rebuild them from every completed trip",
+        )
+
+    def handle(self, *args, **options):
+        result = ODMatrixService.refresh(rebuild=options["rebuild"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {result['trips']} trips to {len(result['days'])} days, "
+            f"through {result['through'].isoformat()}"
+        ))
@@ -0,0 +1,22 @@
+# Partition the usage record tables by month on PostgreSQL; a no-op elsewhere
+
+from django.db import migrations
+
+from metro.partitioning import partition_table
+
+
+def partition_usage_records(apps, schema_editor):
+    partition_table(schema_editor, "analytics_ticketusagerecord", "timestamp")
+    partition_table(schema_editor, "analytics_subscriptionusagerecord", "timestamp")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0002_ticketusagerecord_usage_type_and_more"),
+    ]
+
+    operations = [
+        # A partitioned table works as a plain one for Django, so there is nothing to undo
+        migrations.RunPython(partition_usage_records, migrations.RunPython.noop),
+    ]
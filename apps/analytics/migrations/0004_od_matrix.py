@@ -0,0 +1,52 @@
+# Generated by Django 4.2.18 on 2026-10-19 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0003_partition_usage_records"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ODMatrix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("stations", models.JSONField(default=list)),
+                ("counts", models.BinaryField()),
+                ("revenue", models.BinaryField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "OD Matrix",
+                "verbose_name_plural": "OD Matrices",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ODMatrixState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("through", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# TicketUsageRecord's unique (ticket, station, usage_type) cannot be enforced on the
+# table partitioned by timestamp, and 0003 already left it out on PostgreSQL.
+# Drop it everywhere so the schema matches the model, and index the lookup
+# record_ticket_usage dedupes with instead.
+
+from django.db import migrations, models
+
+from metro.partitioning import is_partitioned
+
+UNIQUE_FIELDS = ("ticket", "station", "usage_type")
+
+
+def drop_unique(apps, schema_editor):
+    model = apps.get_model("analytics", "TicketUsageRecord")
+    if not is_partitioned(model._meta.db_table, schema_editor.connection):
+        schema_editor.alter_unique_together(model, [UNIQUE_FIELDS], [])
+
+
+def restore_unique(apps, schema_editor):
+    model = apps.get_model("analytics", "TicketUsageRecord")
+    if not is_partitioned(model._meta.db_table, schema_editor.connection):
+        schema_editor.alter_unique_together(model, [], [UNIQUE_FIELDS])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0004_od_matrix"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(drop_unique, restore_unique)],
+            state_operations=[
+                migrations.AlterUniqueTogether(name="ticketusagerecord", unique_together=set()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="ticketusagerecord",
+            index=models.Index(fields=["ticket", "station", "usage_type"], name="ticketusage_event_idx"),
+        ),
+    ]
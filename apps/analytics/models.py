@@ -52,8 +52,12 @@ def __str__(self):
         return f"Ticket {self.ticket.id} {self.usage_type.lower()} at {self.station.name} on {self.timestamp}"
 
     class Meta:
-        # Ensure we don't record the same entry/exit event twice
-        unique_together = ('ticket', 'station', 'usage_type')
+        # No unique (ticket, station, usage_type): PostgreSQL cannot enforce it on a
+        # table partitioned by timestamp. services.record_ticket_usage locks the
+        # ticket row to keep from recording the same entry/exit event twice.
+        indexes = [
+            models.Index(fields=['ticket', 'station', 'usage_type'], name='ticketusage_event_idx'),
+        ]
 
 
 class SubscriptionUsageRecord(models.Model):
@@ -85,3 +89,34 @@ class Meta:
 
     def __str__(self):
         return f"Daily Analytics for {self.date}"
+
+
+class ODMatrix(models.Model):
+    """
+    Origin-destination trip counts and revenue for one day, by entry hour
+
+    The matrices are dense arrays of shape (24, stations, stations), stored
+    zlib-compressed; ``stations`` holds the station ids in index order. See
+    apps/analytics/od_matrix.py.
+    """
+    date = models.DateField(unique=True)
+    stations = models.JSONField(default=list)
+    counts = models.BinaryField()  # int32 trips
+    revenue = models.BinaryField()  # int64 piastres
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "OD Matrix"
+        verbose_name_plural = "OD Matrices"
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"OD matrix for {self.date}"
+
+
+class ODMatrixState(models.Model):
+    """Single row: trips that exited before ``through`` are in the OD matrices"""
+    through = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"OD matrices through {self.through}"
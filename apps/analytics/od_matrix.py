@@ -0,0 +1,330 @@
+# apps/analytics/od_matrix.py
+"""
+Origin-destination (OD) matrices of completed ticket trips.
+
+For every day there is an ODMatrix row holding two dense arrays of shape
+(24, stations, stations): the number of trips and their revenue, indexed by
+entry hour, entry station and exit station. Day and hour are local time of
+entry. Slicing a period, an hour band or a station is then array arithmetic
+instead of a GROUP BY over the ticket table.
+
+``ODMatrixService.refresh`` keeps the matrices up to date incrementally. It
+only reads the trips that exited since the previous refresh and adds them to
+the days they started on. ODMatrixState records how far the last refresh got,
+and its row lock keeps two refreshes from adding the same trips twice. A
+refresh is queued (at most once a minute) when a ticket exits, and
+``manage.py refresh_od_matrix`` runs one by hand or rebuilds from scratch.
+
+Flows through an interchange come from the stored routes (the Route table
+filled by populate_routes): the trips of every OD pair whose route passes
+through, or changes line at, the station.
+"""
+import logging
+import zlib
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from apps.routes.models import Route
+from apps.stations.models import Station
+from apps.tickets.models import Ticket
+
+from .models import ODMatrix, ODMatrixState
+
+logger = logging.getLogger(__name__)
+
+HOURS = 24
+# Trips newer than this are left to the next refresh, so rows from
+# transactions still open when a refresh starts are not skipped
+LAG = timedelta(seconds=30)
+REFRESH_DEBOUNCE = 60  # Seconds between queued refreshes
+CHUNK_SIZE = 5000
+
+
+def _pack(array):
+    return zlib.compress(array.tobytes(), 1)
+
+
+def _unpack(data, dtype, size):
+    return np.frombuffer(zlib.decompress(bytes(data)), dtype=dtype).reshape(HOURS, size, size)
+
+
+def _positions(index, station_ids):
+    """Matrix positions of station ids, -1 for stations no longer in the index"""
+    ids = np.array(station_ids, dtype=np.int64)
+    known = ids < len(index)
+    return np.where(known, index[np.where(known, ids, 0)], -1)
+
+
+def _align(array, from_ids, to_ids):
+    """Reindex a (24, n, n) array from one station order to another"""
+    if list(from_ids) == list(to_ids):
+        return array
+    position = {station_id: index for index, station_id in enumerate(to_ids)}
+    keep = [index for index, station_id in enumerate(from_ids) if station_id in position]
+    target = [position[from_ids[index]] for index in keep]
+    aligned = np.zeros((HOURS, len(to_ids), len(to_ids)), dtype=array.dtype)
+    aligned[np.ix_(range(HOURS), target, target)] = array[np.ix_(range(HOURS), keep, keep)]
+    return aligned
+
+
+class ODMatrixService:
+    """Builds the OD matrices and serves slices of them"""
+
+    @staticmethod
+    def station_ids():
+        return list(Station.objects.order_by('id').values_list('id', flat=True))
+
+    @staticmethod
+    def load(row, station_ids):
+        """Counts and revenue arrays of a stored day, in ``station_ids`` order"""
+        size = len(row.stations)
+        counts = _unpack(row.counts, np.int32, size)
+        revenue = _unpack(row.revenue, np.int64, size)
+        return _align(counts, row.stations, station_ids), _align(revenue, row.stations, station_ids)
+
+    @staticmethod
+    def schedule_refresh():
+        """Queue a refresh unless one was queued within the last minute"""
+        from .tasks import refresh_od_matrix
+
+        if cache.add('od_matrix:refresh_queued', True, REFRESH_DEBOUNCE):
+            refresh_od_matrix.delay()
+
+    @classmethod
+    def refresh(cls, rebuild=False, until=None):
+        """
+        Add the trips that exited since the last refresh to the matrices
+
+        With ``rebuild`` the matrices are dropped and rebuilt from every
+        completed trip.
+
+        Returns:
+            dict: trips added, days updated and the new ``through`` mark
+        """
+        until = until or timezone.now() - LAG
+        station_ids = cls.station_ids()
+        index = np.full((max(station_ids) + 1) if station_ids else 1, -1, dtype=np.int64)
+        index[station_ids] = np.arange(len(station_ids))
+        size = len(station_ids)
+
+        with transaction.atomic():
+            state, _ = ODMatrixState.objects.select_for_update().get_or_create(pk=1)
+            if rebuild:
+                ODMatrix.objects.all().delete()
+                state.through = None
+
+            trips = Ticket.objects.filter(
+                exit_time__lt=until,
+                entry_time__isnull=False,
+                entry_station__isnull=False,
+                exit_station__isnull=False,
+            )
+            if state.through:
+                trips = trips.filter(exit_time__gte=state.through)
+            rows = trips.annotate(
+                day=TruncDate('entry_time'), hour=ExtractHour('entry_time')
+            ).order_by('entry_time').values_list('day', 'hour', 'entry_station_id', 'exit_station_id', 'price')
+
+            added = 0
+            days = []
+            day = counts = revenue = None
+
+            def flush():
+                if day is None:
+                    return
+                row = ODMatrix.objects.filter(date=day).first()
+                if row is not None:
+                    stored_counts, stored_revenue = cls.load(row, station_ids)
+                    np.add(counts, stored_counts, out=counts)
+                    np.add(revenue, stored_revenue, out=revenue)
+                else:
+                    row = ODMatrix(date=day)
+                row.stations = station_ids
+                row.counts = _pack(counts)
+                row.revenue = _pack(revenue)
+                row.save()
+                days.append(day)
+
+            iterator = rows.iterator(chunk_size=CHUNK_SIZE)
+            for chunk in iter(lambda: list(islice(iterator, CHUNK_SIZE)), []):
+                chunk_days = np.array([trip[0].toordinal() for trip in chunk])
+                hours = np.array([trip[1] for trip in chunk], dtype=np.int64)
+                origins = _positions(index, [trip[2] for trip in chunk])
+                destinations = _positions(index, [trip[3] for trip in chunk])
+                prices = np.rint(np.array([float(trip[4]) for trip in chunk]) * 100).astype(np.int64)
+                known = (origins >= 0) & (destinations >= 0)
+                cells = (hours * size + origins) * size + destinations
+
+                # Rows come ordered by entry time, so each day is one contiguous run
+                boundaries = np.flatnonzero(np.diff(chunk_days)) + 1
+                for run in np.split(np.arange(len(chunk)), boundaries):
+                    run_day = chunk[run[0]][0]
+                    if run_day != day:
+                        flush()
+                        day = run_day
+                        counts = np.zeros((HOURS, size, size), dtype=np.int32)
+                        revenue = np.zeros((HOURS, size, size), dtype=np.int64)
+                    run = run[known[run]]
+                    counts += np.bincount(cells[run], minlength=counts.size).astype(np.int32).reshape(counts.shape)
+                    revenue += np.bincount(cells[run], weights=prices[run], minlength=revenue.size).astype(
+                        np.int64
+                    ).reshape(revenue.shape)
+                    added += len(run)
+            flush()
+
+            state.through = until
+            state.save()
+
+        logger.info(f"OD matrices: added {added} trips to {len(days)} days, through {until.isoformat()}")
+        return {'trips': added, 'days': days, 'through': until}
+
+    @classmethod
+    def matrix(cls, start_date, end_date, hours=None):
+        """
+        Summed matrices for the days from ``start_date`` to ``end_date``
+        inclusive, optionally only for some entry hours
+
+        Returns:
+            tuple: (station ids, counts, revenue in piastres, trips by hour);
+            counts and revenue are (stations, stations) arrays
+        """
+        station_ids = cls.station_ids()
+        size = len(station_ids)
+        counts = np.zeros((HOURS, size, size), dtype=np.int64)
+        revenue = np.zeros((HOURS, size, size), dtype=np.int64)
+        for row in ODMatrix.objects.filter(date__gte=start_date, date__lte=end_date).iterator():
+            day_counts, day_revenue = cls.load(row, station_ids)
+            counts += day_counts
+            revenue += day_revenue
+        if hours is not None:
+            mask = np.zeros(HOURS, dtype=bool)
+            mask[list(hours)] = True
+            counts[~mask] = 0
+            revenue[~mask] = 0
+        return station_ids, counts.sum(axis=0), revenue.sum(axis=0), counts.sum(axis=(1, 2))
+
+    @staticmethod
+    def top_pairs(station_ids, counts, revenue, limit=20):
+        """The busiest OD pairs, trips between different stations only"""
+        counts = counts.copy()
+        np.fill_diagonal(counts, 0)
+        flat = counts.ravel()
+        limit = min(limit, int(np.count_nonzero(flat)))
+        if limit < 1:
+            return []
+        best = np.argpartition(flat, -limit)[-limit:]
+        best = best[np.argsort(flat[best], kind='stable')[::-1]]
+        names = dict(Station.objects.filter(id__in=station_ids).values_list('id', 'name'))
+        pairs = []
+        for cell in best:
+            origin, destination = divmod(int(cell), len(station_ids))
+            pairs.append({
+                'entry_station_id': station_ids[origin],
+                'entry_station__name': names.get(station_ids[origin]),
+                'exit_station_id': station_ids[destination],
+                'exit_station__name': names.get(station_ids[destination]),
+                'count': int(flat[cell]),
+                'revenue': round(int(revenue.ravel()[cell]) / 100, 2),
+            })
+        return pairs
+
+    @staticmethod
+    def built_through():
+        """Exit time up to which trips are in the matrices, None before the first refresh"""
+        return ODMatrixState.objects.filter(pk=1).values_list('through', flat=True).first()
+
+    @staticmethod
+    def popular_routes_from_tickets(start_date, end_date, limit=20):
+        """``popular_routes`` grouped from the ticket table, for periods the matrices don't cover"""
+        pairs = Ticket.objects.filter(
+            entry_time__date__gte=start_date,
+            entry_time__date__lte=end_date,
+            entry_station__isnull=False,
+            exit_station__isnull=False,
+            exit_time__isnull=False,
+        ).exclude(entry_station=F('exit_station')).values(
+            'entry_station_id', 'entry_station__name', 'exit_station_id', 'exit_station__name'
+        ).annotate(
+            count=Count('id'), revenue=Sum('price', default=0)
+        ).order_by('-count')[:limit]
+        return [{**pair, 'revenue': round(float(pair['revenue']), 2)} for pair in pairs]
+
+    @classmethod
+    def popular_routes(cls, start_date, end_date, limit=20):
+        """
+        The busiest OD pairs of the period
+
+        Until a refresh has reached the period (right after deploy, or while
+        refreshes are not running) the ticket table is grouped instead.
+        """
+        through = cls.built_through()
+        if through is None or timezone.localdate(through) < start_date:
+            return cls.popular_routes_from_tickets(start_date, end_date, limit)
+        station_ids, counts, revenue, _ = cls.matrix(start_date, end_date)
+        return cls.top_pairs(station_ids, counts, revenue, limit)
+
+    @staticmethod
+    def route_masks(station, station_ids):
+        """
+        OD pairs whose stored route passes through ``station`` (boolean
+        (stations, stations) array), those that change line there, and
+        the pairs that have a stored route at all
+        """
+        position = {station_id: index for index, station_id in enumerate(station_ids)}
+        size = len(station_ids)
+        through = np.zeros((size, size), dtype=bool)
+        transfer = np.zeros((size, size), dtype=bool)
+        routed = np.zeros((size, size), dtype=bool)
+        routes = Route.objects.filter(is_active=True).values_list(
+            'start_station_id', 'end_station_id', 'path', 'interchanges'
+        )
+        for start_id, end_id, path, interchanges in routes.iterator():
+            if start_id not in position or end_id not in position:
+                continue
+            cell = position[start_id], position[end_id]
+            routed[cell] = True
+            stops = [stop.get('station') for stop in path or [] if isinstance(stop, dict)]
+            if station.name in stops[1:-1]:
+                through[cell] = True
+            if any(isinstance(change, dict) and change.get('station') == station.name
+                   for change in interchanges or []):
+                transfer[cell] = True
+        return through, transfer, routed
+
+    @classmethod
+    def interchange_flows(cls, station, start_date, end_date, hours=None, limit=20):
+        """Trips routed through ``station`` in the period, from the OD matrix and the route table"""
+        station_ids, counts, revenue, _ = cls.matrix(start_date, end_date, hours)
+        through, transfer, routed = cls.route_masks(station, station_ids)
+        np.fill_diagonal(routed, True)  # Same-station trips need no route
+        return {
+            'station': {'id': station.id, 'name': station.name},
+            'trips_through': int(counts[through].sum()),
+            'transfers': int(counts[transfer].sum()),
+            'revenue_through': round(int(revenue[through].sum()) / 100, 2),
+            'trips_without_route': int(counts[~routed].sum()),
+            'top_pairs': cls.top_pairs(station_ids, np.where(through, counts, 0), revenue, limit),
+        }
+
+    @classmethod
+    def summary(cls, start_date, end_date, hours=None, limit=20, full=False):
+        """Totals and top pairs for the API; ``full`` adds the whole matrices"""
+        station_ids, counts, revenue, by_hour = cls.matrix(start_date, end_date, hours)
+        data = {
+            'total_trips': int(counts.sum()),
+            'total_revenue': round(int(revenue.sum()) / 100, 2),
+            'trips_by_hour': by_hour.tolist(),
+            'top_pairs': cls.top_pairs(station_ids, counts, revenue, limit),
+        }
+        if full:
+            data['stations'] = station_ids
+            data['counts'] = counts.tolist()
+            data['revenue'] = (revenue / 100).round(2).tolist()
+        return data
@@ -4,6 +4,7 @@
 from django.utils import timezone
 from django.http import HttpResponse
 from .models import StationAnalytics, LineAnalytics, TicketUsageRecord, SubscriptionUsageRecord
+from .services import date_range_q
 
 
 def generate_station_revenue_report(start_date=None, end_date=None):
@@ -14,7 +15,7 @@ def generate_station_revenue_report(start_date=None, end_date=None):
         end_date = timezone.now().date()
 
     # Get data
-    stations = StationAnalytics.objects.all().select_related('station')
+    stations = StationAnalytics.objects.all().select_related('station').prefetch_related('station__lines')
 
     # Create CSV
     buffer = io.StringIO()
@@ -103,8 +104,7 @@ def generate_daily_usage_report(start_date=None, end_date=None):
 
     # Fetch ticket usage data
     ticket_usages = TicketUsageRecord.objects.filter(
-        timestamp__date__gte=start_date,
-        timestamp__date__lte=end_date
+        date_range_q('timestamp', start_date, end_date)
     ).select_related('station', 'line', 'ticket')
 
     # Create CSV
@@ -131,8 +131,7 @@ def generate_daily_usage_report(start_date=None, end_date=None):
 
     # Fetch subscription usage data
     subscription_usages = SubscriptionUsageRecord.objects.filter(
-        timestamp__date__gte=start_date,
-        timestamp__date__lte=end_date
+        date_range_q('timestamp', start_date, end_date)
     ).select_related('station', 'line', 'subscription')
 
     # Write subscription usage data
@@ -1,3 +1,4 @@
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 import logging
 from django.db import transaction
@@ -20,7 +21,9 @@ def record_ticket_usage(ticket_id, station_id, usage_type='ENTRY'):
         usage_type: 'ENTRY' or 'EXIT'
     """
     with transaction.atomic():
-        ticket = Ticket.objects.get(id=ticket_id)
+        # The row lock serializes concurrent (and retried) calls for a ticket, as the
+        # partitioned table has no unique constraint to catch a duplicate
+        ticket = Ticket.objects.select_for_update().get(id=ticket_id)
         station = Station.objects.get(id=station_id)
 
         # Check if we've already recorded this ticket's usage to avoid duplicates
@@ -159,28 +162,45 @@ def record_subscription_usage(subscription_id, station_id):
         return usage_record
 
 
+def date_range_q(field, start_date=None, end_date=None):
+    """
+    Filter ``field`` (a DateTimeField) to the local days from ``start_date``
+    to ``end_date`` inclusive, either bound optional
+
+    Uses a half-open range [start 00:00, day after end 00:00) on the column
+    itself rather than ``__date`` lookups, so indexes on the column (and
+    monthly partition pruning) apply.
+    """
+    q = Q()
+    if start_date:
+        q &= Q(**{f'{field}__gte': _day_start(start_date)})
+    if end_date:
+        q &= Q(**{f'{field}__lt': _day_start(end_date, days=1)})
+    return q
+
+
+def _day_start(value, days=0):
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return timezone.make_aware(datetime.combine(value + timedelta(days=days), time.min))
+
+
 def get_station_analytics(station_id, start_date=None, end_date=None):
     """Get detailed analytics for a specific station with optional date filtering"""
     station = Station.objects.get(id=station_id)
 
     # Base queries
-    ticket_query = TicketUsageRecord.objects.filter(station=station)
-    subscription_query = SubscriptionUsageRecord.objects.filter(station=station)
-
-    # Apply date filtering if provided
-    if start_date:
-        ticket_query = ticket_query.filter(timestamp__date__gte=start_date)
-        subscription_query = subscription_query.filter(timestamp__date__gte=start_date)
-
-    if end_date:
-        ticket_query = ticket_query.filter(timestamp__date__lte=end_date)
-        subscription_query = subscription_query.filter(timestamp__date__lte=end_date)
+    period = date_range_q('timestamp', start_date, end_date)
+    ticket_query = TicketUsageRecord.objects.filter(period, station=station)
+    subscription_query = SubscriptionUsageRecord.objects.filter(period, station=station)
 
     # Calculate metrics
-    ticket_revenue = ticket_query.aggregate(total=Sum('revenue_amount'))['total'] or 0
-    subscription_revenue = subscription_query.aggregate(total=Sum('revenue_amount'))['total'] or 0
-    tickets_count = ticket_query.count()
-    subscription_uses = subscription_query.count()
+    ticket_totals = ticket_query.aggregate(revenue=Sum('revenue_amount'), count=Count('id'))
+    subscription_totals = subscription_query.aggregate(revenue=Sum('revenue_amount'), count=Count('id'))
+    ticket_revenue = ticket_totals['revenue'] or 0
+    subscription_revenue = subscription_totals['revenue'] or 0
+    tickets_count = ticket_totals['count']
+    subscription_uses = subscription_totals['count']
 
     # Get hourly distribution for peak analysis
     hourly_distribution = (
@@ -201,50 +221,47 @@ def get_station_analytics(station_id, start_date=None, end_date=None):
     }
 
 
+def _totals_by_station(query):
+    """{station id: (revenue, count)} in one grouped query"""
+    rows = query.order_by().values('station_id').annotate(revenue=Sum('revenue_amount'), count=Count('id'))
+    return {row['station_id']: (row['revenue'] or 0, row['count']) for row in rows}
+
+
 def get_line_analytics(line_id, start_date=None, end_date=None):
-    """Get detailed analytics for a specific line with optional date filtering"""
+    """
+    Get detailed analytics for a specific line with optional date filtering
+
+    Runs 4 queries whatever the number of stations: the line, its stations,
+    and one per-station grouped query for each usage table. The line totals
+    are the sums of the per-station ones.
+    """
     line = Line.objects.get(id=line_id)
 
     # Get all stations for this line
-    stations = Station.objects.filter(lines=line)
-
-    # Base queries - tickets and subscriptions used at any station on this line
-    ticket_query = TicketUsageRecord.objects.filter(line=line)
-    subscription_query = SubscriptionUsageRecord.objects.filter(line=line)
+    stations = Station.objects.filter(lines=line).values_list('id', 'name')
 
-    # Apply date filtering if provided
-    if start_date:
-        ticket_query = ticket_query.filter(timestamp__date__gte=start_date)
-        subscription_query = subscription_query.filter(timestamp__date__gte=start_date)
-
-    if end_date:
-        ticket_query = ticket_query.filter(timestamp__date__lte=end_date)
-        subscription_query = subscription_query.filter(timestamp__date__lte=end_date)
+    # Usage at any station on this line, grouped by station
+    period = date_range_q('timestamp', start_date, end_date)
+    tickets = _totals_by_station(TicketUsageRecord.objects.filter(period, line=line))
+    subscriptions = _totals_by_station(SubscriptionUsageRecord.objects.filter(period, line=line))
 
-    # Calculate metrics
-    ticket_revenue = ticket_query.aggregate(total=Sum('revenue_amount'))['total'] or 0
-    subscription_revenue = subscription_query.aggregate(total=Sum('revenue_amount'))['total'] or 0
-    tickets_count = ticket_query.count()
-    subscription_uses = subscription_query.count()
+    ticket_revenue = sum(revenue for revenue, _ in tickets.values())
+    subscription_revenue = sum(revenue for revenue, _ in subscriptions.values())
+    tickets_count = sum(count for _, count in tickets.values())
+    subscription_uses = sum(count for _, count in subscriptions.values())
 
     # Get per-station breakdown
     station_breakdown = []
-    for station in stations:
-        station_ticket_revenue = ticket_query.filter(station=station).aggregate(
-            total=Sum('revenue_amount')
-        )['total'] or 0
-
-        station_subscription_revenue = subscription_query.filter(station=station).aggregate(
-            total=Sum('revenue_amount')
-        )['total'] or 0
-
+    for station_id, name in stations:
+        station_ticket_revenue, station_tickets = tickets.get(station_id, (0, 0))
+        station_subscription_revenue, station_subscriptions = subscriptions.get(station_id, (0, 0))
         station_breakdown.append({
-            'station': station.name,
+            'station': name,
             'total_revenue': station_ticket_revenue + station_subscription_revenue,
             'ticket_revenue': station_ticket_revenue,
             'subscription_revenue': station_subscription_revenue,
-            'tickets_scanned': ticket_query.filter(station=station).count(),
-            'subscription_uses': subscription_query.filter(station=station).count(),
+            'tickets_scanned': station_tickets,
+            'subscription_uses': station_subscriptions,
         })
 
     return {
@@ -0,0 +1,334 @@
+# apps/analytics/snapshots.py
+"""
+Incremental columnar snapshots of the history tables for offline analysis.
+
+Each run of ``write_snapshot`` appends the rows changed since the previous
+run to SNAPSHOT_DIR/<dataset>/date=YYYY-MM-DD/, one file per day per run,
+as Parquet or as an Arrow IPC stream. The layout is the Hive-style one that
+pyarrow.dataset, pandas, DuckDB and Spark read as a date-partitioned
+dataset. Station, line and choice columns are dictionary encoded against
+the full station/line/choice list, so the codes are the same in every file.
+
+Rows are streamed from the database in chunks and written a batch at a
+time, so memory stays bounded whatever the size of the table. A run only
+takes rows older than SNAPSHOT_LAG seconds, so rows from transactions still
+open when it starts are picked up by the next run rather than skipped.
+
+Tickets, transactions (refunds, status changes) and train cars are updated
+in place: a snapshot holds the rows changed in its window, so the latest
+file for an id has its current state.
+There is no crowd reading history table; the ``crowd`` dataset records each
+car's reading as it was at snapshot time.
+"""
+import json
+import logging
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.stations.models import Line, Station
+from apps.tickets.models import Ticket
+from apps.trains.models import TrainCar
+from apps.wallet.models.transaction import Transaction
+
+from .models import SubscriptionUsageRecord, TicketUsageRecord
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrows"}
+STATE_FILE = "_state.json"
+PART_PATTERN = re.compile(r"^part-\d{8}T\d{6}\.(parquet|arrows)$")
+
+
+class Column:
+    """
+    An output column read from ``path`` (a values_list lookup)
+
+    ``kind`` is one of int, string, uuid, decimal, timestamp, choice,
+    station or line.
+    """
+
+    def __init__(self, name, kind, path=None):
+        self.name = name
+        self.kind = kind
+        self.path = path or name
+
+
+class Dataset:
+    def __init__(self, model, changed, columns):
+        self.model = model
+        self.changed = changed  # Timestamp column that selects and partitions rows
+        self.columns = columns
+
+
+DATASETS = {
+    "tickets": Dataset(Ticket, "updated_at", [
+        Column("id", "int"),
+        Column("ticket_number", "string"),
+        Column("user_id", "int"),
+        Column("ticket_type", "choice"),
+        Column("status", "choice"),
+        Column("price", "decimal"),
+        Column("entry_station", "station", "entry_station_id"),
+        Column("exit_station", "station", "exit_station_id"),
+        Column("created_at", "timestamp"),
+        Column("entry_time", "timestamp"),
+        Column("exit_time", "timestamp"),
+        Column("valid_until", "timestamp"),
+        Column("updated_at", "timestamp"),
+    ]),
+    "ticket_usage": Dataset(TicketUsageRecord, "timestamp", [
+        Column("id", "int"),
+        Column("ticket_id", "int"),
+        Column("station", "station", "station_id"),
+        Column("line", "line", "line_id"),
+        Column("usage_type", "choice"),
+        Column("revenue_amount", "decimal"),
+        Column("timestamp", "timestamp"),
+    ]),
+    "subscription_usage": Dataset(SubscriptionUsageRecord, "timestamp", [
+        Column("id", "int"),
+        Column("subscription_id", "int"),
+        Column("station", "station", "station_id"),
+        Column("line", "line", "line_id"),
+        Column("revenue_amount", "decimal"),
+        Column("timestamp", "timestamp"),
+    ]),
+    "transactions": Dataset(Transaction, "updated_at", [
+        Column("id", "uuid"),
+        Column("user_id", "int"),
+        Column("wallet_id", "uuid"),
+        Column("type", "choice"),
+        Column("status", "choice"),
+        Column("amount", "decimal"),
+        Column("created_at", "timestamp"),
+        Column("completed_at", "timestamp"),
+        Column("updated_at", "timestamp"),
+    ]),
+    "crowd": Dataset(TrainCar, "last_updated", [
+        Column("train_id", "int"),
+        Column("train_number", "string", "train__train_number"),
+        Column("line", "line", "train__line_id"),
+        Column("car_number", "int"),
+        Column("current_passengers", "int"),
+        Column("crowd_level", "choice"),
+        Column("last_updated", "timestamp"),
+    ]),
+}
+
+
+def snapshot_dir(directory=None):
+    """
+    Directory snapshots and their state file live in
+
+    Raises:
+        ImproperlyConfigured: If neither ``directory`` nor SNAPSHOT_DIR is set
+    """
+    directory = directory or settings.SNAPSHOT_DIR
+    if not directory:
+        raise ImproperlyConfigured(
+            "Set SNAPSHOT_DIR to a persistent path; without its state file every run re-exports all history"
+        )
+    return Path(directory)
+
+
+def load_state(directory=None):
+    """Per dataset, the end of the window the last snapshot covered"""
+    path = snapshot_dir(directory) / STATE_FILE
+    if not path.exists():
+        return {}
+    return {name: parse_datetime(value) for name, value in json.loads(path.read_text()).items()}
+
+
+def _save_state(directory, state):
+    path = snapshot_dir(directory) / STATE_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({name: value.isoformat() for name, value in state.items()}, indent=2))
+    os.replace(tmp, path)
+
+
+class _Encoder:
+    """Turns chunks of values_list rows into Arrow record batches"""
+
+    def __init__(self, dataset):
+        stations = dict(Station.objects.values_list("id", "name"))
+        lines = dict(Line.objects.values_list("id", "name"))
+        self.dictionaries = []
+        fields = []
+        for column in dataset.columns:
+            if column.kind in ("station", "line", "choice"):
+                if column.kind == "choice":
+                    labels = {value: value for value, _ in dataset.model._meta.get_field(column.path).choices}
+                else:
+                    labels = stations if column.kind == "station" else lines
+                # Stable codes: the n-th station is code n in every file
+                codes = {key: code for code, key in enumerate(labels)}
+                self.dictionaries.append((codes, list(labels.values())))
+                arrow_type = pa.dictionary(pa.int32(), pa.string())
+            else:
+                self.dictionaries.append(None)
+                arrow_type = self._arrow_type(dataset.model, column)
+            fields.append(pa.field(column.name, arrow_type))
+        self.schema = pa.schema(fields)
+
+    @staticmethod
+    def _arrow_type(model, column):
+        if column.kind == "int":
+            return pa.int64()
+        if column.kind == "decimal":
+            field = model._meta.get_field(column.path)
+            return pa.decimal128(field.max_digits, field.decimal_places)
+        if column.kind == "timestamp":
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    def batch(self, rows):
+        arrays = []
+        for index, values in enumerate(zip(*rows)):
+            field = self.schema.field(index)
+            dictionary = self.dictionaries[index]
+            if dictionary is not None:
+                codes, labels = dictionary
+                indices = []
+                for value in values:
+                    if value is not None and value not in codes:
+                        # Added since the run started; later batches carry the longer dictionary
+                        codes[value] = len(labels)
+                        labels.append(str(value))
+                    indices.append(None if value is None else codes[value])
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(indices, pa.int32()), pa.array(labels, pa.string())
+                ))
+            elif pa.types.is_string(field.type):
+                arrays.append(pa.array([None if value is None else str(value) for value in values], field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def _open_writer(path, schema, fmt):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_stream(str(path), schema)
+
+
+def write_snapshot(name, directory=None, fmt="parquet", until=None, chunk_size=5000):
+    """
+    Write the rows of dataset ``name`` changed since its last snapshot
+
+    Files are written under temporary names and renamed once the whole
+    window is written, and the window is only recorded after that, so an
+    interrupted run leaves nothing behind and the next run starts over.
+
+    Returns:
+        dict: dataset, rows written, files written and the window covered
+    """
+    if pa is None:
+        raise ImproperlyConfigured("Analytics snapshots need pyarrow installed")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}, expected one of {', '.join(FORMATS)}")
+
+    dataset = DATASETS[name]
+    state = load_state(directory)
+    since = state.get(name)
+    until = until or timezone.now() - timedelta(seconds=settings.SNAPSHOT_LAG)
+
+    rows = dataset.model.objects.filter(**{f"{dataset.changed}__lt": until})
+    if since:
+        rows = rows.filter(**{f"{dataset.changed}__gte": since})
+    rows = rows.order_by(dataset.changed, "pk").values_list(*(column.path for column in dataset.columns))
+    changed_index = next(i for i, column in enumerate(dataset.columns) if column.path == dataset.changed)
+
+    encoder = _Encoder(dataset)
+    part = f"part-{until:%Y%m%dT%H%M%S}{FORMATS[fmt]}"
+    written = []
+    writer = day = None
+    chunk = []
+    count = 0
+
+    def flush():
+        if chunk:
+            writer.write_batch(encoder.batch(chunk))
+            chunk.clear()
+
+    try:
+        for row in rows.iterator(chunk_size=chunk_size):
+            row_day = timezone.localdate(row[changed_index])
+            if row_day != day:
+                flush()
+                if writer is not None:
+                    writer.close()
+                day = row_day
+                folder = snapshot_dir(directory) / name / f"date={day.isoformat()}"
+                folder.mkdir(parents=True, exist_ok=True)
+                path = folder / part
+                written.append(path)
+                writer = _open_writer(path.with_name(path.name + ".tmp"), encoder.schema, fmt)
+            chunk.append(row)
+            count += 1
+            if len(chunk) >= chunk_size:
+                flush()
+        flush()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        for path in written:
+            path.with_name(path.name + ".tmp").unlink(missing_ok=True)
+        raise
+    if writer is not None:
+        writer.close()
+
+    for path in written:
+        os.replace(path.with_name(path.name + ".tmp"), path)
+    state[name] = until
+    _save_state(directory, state)
+    logger.info(f"Snapshot of {name}: {count} rows in {len(written)} files up to {until.isoformat()}")
+    return {
+        "dataset": name,
+        "rows": count,
+        "files": [str(path) for path in written],
+        "since": since,
+        "until": until,
+    }
+
+
+def write_snapshots(names=None, directory=None, fmt="parquet"):
+    """Snapshot several datasets (all by default) up to the same instant"""
+    until = timezone.now() - timedelta(seconds=settings.SNAPSHOT_LAG)
+    return [write_snapshot(name, directory, fmt, until) for name in names or DATASETS]
+
+
+def list_snapshots(directory=None):
+    """Snapshot files on disk, by dataset and date"""
+    root = snapshot_dir(directory)
+    files = []
+    for name in DATASETS:
+        for path in sorted((root / name).glob("date=*/part-*")):
+            if PART_PATTERN.match(path.name):
+                files.append({
+                    "dataset": name,
+                    "date": path.parent.name.removeprefix("date="),
+                    "file": path.name,
+                    "size": path.stat().st_size,
+                })
+    return files
+
+
+def snapshot_file(name, date, file, directory=None):
+    """Path of one snapshot file, or None if there is no such file"""
+    if name not in DATASETS or not PART_PATTERN.match(file) or not re.match(r"^\d{4}-\d{2}-\d{2}$", date):
+        return None
+    path = snapshot_dir(directory) / name / f"date={date}" / file
+    return path if path.is_file() else None
@@ -0,0 +1,22 @@
+# apps/analytics/tasks.py
+from apps.jobs.queue import task
+
+from . import services
+from .od_matrix import ODMatrixService
+
+
+@task
+def record_ticket_usage(ticket_id, station_id, usage_type='ENTRY'):
+    """Background version of services.record_ticket_usage; repeat calls are ignored there"""
+    services.record_ticket_usage(ticket_id, station_id, usage_type)
+
+
+@task
+def record_subscription_usage(subscription_id, station_id):
+    services.record_subscription_usage(subscription_id, station_id)
+
+
+@task(max_attempts=1)
+def refresh_od_matrix():
+    """Queued by ODMatrixService.schedule_refresh; a failed run is picked up by the next one"""
+    ODMatrixService.refresh()
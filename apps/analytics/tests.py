@@ -0,0 +1,318 @@
+# apps/analytics/tests.py
+import csv
+import gzip
+import io
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.routes.models import Route
+from apps.stations.models import Line, Station
+from apps.tickets.models import Ticket
+from apps.wallet.models.transaction import Transaction
+from apps.wallet.services.wallet_service import WalletService
+from metro.partitioning import add_months, archive_months, month_start
+
+from .models import SubscriptionUsageRecord, TicketUsageRecord
+from .od_matrix import ODMatrixService
+from .services import date_range_q, get_line_analytics
+from .snapshots import pa, write_snapshot
+
+
+class PartitionArchiveTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        user = get_user_model().objects.create_user(email="archive@example.com", username="archive", password="x")
+        wallet = WalletService.get_or_create_wallet(user)
+        self.current = month_start(timezone.now())
+        for months_back in (0, 3, 3, 14):
+            transaction = Transaction.objects.create(
+                user=user, wallet=wallet, amount=Decimal("10.00"), type="DEPOSIT", status="COMPLETED"
+            )
+            created_at = add_months(self.current, -months_back).replace(day=15)
+            Transaction.objects.filter(id=transaction.id).update(created_at=created_at, updated_at=created_at)
+        return transaction
+
+    def test_old_months_are_exported_then_deleted(self):
+        archived = archive_months(Transaction, add_months(self.current, -2), archive_dir=self.archive_dir)
+
+        self.assertEqual([month for month, _ in archived], [add_months(self.current, -14), add_months(self.current, -3)])
+        self.assertEqual(Transaction.objects.count(), 1)
+        with gzip.open(archived[1][1], "rt", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["amount"], "10.00")
+
+        # Archiving the same month again keeps the first file
+        self.assertEqual(archive_months(Transaction, add_months(self.current, -2), archive_dir=self.archive_dir), [])
+
+    def test_month_arithmetic(self):
+        self.assertEqual(add_months(datetime(2025, 11, 1, tzinfo=dt_timezone.utc), 3),
+                         datetime(2026, 2, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(month_start(datetime(2025, 3, 1, 1, tzinfo=dt_timezone(timedelta(hours=2)))),
+                         datetime(2025, 2, 1, tzinfo=dt_timezone.utc))
+
+    def test_command_keeps_the_retention_period(self):
+        out = io.StringIO()
+        with override_settings(PARTITION_ARCHIVE_DIR=self.archive_dir):
+            call_command("partitions", "--retain-months", "12", "--dry-run", stdout=out)
+            self.assertIn("1 months to archive", out.getvalue())
+            self.assertEqual(Transaction.objects.count(), 4)
+
+            call_command("partitions", "--retain-months", "4", "--archive-dir", self.archive_dir, stdout=out)
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_archiving_needs_an_explicit_directory(self):
+        with override_settings(PARTITION_ARCHIVE_DIR=None):
+            with self.assertRaises(ImproperlyConfigured):
+                archive_months(Transaction, add_months(self.current, -2))
+            with self.assertRaises(CommandError):
+                call_command("partitions", "--retain-months", "4", stdout=io.StringIO())
+            call_command("partitions", "--retain-months", "0", stdout=io.StringIO())
+        self.assertEqual(Transaction.objects.count(), 4)
+
+
+@skipUnless(pa, "pyarrow is not installed")
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.snapshot_dir)
+        self.user = get_user_model().objects.create_user(email="snap@example.com", username="snap", password="x")
+        self.wallet = WalletService.get_or_create_wallet(self.user)
+        self.now = timezone.now()
+        for days_back, kind in ((2, "DEPOSIT"), (2, "PAYMENT"), (1, "DEPOSIT")):
+            self.transaction(self.now - timedelta(days=days_back), kind)
+
+    def transaction(self, created_at, kind="DEPOSIT"):
+        transaction = Transaction.objects.create(
+            user=self.user, wallet=self.wallet, amount=Decimal("12.50"), type=kind, status="COMPLETED"
+        )
+        Transaction.objects.filter(id=transaction.id).update(created_at=created_at, updated_at=created_at)
+        return transaction
+
+    def test_snapshots_are_incremental_and_partitioned_by_day(self):
+        import pyarrow.parquet as pq
+
+        first = write_snapshot("transactions", self.snapshot_dir, until=self.now)
+        self.assertEqual(first["rows"], 3)
+        self.assertEqual(len(first["files"]), 2)
+
+        table = pq.read_table(first["files"][0])
+        self.assertEqual(table.num_rows, 2)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("type").type))
+        self.assertEqual(table.column("amount").to_pylist(), [Decimal("12.50")] * 2)
+        self.assertEqual(sorted(table.column("type").to_pylist()), ["DEPOSIT", "PAYMENT"])
+
+        # Only rows changed since the last run are written again
+        self.transaction(self.now + timedelta(minutes=1))
+        second = write_snapshot("transactions", self.snapshot_dir, until=self.now + timedelta(hours=1))
+        self.assertEqual(second["rows"], 1)
+        self.assertEqual(second["since"], self.now)
+
+    def test_status_changes_are_snapshotted_again(self):
+        import pyarrow.parquet as pq
+
+        refunded = self.transaction(self.now - timedelta(days=3))
+        write_snapshot("transactions", self.snapshot_dir, until=self.now)
+
+        refunded.status = "REFUNDED"
+        refunded.save()
+        result = write_snapshot("transactions", self.snapshot_dir, until=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(result["rows"], 1)
+        table = pq.read_table(result["files"][0])
+        self.assertEqual(table.column("status").to_pylist(), ["REFUNDED"])
+
+    @override_settings(SNAPSHOT_DIR=None)
+    def test_snapshot_dir_must_be_set(self):
+        with self.assertRaises(ImproperlyConfigured):
+            write_snapshot("transactions")
+
+    def test_arrow_stream_format(self):
+        result = write_snapshot("transactions", self.snapshot_dir, fmt="arrow", until=self.now)
+        with pa.ipc.open_stream(result["files"][-1]) as reader:
+            self.assertEqual(reader.read_all().num_rows, 1)
+
+    def test_snapshot_endpoints_are_admin_only(self):
+        admin = get_user_model().objects.create_superuser(email="admin@example.com", username="admin", password="x")
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get("/api/analytics/snapshots/").status_code, 403)
+
+        client.force_authenticate(admin)
+        with override_settings(SNAPSHOT_DIR=self.snapshot_dir):
+            response = client.post("/api/analytics/snapshots/", {"datasets": ["transactions"]}, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()["snapshots"][0]["rows"], 3)
+            self.assertEqual(client.post("/api/analytics/snapshots/", {"format": "csv"}).status_code, 400)
+
+            # Written on this host, so it is listed and served straight away
+            written = response.json()["snapshots"][0]["files"]
+            snapshots = client.get("/api/analytics/snapshots/").json()["snapshots"]
+            self.assertEqual([{"date": s["date"], "file": s["file"]} for s in snapshots], written)
+            snapshot = snapshots[0]
+            response = client.get(f"/api/analytics/snapshots/transactions/{snapshot['date']}/{snapshot['file']}")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(b"".join(response.streaming_content)), snapshot["size"])
+            response.close()
+            self.assertEqual(client.get("/api/analytics/snapshots/transactions/2020-01-01/../x").status_code, 404)
+
+
+class ODMatrixTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="od@example.com", username="od", password="x")
+        self.line = Line.objects.create(name="First Line", color_code="#FF0000")
+        self.a, self.b, self.c = (
+            Station.objects.create(name=name, latitude=30.0 + i / 100, longitude=31.2)
+            for i, name in enumerate(("Helwan", "Sadat", "Shubra"))
+        )
+        self.day = timezone.localdate() - timedelta(days=1)
+        self.eight = timezone.make_aware(datetime.combine(self.day, datetime.min.time())) + timedelta(hours=8)
+
+    def trip(self, origin, destination, entry_time, price="10.00"):
+        ticket = Ticket.objects.create(user=self.user, ticket_type="BASIC", valid_until=timezone.now() + timedelta(days=1))
+        Ticket.objects.filter(id=ticket.id).update(
+            status="USED",
+            price=Decimal(price),
+            entry_station=origin,
+            exit_station=destination,
+            entry_time=entry_time,
+            exit_time=entry_time + timedelta(minutes=20),
+        )
+
+    def test_refresh_is_incremental(self):
+        self.trip(self.a, self.b, self.eight)
+        self.trip(self.a, self.b, self.eight + timedelta(minutes=30))
+        self.trip(self.b, self.c, self.eight + timedelta(hours=9), price="15.00")
+
+        cutoff = timezone.now() - timedelta(minutes=10)
+        self.assertEqual(ODMatrixService.refresh(until=cutoff)["trips"], 3)
+        self.assertEqual(ODMatrixService.refresh(until=cutoff)["trips"], 0)  # Nothing counted twice
+
+        # A trip that has just ended goes to the day it started on
+        entry_time = timezone.now() - timedelta(minutes=25)
+        self.trip(self.c, self.a, entry_time)
+        result = ODMatrixService.refresh()
+        self.assertEqual((result["trips"], result["days"]), (1, [timezone.localdate(entry_time)]))
+
+        station_ids, counts, revenue, by_hour = ODMatrixService.matrix(self.day, self.day)
+        a, b, c = (station_ids.index(station.id) for station in (self.a, self.b, self.c))
+        self.assertEqual((counts[a, b], counts[b, c], counts[c, a]), (2, 1, 0))
+        self.assertEqual(revenue[a, b], 2000)
+        self.assertEqual((by_hour[8], by_hour[17]), (2, 1))
+
+        _, morning, _, _ = ODMatrixService.matrix(self.day, self.day, hours=range(7, 10))
+        self.assertEqual(morning.sum(), 2)
+
+        rebuilt = ODMatrixService.refresh(rebuild=True)
+        self.assertEqual(rebuilt["trips"], 4)
+        self.assertEqual(ODMatrixService.matrix(self.day, timezone.localdate())[1].sum(), 4)
+
+    def test_top_pairs_and_interchange_flows(self):
+        self.trip(self.a, self.c, self.eight)
+        self.trip(self.a, self.c, self.eight)
+        self.trip(self.a, self.b, self.eight)
+        ODMatrixService.refresh()
+        path = [{"station": name, "line": "First Line"} for name in ("Helwan", "Sadat", "Shubra")]
+        Route.objects.create(start_station=self.a, end_station=self.c, path=path)
+
+        pairs = ODMatrixService.popular_routes(self.day, self.day)
+        self.assertEqual(
+            [(pair["entry_station__name"], pair["exit_station__name"], pair["count"]) for pair in pairs],
+            [("Helwan", "Shubra", 2), ("Helwan", "Sadat", 1)],
+        )
+
+        flows = ODMatrixService.interchange_flows(self.b, self.day, self.day)
+        self.assertEqual(flows["trips_through"], 2)
+        self.assertEqual(flows["revenue_through"], 20.0)
+        self.assertEqual(flows["trips_without_route"], 1)  # Helwan -> Sadat has no stored route
+
+    def test_popular_routes_before_first_refresh(self):
+        self.trip(self.a, self.c, self.eight)
+        self.trip(self.a, self.c, self.eight, price="12.50")
+        self.trip(self.a, self.b, self.eight)
+        self.trip(self.b, self.b, self.eight)
+
+        before = ODMatrixService.popular_routes(self.day, self.day)
+        ODMatrixService.refresh()
+        after = ODMatrixService.popular_routes(self.day, self.day)
+
+        self.assertEqual(before, after)
+        self.assertEqual(
+            [(pair["entry_station__name"], pair["exit_station__name"], pair["count"], pair["revenue"]) for pair in before],
+            [("Helwan", "Shubra", 2, 22.5), ("Helwan", "Sadat", 1, 10.0)],
+        )
+
+    def test_od_endpoints(self):
+        self.trip(self.a, self.b, self.eight)
+        ODMatrixService.refresh()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get("/api/analytics/od_matrix/", {"start_date": self.day, "end_date": self.day, "full": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_trips"], 1)
+        self.assertEqual(len(response.json()["counts"]), Station.objects.count())
+
+        self.assertEqual(client.get("/api/analytics/od_matrix/", {"hours": "7-25"}).status_code, 400)
+        for params in ({"hours": "9-7"}, {"limit": -1}, {"limit": 0}, {"limit": 100000},
+                       {"start_date": "2026-02-01", "end_date": "2026-01-01"}):
+            self.assertEqual(client.get("/api/analytics/od_matrix/", params).status_code, 400, params)
+        response = client.get("/api/analytics/od_interchange/", {"station_id": self.b.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get("/api/analytics/od_interchange/", {"station_id": 0}).status_code, 404)
+
+
+class LineAnalyticsTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="line@example.com", username="line", password="x")
+        self.line = Line.objects.create(name="First Line", color_code="#FF0000")
+        self.stations = [
+            Station.objects.create(name=f"Station {i}", latitude=30.0 + i / 100, longitude=31.2) for i in range(5)
+        ]
+        for order, station in enumerate(self.stations, 1):
+            self.line.line_stations.create(station=station, order=order)
+        self.day = timezone.localdate() - timedelta(days=1)
+        midnight = timezone.make_aware(datetime.combine(self.day, datetime.min.time()))
+
+        for station, times in ((self.stations[0], (0, 1)), (self.stations[2], (23.99,)), (self.stations[3], (24,))):
+            for hours in times:
+                ticket = Ticket.objects.create(
+                    user=user, ticket_type="BASIC", valid_until=timezone.now() + timedelta(days=1)
+                )
+                TicketUsageRecord.objects.create(
+                    ticket=ticket, station=station, line=self.line,
+                    revenue_amount=Decimal("8.00"), timestamp=midnight + timedelta(hours=hours),
+                )
+
+    def test_per_station_breakdown_in_constant_queries(self):
+        with self.assertNumQueries(4):
+            analytics = get_line_analytics(self.line.id, self.day, self.day)
+
+        # The record at midnight after the end date falls outside the range
+        self.assertEqual(analytics["tickets_scanned"], 3)
+        self.assertEqual(analytics["ticket_revenue"], Decimal("24.00"))
+        breakdown = {row["station"]: row for row in analytics["station_breakdown"]}
+        self.assertEqual(len(breakdown), 5)
+        self.assertEqual(breakdown["Station 0"]["tickets_scanned"], 2)
+        self.assertEqual(breakdown["Station 0"]["total_revenue"], Decimal("16.00"))
+        self.assertEqual(breakdown["Station 3"]["tickets_scanned"], 0)
+        self.assertEqual(breakdown["Station 4"]["subscription_uses"], 0)
+
+        self.assertEqual(get_line_analytics(self.line.id)["tickets_scanned"], 4)
+
+    def test_date_range_is_half_open_on_the_column(self):
+        query = str(TicketUsageRecord.objects.filter(date_range_q("timestamp", self.day, self.day)).query)
+        self.assertIn('"timestamp" >=', query)
+        self.assertIn('"timestamp" <', query)
+        self.assertEqual(SubscriptionUsageRecord.objects.filter(date_range_q("timestamp", "2020-01-01")).count(), 0)
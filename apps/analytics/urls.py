@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AnalyticsViewSet
+from .views import AnalyticsViewSet, SnapshotFileView, SnapshotListView
 from .reports import (
     generate_station_revenue_report,
     generate_line_revenue_report,
@@ -11,6 +11,12 @@
 router.register(r'', AnalyticsViewSet, basename='analytics')
 
 urlpatterns = [
+    path('snapshots/', SnapshotListView.as_view(), name='snapshot_list'),
+    path(
+        'snapshots/<str:dataset>/<str:date>/<str:file>',
+        SnapshotFileView.as_view(),
+        name='snapshot_file'
+    ),
     path('', include(router.urls)),
     path('reports/station/', generate_station_revenue_report, name='station_report'),
     path('reports/line/', generate_line_revenue_report, name='line_report'),
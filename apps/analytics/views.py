@@ -1,9 +1,17 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.core.cache import cache
+from django.http import FileResponse, Http404
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
+from pathlib import Path
 from apps.stations.models import Station, Line
+from metro.query_budget import max_queries
+from .od_matrix import ODMatrixService
+from .snapshots import DATASETS, FORMATS, list_snapshots, snapshot_file, write_snapshots
 from .services import (
     get_station_analytics,
     get_line_analytics,
@@ -11,6 +19,9 @@
     get_ticket_status_analytics
 )
 
+SNAPSHOT_LOCK_TIMEOUT = 30 * 60  # Seconds; frees the lock if a request dies mid-write
+MAX_OD_PAIRS = 500  # Most top OD pairs one request may ask for
+
 
 class AnalyticsViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -43,6 +54,7 @@ def station(self, request):
             )
 
     @action(detail=False, methods=['get'])
+    @max_queries(5)  # get_line_analytics runs 4 queries for any number of stations, plus the user lookup
     def line(self, request):
         """Get analytics for a specific line"""
         line_id = request.query_params.get('line_id')
@@ -123,6 +135,71 @@ def summary(self, request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @staticmethod
+    def _od_params(request):
+        """Period (default: last 30 days) and entry hours ("7-9" or "7,8,9") of an OD query"""
+        params = request.query_params
+        end_date = parse_date(params['end_date']) if params.get('end_date') else timezone.localdate()
+        start_date = (
+            parse_date(params['start_date']) if params.get('start_date') else end_date - timedelta(days=30)
+        )
+        if start_date is None or end_date is None:
+            raise ValueError("dates must be YYYY-MM-DD")
+        if start_date > end_date:
+            raise ValueError("start_date must not be after end_date")
+
+        hours = None
+        if params.get('hours'):
+            if '-' in params['hours']:
+                first, last = (int(value) for value in params['hours'].split('-', 1))
+                if first > last:
+                    raise ValueError("hours range must not be reversed")
+                hours = range(first, last + 1)
+            else:
+                hours = [int(value) for value in params['hours'].split(',')]
+            if not all(0 <= hour < 24 for hour in hours):
+                raise ValueError("hours must be between 0 and 23")
+        return start_date, end_date, hours
+
+    @action(detail=False, methods=['get'])
+    def od_matrix(self, request):
+        """Trips and revenue between stations: totals, hourly profile and top pairs (full=true adds the matrices)"""
+        try:
+            start_date, end_date, hours = self._od_params(request)
+            limit = int(request.query_params.get('limit', 20))
+            if not 1 <= limit <= MAX_OD_PAIRS:
+                raise ValueError(f"limit must be between 1 and {MAX_OD_PAIRS}")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = ODMatrixService.summary(
+            start_date, end_date, hours, limit=limit, full=request.query_params.get('full') == 'true'
+        )
+        return Response({'period': {'start_date': start_date, 'end_date': end_date}, **data})
+
+    @action(detail=False, methods=['get'])
+    def od_interchange(self, request):
+        """Trips whose route passes through or changes line at a station"""
+        station_id = request.query_params.get('station_id')
+        if not station_id:
+            return Response(
+                {"error": "station_id is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start_date, end_date, hours = self._od_params(request)
+            station = Station.objects.get(id=int(station_id))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Station.DoesNotExist:
+            return Response(
+                {"error": "Station not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        data = ODMatrixService.interchange_flows(station, start_date, end_date, hours)
+        return Response({'period': {'start_date': start_date, 'end_date': end_date}, **data})
+
 
 @action(detail=False, methods=['get'])
 def tickets(self, request):
@@ -135,3 +212,67 @@ def tickets(self, request):
             {"error": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+class SnapshotListView(APIView):
+    """
+    Columnar snapshot files for analysts; POST writes a new snapshot
+
+    The snapshot is written in the request rather than queued: the files
+    live in this host's SNAPSHOT_DIR, which the jobs worker cannot write to.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'snapshots': list_snapshots()})
+
+    def post(self, request):
+        datasets = request.data.get('datasets') or None
+        fmt = request.data.get('format', 'parquet')
+        if datasets is not None and (not isinstance(datasets, list) or set(datasets) - set(DATASETS)):
+            return Response(
+                {"error": f"datasets must be a list of: {', '.join(DATASETS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if fmt not in FORMATS:
+            return Response(
+                {"error": f"format must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not cache.add('analytics:snapshot_running', True, SNAPSHOT_LOCK_TIMEOUT):
+            return Response(
+                {"error": "A snapshot is already being written"},
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            results = write_snapshots(datasets, fmt=fmt)
+        finally:
+            cache.delete('analytics:snapshot_running')
+
+        return Response({
+            'snapshots': [
+                {
+                    'dataset': result['dataset'],
+                    'rows': result['rows'],
+                    'files': [
+                        {'date': path.parent.name.removeprefix('date='), 'file': path.name}
+                        for path in map(Path, result['files'])
+                    ],
+                    'since': result['since'],
+                    'until': result['until'],
+                }
+                for result in results
+            ]
+        }, status=status.HTTP_201_CREATED)
+
+
+class SnapshotFileView(APIView):
+    """Download one snapshot file"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, dataset, date, file):
+        path = snapshot_file(dataset, date, file)
+        if path is None:
+            raise Http404("Snapshot not found")
+        return FileResponse(path.open('rb'), as_attachment=True, filename=f"{dataset}-{date}-{file}")
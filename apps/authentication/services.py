@@ -48,8 +48,13 @@ def get_valid_token(token_str):
             return None
 
     @staticmethod
-    def send_reset_email(user, token):
-        """Send password reset email"""
+    def send_reset_email(user, token, fail_silently=True):
+        """
+        Send password reset email
+
+        Requests should call queue_reset_email instead, which sends it from a
+        background job with retries.
+        """
         try:
             reset_url = f"{settings.FRONTEND_URL}/reset-password?token={token.token}"
 
@@ -76,8 +81,16 @@ def send_reset_email(user, token):
 
         except Exception as e:
             logger.error(f"Error sending password reset email: {str(e)}")
+            if not fail_silently:
+                raise
             return False
 
+    @staticmethod
+    def queue_reset_email(token):
+        """Send the reset email from a background job once the token is committed"""
+        from .tasks import send_password_reset_email
+        send_password_reset_email.delay(token.id)
+
     @staticmethod
     def reset_password(token, new_password):
         """Reset user's password"""
@@ -0,0 +1,14 @@
+# apps/authentication/tasks.py
+from apps.jobs.queue import task
+
+from .models import PasswordResetToken
+from .services import PasswordResetService
+
+
+@task(max_attempts=5, retry_delay=10)
+def send_password_reset_email(token_id):
+    """Send the reset email unless the token was used or replaced in the meantime"""
+    token = PasswordResetToken.objects.select_related('user').filter(id=token_id).first()
+    if token is None or not token.is_valid():
+        return
+    PasswordResetService.send_reset_email(token.user, token, fail_silently=False)
@@ -32,16 +32,11 @@ def post(self, request):
                 user = User.objects.get(email=serializer.validated_data['email'])
                 token = PasswordResetService.create_reset_token(user)
 
-                if PasswordResetService.send_reset_email(user, token):
-                    return Response(
-                        {"message": "Password reset email sent successfully"},
-                        status=status.HTTP_200_OK
-                    )
-                else:
-                    return Response(
-                        {"error": "Failed to send reset email"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
+                PasswordResetService.queue_reset_email(token)
+                return Response(
+                    {"message": "Password reset email sent successfully"},
+                    status=status.HTTP_200_OK
+                )
 
             except Exception as e:
                 logger.error(f"Password reset request error: {str(e)}")
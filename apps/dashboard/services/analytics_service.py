@@ -1,4 +1,5 @@
 import datetime
+from decimal import Decimal
 from django.db.models import Sum, Count, F, Q
 from django.db.models.functions import TruncDate, ExtractHour, ExtractWeekDay
 from django.utils import timezone
@@ -7,6 +8,7 @@
 from apps.tickets.models.subscription import UserSubscription
 from apps.stations.models import Station, Line
 from apps.wallet.models.transaction import Transaction
+from apps.analytics.od_matrix import ODMatrixService
 
 
 class AnalyticsService:
@@ -185,7 +187,7 @@ def get_revenue_by_line(start_date=None, end_date=None):
         # Get line count for proportional allocation
         line_count = Line.objects.count()
         if line_count > 0:
-            subscription_per_line = subscription_total / line_count
+            subscription_per_line = Decimal(subscription_total) / line_count
 
             # Allocate subscription revenue equally
             for line_id in line_data:
@@ -374,19 +376,8 @@ def get_station_analytics(start_date=None, end_date=None):
             'id', 'name', 'entries', 'exits', 'total_traffic', 'revenue'
         )
 
-        # Get popular routes (origin-destination pairs)
-        popular_routes = Ticket.objects.filter(
-            entry_time__date__gte=start_date,
-            entry_time__date__lte=end_date,
-            exit_time__date__gte=start_date,
-            exit_time__date__lte=end_date,
-            entry_station__isnull=False,
-            exit_station__isnull=False
-        ).exclude(entry_station=F('exit_station')).values(
-            'entry_station__name', 'exit_station__name'
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')[:20]
+        # Get popular routes (origin-destination pairs) from the OD matrices
+        popular_routes = ODMatrixService.popular_routes(start_date, end_date)
 
         # Get station usage by day of week
         day_of_week_usage = Ticket.objects.filter(
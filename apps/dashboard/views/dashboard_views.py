@@ -13,6 +13,7 @@
 class DashboardView(TemplateView):
     """Main admin dashboard view"""
     template_name = 'admin/dashboard/index.html'
+    query_budget = {'get': 16}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -13,6 +13,7 @@
 class RevenueDashboardView(TemplateView):
     """Revenue dashboard view"""
     template_name = 'admin/dashboard/revenue_dashboard.html'
+    query_budget = {'get': 13}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -3,9 +3,8 @@
 from django.utils.decorators import method_decorator
 from django.utils import timezone
 import datetime
-import json
 
-from ..utils import DecimalEncoder
+from ..utils import json_serialize
 
 from ..services.analytics_service import AnalyticsService
 from ..services.export_service import ExportService
@@ -15,6 +14,7 @@
 class StationDashboardView(TemplateView):
     """Station analytics dashboard view"""
     template_name = 'admin/dashboard/station_dashboard.html'
+    query_budget = {'get': 8}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -41,9 +41,9 @@ def get_context_data(self, **kwargs):
         station_data = AnalyticsService.get_station_analytics(start_date, end_date)
 
         context.update({
-            'stations_traffic': json.dumps(station_data['stations_traffic'], cls=DecimalEncoder),
-            'popular_routes': json.dumps(station_data['popular_routes'], cls=DecimalEncoder),
-            'day_of_week_usage': json.dumps(station_data['day_of_week_usage'], cls=DecimalEncoder),
+            'stations_traffic': json_serialize(station_data['stations_traffic']),
+            'popular_routes': json_serialize(station_data['popular_routes']),
+            'day_of_week_usage': json_serialize(station_data['day_of_week_usage']),
             'start_date': start_date.strftime('%Y-%m-%d'),
             'end_date': end_date.strftime('%Y-%m-%d')
         })
@@ -13,6 +13,7 @@
 class TicketDashboardView(TemplateView):
     """Ticket analytics dashboard view"""
     template_name = 'admin/dashboard/ticket_dashboard.html'
+    query_budget = {'get': 10}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
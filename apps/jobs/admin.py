@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task", "status", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "task")
+    search_fields = ("task", "last_error")
+    readonly_fields = ("created_at", "finished_at", "locked_at", "locked_by", "last_error")
+    actions = ["retry_jobs"]
+
+    @admin.action(description="Retry selected jobs")
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.PENDING, attempts=0, run_at=timezone.now(), last_error=""
+        )
+        self.message_user(request, f"{count} jobs queued again")
@@ -0,0 +1,30 @@
+# apps/jobs/management/commands/purge_jobs.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.queue import purge_finished
+
+
+class Command(BaseCommand):
+    help = "Delete finished background jobs past their retention period (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--done-days",
+            type=int,
+            default=settings.JOBS_DONE_RETENTION_DAYS,
+            help="Keep DONE jobs this many days",
+        )
+        parser.add_argument(
+            "--failed-days",
+            type=int,
+            default=settings.JOBS_FAILED_RETENTION_DAYS,
+            help="Keep FAILED jobs this many days",
+        )
+
+    def handle(self, *args, **options):
+        if options["done_days"] < 0 or options["failed_days"] < 0:
+            raise CommandError("Retention periods cannot be negative")
+
+        deleted = purge_finished(done_days=options["done_days"], failed_days=options["failed_days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} finished jobs"))
@@ -0,0 +1,89 @@
+# apps/jobs/management/commands/run_jobs.py
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs.queue import release_stale, work
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (emails, notifications, analytics) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes to start",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Exit after running this many jobs per process",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due and exit (e.g. from cron)",
+        )
+
+    def handle(self, *args, **options):
+        released = release_stale()
+        if released:
+            self.stdout.write(self.style.WARNING(f"Released {released} jobs left running by a dead worker"))
+
+        processes = max(1, options["processes"])
+        run_options = (options["max_jobs"], None if options["once"] else options["sleep"])
+        if processes == 1:
+            ran = self._work(*run_options)
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs"))
+            return
+
+        # Children must not inherit the parent's database connections
+        connections.close_all()
+        workers = [self._start(run_options) for _ in range(processes)]
+        self.stdout.write(f"Started {processes} job workers")
+        try:
+            while workers:
+                for index, worker in enumerate(workers):
+                    worker.join(timeout=1)
+                    if worker.exitcode is None:
+                        continue
+                    if worker.exitcode == 0:
+                        workers[index] = None
+                        continue
+                    # Killed mid-job (OOM, a crashing provider SDK); its job is released on a later start
+                    self.stdout.write(self.style.WARNING(
+                        f"Job worker {worker.pid} died with exit code {worker.exitcode}, restarting it"
+                    ))
+                    workers[index] = self._start(run_options)
+                workers = [worker for worker in workers if worker is not None]
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+        self.stdout.write(self.style.SUCCESS("Job workers stopped"))
+
+    def _start(self, run_options):
+        worker = multiprocessing.Process(target=self._work, args=run_options, daemon=True)
+        worker.start()
+        return worker
+
+    @staticmethod
+    def _work(max_jobs, idle_sleep):
+        stopping = []
+        # Finish the current job on SIGTERM or Ctrl-C instead of dying half way through it
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: stopping.append(signum))
+        try:
+            return work(max_jobs=max_jobs, idle_sleep=idle_sleep, stop=lambda: bool(stopping))
+        finally:
+            connections.close_all()
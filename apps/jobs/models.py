@@ -0,0 +1,36 @@
+# apps/jobs/models.py
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A deferred call of a registered task, run by the run_jobs workers"""
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ["run_at"]
+        indexes = [
+            # Workers poll for due pending jobs
+            models.Index(fields=["status", "run_at"]),
+        ]
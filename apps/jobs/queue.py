@@ -0,0 +1,214 @@
+# apps/jobs/queue.py
+"""
+Database-backed job queue for side effects a request should not wait on
+(emails, push notifications, analytics).
+
+Functions are registered with ``@task`` in an app's ``tasks.py`` and queued
+with ``func.delay(*args, **kwargs)``. The job row is written when the
+current transaction commits, so a job never runs against data that was
+rolled back, and never before the data it needs is visible. Arguments are
+stored as JSON: pass ids, not model instances.
+
+``manage.py run_jobs`` runs the workers. A worker claims a due job with a
+conditional UPDATE, so any number of worker processes can share the table
+without row locks. A failed job is retried with exponential backoff until
+it has had ``max_attempts`` tries, then left as FAILED for inspection in the
+admin.
+``manage.py purge_jobs`` deletes finished jobs once they are past their
+retention period.
+
+With JOBS_EAGER set, jobs run in-process at commit instead, which is handy
+for local development.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(func=None, *, name=None, max_attempts=3, retry_delay=30):
+    """
+    Register a function as a task and give it a ``delay`` method
+
+    ``retry_delay`` is the wait in seconds before the first retry; it
+    doubles with each further attempt.
+    """
+    def decorator(func):
+        func.task_name = name or f"{func.__module__}.{func.__name__}"
+        func.max_attempts = max_attempts
+        func.retry_delay = retry_delay
+        func.delay = partial(enqueue, func)
+        _tasks[func.task_name] = func
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(func, *args, **kwargs):
+    """Queue a call of ``func`` for when the current transaction commits"""
+    if getattr(settings, "JOBS_EAGER", False):
+        transaction.on_commit(partial(_run_eagerly, func, args, kwargs))
+        return
+
+    transaction.on_commit(partial(
+        Job.objects.create,
+        task=func.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+    ))
+
+
+def _run_eagerly(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Job {func.task_name} failed")
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next(worker=None):
+    """
+    Claim the next due job for this worker
+
+    Returns:
+        Job or None: The claimed job, now RUNNING, or None if nothing is due
+    """
+    worker = worker or worker_name()
+    now = timezone.now()
+    candidates = Job.objects.filter(status=Job.Status.PENDING, run_at__lte=now).order_by("run_at")
+    for job_id in candidates.values_list("id", flat=True)[:10]:
+        # Whoever moves the row out of PENDING first owns it
+        claimed = Job.objects.filter(id=job_id, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING,
+            locked_at=now,
+            locked_by=worker,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome"""
+    try:
+        func = get_task(job.task)
+        func(*job.args, **job.kwargs)
+    except Exception as e:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts and job.task in _tasks:
+            delay = _tasks[job.task].retry_delay * 2 ** (job.attempts - 1)
+            job.status = Job.Status.PENDING
+            job.run_at = timezone.now() + timedelta(seconds=delay)
+            logger.warning(f"Job {job} failed ({e!r}), retrying in {delay}s")
+        else:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+            logger.error(f"Job {job} failed for good: {e!r}")
+    else:
+        job.status = Job.Status.DONE
+        job.finished_at = timezone.now()
+        job.last_error = ""
+
+    job.locked_at = None
+    job.locked_by = ""
+    job.save(update_fields=["status", "run_at", "locked_at", "locked_by", "last_error", "finished_at"])
+    return job.status
+
+
+def release_stale(timeout=None):
+    """
+    Put RUNNING jobs whose worker died back in the queue
+
+    The dead worker's try was already counted when it claimed the job, so a
+    job that has used up its attempts is marked FAILED instead: one that
+    kills its worker would otherwise be retried forever.
+
+    Returns:
+        int: Number of jobs released
+    """
+    timeout = timeout or getattr(settings, "JOBS_LOCK_TIMEOUT", 600)
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        finished_at=now,
+        locked_at=None,
+        locked_by="",
+        last_error="Worker died while running the job",
+    )
+    if failed:
+        logger.error(f"Failed {failed} jobs whose worker died on their last attempt")
+    return stale.update(status=Job.Status.PENDING, locked_at=None, locked_by="")
+
+
+def purge_finished(done_days=None, failed_days=None, batch_size=1000):
+    """
+    Delete DONE and FAILED jobs that finished more than the given number of
+    days ago, in batches
+
+    Returns:
+        int: Number of jobs deleted
+    """
+    if done_days is None:
+        done_days = getattr(settings, "JOBS_DONE_RETENTION_DAYS", 7)
+    if failed_days is None:
+        failed_days = getattr(settings, "JOBS_FAILED_RETENTION_DAYS", 30)
+
+    now = timezone.now()
+    deleted = 0
+    for status, days in ((Job.Status.DONE, done_days), (Job.Status.FAILED, failed_days)):
+        finished = Job.objects.filter(status=status, finished_at__lt=now - timedelta(days=days))
+        while True:
+            ids = list(finished.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += Job.objects.filter(id__in=ids).delete()[0]
+    return deleted
+
+
+def work(max_jobs=None, idle_sleep=1.0, stop=lambda: False):
+    """
+    Run jobs until ``stop()`` is true, or ``max_jobs`` have run, or (with
+    ``idle_sleep`` None) the queue is empty
+
+    Returns:
+        int: Number of jobs run
+    """
+    worker = worker_name()
+    ran = 0
+    while not stop() and (max_jobs is None or ran < max_jobs):
+        job = claim_next(worker)
+        if job is None:
+            if idle_sleep is None:
+                break
+            time.sleep(idle_sleep)
+            continue
+        run_job(job)
+        ran += 1
+    return ran
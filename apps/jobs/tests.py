@@ -0,0 +1,123 @@
+# apps/jobs/tests.py
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Job
+from .queue import claim_next, purge_finished, release_stale, run_job, task, work
+
+calls = []
+
+
+@task(name="jobs.tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task(name="jobs.tests.flaky", max_attempts=2, retry_delay=60)
+def flaky():
+    raise RuntimeError("provider down")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_is_written_on_commit_and_run_by_worker(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            record.delay("hello")
+            self.assertFalse(Job.objects.exists())
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(work(idle_sleep=None), 1)
+        self.assertEqual(calls, ["hello"])
+        self.assertEqual(Job.objects.get().status, Job.Status.DONE)
+
+    def test_failed_job_backs_off_then_fails(self):
+        job = Job.objects.create(task="jobs.tests.flaky", max_attempts=2)
+
+        run_job(claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertIn("provider down", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIsNone(claim_next())  # Not due yet
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        run_job(claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claimed_job_is_not_handed_out_twice(self):
+        Job.objects.create(task="jobs.tests.record", args=[1])
+        self.assertIsNotNone(claim_next("worker-a"))
+        self.assertIsNone(claim_next("worker-b"))
+
+    def test_abandoned_job_is_released(self):
+        Job.objects.create(
+            task="jobs.tests.record",
+            args=[1],
+            status=Job.Status.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        exhausted = Job.objects.create(
+            task="jobs.tests.record",
+            args=[2],
+            status=Job.Status.RUNNING,
+            attempts=3,
+            max_attempts=3,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(release_stale(timeout=60), 1)
+        self.assertEqual(work(idle_sleep=None), 1)
+        self.assertEqual(calls, [1])
+
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, Job.Status.FAILED)
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual(exhausted.locked_by, "")
+        self.assertIn("Worker died", exhausted.last_error)
+
+    def test_purge_deletes_only_old_finished_jobs(self):
+        now = timezone.now()
+        old_done = Job.objects.create(task="jobs.tests.record", status=Job.Status.DONE, finished_at=now - timedelta(days=8))
+        recent_done = Job.objects.create(task="jobs.tests.record", status=Job.Status.DONE, finished_at=now)
+        failed = Job.objects.create(task="jobs.tests.flaky", status=Job.Status.FAILED, finished_at=now - timedelta(days=8))
+        pending = Job.objects.create(task="jobs.tests.record", run_at=now - timedelta(days=8))
+
+        self.assertEqual(purge_finished(done_days=7, failed_days=30, batch_size=1), 1)
+        self.assertEqual(
+            set(Job.objects.values_list("id", flat=True)),
+            {recent_done.id, failed.id, pending.id},
+        )
+        self.assertFalse(Job.objects.filter(id=old_done.id).exists())
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode_runs_at_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.delay("now")
+        self.assertEqual(calls, ["now"])
+        self.assertFalse(Job.objects.exists())
+
+
+class PasswordResetJobTests(TestCase):
+    @mock.patch("apps.authentication.services.PasswordResetService.send_reset_email")
+    def test_reset_request_queues_the_email(self, send_reset_email):
+        user = get_user_model().objects.create_user(email="reset@example.com", username="reset", password="x")
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/auth/password/reset/request/", {"email": "reset@example.com"})
+        self.assertEqual(response.status_code, 200)
+        send_reset_email.assert_not_called()
+
+        work(idle_sleep=None)
+        send_reset_email.assert_called_once()
+        self.assertEqual(send_reset_email.call_args.args[0], user)
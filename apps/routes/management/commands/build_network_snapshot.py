@@ -0,0 +1,26 @@
+# apps/routes/management/commands/build_network_snapshot.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.routes.services.network_snapshot import NetworkSnapshot
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped route network snapshot that worker processes attach to"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=settings.NETWORK_SNAPSHOT_PATH,
+            help="Where to write the snapshot (default: NETWORK_SNAPSHOT_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            snapshot = NetworkSnapshot.build()
+            snapshot.write(options["path"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {len(snapshot.stations)} stations and {snapshot.edge_count} edges to {options['path']}"
+            ))
+        except OSError as e:
+            self.stdout.write(self.style.ERROR(f"Could not write snapshot: {str(e)}"))
@@ -2,7 +2,7 @@
 
 from django.core.management.base import BaseCommand
 from django.db import connection
-from django.core.cache import cache
+from django.core.cache import caches
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ def handle(self, *args, **options):
 
         # Clear cache first
         self.stdout.write('Clearing cache...')
-        cache.clear()
+        caches['routes'].clear()
 
         # Drop PrecomputedRoute table and related objects
         with connection.cursor() as cursor:
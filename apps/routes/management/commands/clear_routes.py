@@ -2,7 +2,7 @@
 
 from django.core.management.base import BaseCommand
 from apps.routes.models import Route
-from django.core.cache import cache
+from django.core.cache import caches
 from django.db import transaction
 
 
@@ -16,7 +16,7 @@ def handle(self, *args, **options):
                 count = Route.objects.count()
                 Route.objects.all().delete()
                 # Clear cache
-                cache.clear()
+                caches['routes'].clear()
 
                 self.stdout.write(
                     self.style.SUCCESS(
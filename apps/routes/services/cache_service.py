@@ -1,6 +1,6 @@
 # apps/routes/services/cache_service.py
 
-from django.core.cache import cache
+from django.core.cache import caches
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,7 +21,7 @@ def get_cached_route(start_station_id, end_station_id):
         cached_route = cache.get(cache_key)
         """
         cache_key = CacheService._generate_cache_key(start_station_id, end_station_id)
-        cached_route = cache.get(cache_key)
+        cached_route = caches['routes'].get(cache_key)
         if cached_route:
             logger.info(f"Cache hit for route: {cache_key}")
         else:
@@ -35,7 +35,7 @@ def cache_route(start_station_id, end_station_id, route_data, timeout=3600):
         """
         cache_key = CacheService._generate_cache_key(start_station_id, end_station_id)
         try:
-            cache.set(cache_key, route_data, timeout)
+            caches['routes'].set(cache_key, route_data, timeout)
             logger.info(f"Route cached successfully: {cache_key}")
         except Exception as e:
             logger.error(f"Failed to cache route: {cache_key}. Error: {str(e)}")
@@ -49,7 +49,7 @@ def delete_cached_route(start_station_id, end_station_id):
         :param end_station_id: ID of the destination station.
         """
         cache_key = CacheService._generate_cache_key(start_station_id, end_station_id)
-        cache.delete(cache_key)
+        caches['routes'].delete(cache_key)
 
     @staticmethod
     def clear_routes_for_stations(*stations):
@@ -71,14 +71,14 @@ def clear_routes_for_stations(*stations):
                     cache_keys.append(CacheService._generate_cache_key(start_station, end_station))
 
         # Bulk delete cache entries
-        cache.delete_many(cache_keys)
+        caches['routes'].delete_many(cache_keys)
 
     @staticmethod
     def clear_all_routes():
         """
         Clears all cached routes.
         """
-        cache.clear()
+        caches['routes'].clear()
 
     @staticmethod
     def _generate_cache_key(start_station_id, end_station_id, line_id=None):
@@ -0,0 +1,269 @@
+# apps/routes/services/network_snapshot.py
+"""
+Read-only snapshot of the metro network shared by all worker processes.
+
+The route graph used to be rebuilt from the database by every worker after
+fork (one query per interchange station plus a geodesic call per edge). The
+snapshot is built once, written to ``settings.NETWORK_SNAPSHOT_PATH`` and
+memory-mapped by every process on the node, so the edge arrays live once in
+the page cache no matter how many workers attach to them.
+
+File layout (native byte order)::
+
+    8s  magic
+    Q   header length
+    ... JSON header (stations, lines, line orders, fingerprint), space padded
+    d * edge_count   edge distances in meters
+    q * edge_count   edge source station ids
+    q * edge_count   edge destination station ids
+    q * edge_count   edge line ids
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from geopy.distance import geodesic
+
+from apps.stations.models import Line, LineStation, Station
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'MNSNAP01'
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct('<8sQ')
+
+
+class NetworkSnapshot:
+    """Stations, lines, line orders and precomputed edges of the metro network"""
+
+    __slots__ = (
+        'fingerprint', 'stations', 'lines', 'line_orders', 'station_lines',
+        'edge_src', 'edge_dst', 'edge_line', 'edge_distance', 'path', '_buffer',
+    )
+
+    def __init__(self, header, edge_src, edge_dst, edge_line, edge_distance, path=None, buffer=None):
+        self.fingerprint = header['fingerprint']
+        self.stations = {int(row[0]): (row[1], row[2], row[3]) for row in header['stations']}
+        self.lines = {int(row[0]): (row[1], row[2]) for row in header['lines']}
+        self.line_orders = {int(line_id): tuple(ids) for line_id, ids in header['line_orders'].items()}
+
+        station_lines = defaultdict(set)
+        for line_id, station_ids in self.line_orders.items():
+            for station_id in station_ids:
+                station_lines[station_id].add(line_id)
+        self.station_lines = {station_id: frozenset(ids) for station_id, ids in station_lines.items()}
+
+        self.edge_src = edge_src
+        self.edge_dst = edge_dst
+        self.edge_line = edge_line
+        self.edge_distance = edge_distance
+        self.path = path
+        self._buffer = buffer  # Keeps the mapping alive while the views are in use
+
+    @property
+    def edge_count(self):
+        return len(self.edge_src)
+
+    @property
+    def is_mapped(self):
+        return self._buffer is not None
+
+    def edges(self):
+        """Iterate (source id, destination id, line id, distance) tuples"""
+        return zip(self.edge_src, self.edge_dst, self.edge_line, self.edge_distance)
+
+    def _header(self):
+        return {
+            'format': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'fingerprint': self.fingerprint,
+            'edge_count': self.edge_count,
+            'stations': [[station_id, *values] for station_id, values in self.stations.items()],
+            'lines': [[line_id, *values] for line_id, values in self.lines.items()],
+            'line_orders': {str(line_id): list(ids) for line_id, ids in self.line_orders.items()},
+        }
+
+    @staticmethod
+    def fingerprint_database() -> str:
+        """Cheap signature of the network tables, used to spot stale snapshot files"""
+        stations = Station.objects.aggregate(count=Count('id'), last=Max('id'))
+        line_stations = LineStation.objects.aggregate(count=Count('id'), last=Max('id'), orders=Sum('order'))
+        return ':'.join(str(value or 0) for value in (
+            stations['count'], stations['last'],
+            line_stations['count'], line_stations['last'], line_stations['orders'],
+        ))
+
+    @classmethod
+    def build(cls, fingerprint: Optional[str] = None) -> 'NetworkSnapshot':
+        """Build the snapshot from the database in three queries"""
+        fingerprint = fingerprint or cls.fingerprint_database()
+        stations = {
+            station_id: (name, latitude, longitude)
+            for station_id, name, latitude, longitude in Station.objects.values_list(
+                'id', 'name', 'latitude', 'longitude'
+            )
+        }
+        lines = {line_id: (name, color) for line_id, name, color in Line.objects.values_list('id', 'name', 'color_code')}
+        rows = list(LineStation.objects.order_by('line_id', 'order').values_list('line_id', 'station_id', 'order'))
+
+        line_orders = defaultdict(list)
+        station_lines = defaultdict(set)
+        for line_id, station_id, _ in rows:
+            line_orders[line_id].append(station_id)
+            station_lines[station_id].add(line_id)
+
+        distances = {}
+
+        def distance(a, b):
+            key = (a, b) if a < b else (b, a)
+            if key not in distances:
+                distances[key] = geodesic(stations[a][1:], stations[b][1:]).meters
+            return distances[key]
+
+        # (source, destination) -> (line id, distance), in insertion order
+        edges = {}
+        for line_id, station_ids in line_orders.items():
+            for current, following in zip(station_ids, station_ids[1:]):
+                edges[(current, following)] = (line_id, distance(current, following))
+                edges[(following, current)] = (line_id, distance(current, following))
+
+        # Interchanges connect to every station on their lines that does not
+        # already reach them, walking the rows in stop order like the
+        # per-station queries this replaces
+        rows_by_order = sorted(rows, key=lambda row: row[2])
+        for station_id, line_ids in station_lines.items():
+            if len(line_ids) < 2:
+                continue
+            for line_id, other_id, _ in rows_by_order:
+                if line_id in line_ids and other_id != station_id and (other_id, station_id) not in edges:
+                    edges[(station_id, other_id)] = (line_id, distance(station_id, other_id))
+
+        header = {
+            'fingerprint': fingerprint,
+            'stations': [[station_id, *values] for station_id, values in stations.items()],
+            'lines': [[line_id, *values] for line_id, values in lines.items()],
+            'line_orders': {str(line_id): ids for line_id, ids in line_orders.items()},
+        }
+        return cls(
+            header,
+            edge_src=array('q', (src for src, _ in edges)),
+            edge_dst=array('q', (dst for _, dst in edges)),
+            edge_line=array('q', (line_id for line_id, _ in edges.values())),
+            edge_distance=array('d', (value for _, value in edges.values())),
+        )
+
+    def write(self, path: str):
+        """Write the snapshot atomically, readers never see a partial file"""
+        header = json.dumps(self._header()).encode()
+        header += b' ' * (-len(header) % 8)  # Keep the float array 8-byte aligned
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, prefix='.snapshot-', delete=False) as tmp:
+            tmp.write(_PREFIX.pack(MAGIC, len(header)))
+            tmp.write(header)
+            array('d', self.edge_distance).tofile(tmp)
+            for values in (self.edge_src, self.edge_dst, self.edge_line):
+                array('q', values).tofile(tmp)
+        os.replace(tmp.name, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'NetworkSnapshot':
+        """
+        Map a snapshot file read-only
+
+        The edge arrays are memoryviews over the mapping, nothing is copied.
+
+        Raises:
+            ValueError: If the file is not a snapshot of this format
+        """
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = _PREFIX.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a network snapshot")
+
+        offset = _PREFIX.size
+        header = json.loads(buffer[offset:offset + header_length])
+        if header['format'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written in an incompatible format")
+        offset += header_length
+
+        count = header['edge_count']
+        view = memoryview(buffer)
+        arrays = []
+        for code, size in (('d', 8), ('q', 8), ('q', 8), ('q', 8)):
+            arrays.append(view[offset:offset + count * size].cast(code))
+            offset += count * size
+        if offset > len(buffer):
+            raise ValueError(f"{path} is truncated")
+
+        edge_distance, edge_src, edge_dst, edge_line = arrays
+        return cls(header, edge_src, edge_dst, edge_line, edge_distance, path=path, buffer=buffer)
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _snapshot_path():
+    return getattr(settings, 'NETWORK_SNAPSHOT_PATH', None)
+
+
+def _attach_or_build():
+    path = _snapshot_path()
+    fingerprint = NetworkSnapshot.fingerprint_database()
+
+    if path and os.path.exists(path):
+        try:
+            snapshot = NetworkSnapshot.load(path)
+            if snapshot.fingerprint == fingerprint:
+                logger.info(f"Attached network snapshot {path} ({snapshot.edge_count} edges)")
+                return snapshot
+            logger.info(f"Network snapshot {path} is stale, rebuilding")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load network snapshot {path}: {str(e)}")
+
+    snapshot = NetworkSnapshot.build(fingerprint)
+    if path:
+        try:
+            snapshot.write(path)
+            # Map the file we just wrote so this process shares its pages too
+            return NetworkSnapshot.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write network snapshot {path}: {str(e)}")
+    return snapshot
+
+
+def get_network_snapshot() -> NetworkSnapshot:
+    """Return this process's snapshot, attaching to the shared file or building it"""
+    global _snapshot
+    if _snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = _attach_or_build()
+    return _snapshot
+
+
+def discard_network_snapshot():
+    """Drop the snapshot after network edits so the next use rebuilds it"""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+        path = _snapshot_path()
+        if path:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,95 +1,36 @@
 # apps/routes/services/route_service.py
 
+import logging
 from typing import Dict, Optional
-from venv import logger
-from geopy.distance import geodesic
 from collections import defaultdict
 from apps.stations.models import Line, Station, LineStation
 from .cache_service import CacheService
+from .network_snapshot import NetworkSnapshot, get_network_snapshot
+
+logger = logging.getLogger(__name__)
 
 
 class MetroRouteService:
-    def __init__(self):
+    def __init__(self, snapshot: Optional[NetworkSnapshot] = None):
         self.graph = defaultdict(dict)
         self.station_lines = defaultdict(set)
         self.cache_service = CacheService()
-        self.build_graph()
-
-    def _calculate_distance(self, station1: Station, station2: Station) -> float:
-        """Calculate the distance between two stations in meters"""
-        return geodesic(
-            (station1.latitude, station1.longitude),
-            (station2.latitude, station2.longitude)
-        ).meters
-
-    def build_graph(self):
-        """Build an optimized graph representation of the metro network"""
-        line_stations = LineStation.objects.select_related(
-            'station', 'line'
-        ).order_by('line', 'order')
-
-        current_line = None
-        line_stations_list = []
-
-        for ls in line_stations:
-            self.station_lines[ls.station.id].add(ls.line.id)
+        self.build_graph(snapshot or get_network_snapshot())
 
-            if current_line != ls.line:
-                if line_stations_list:
-                    self._connect_sequential_stations(line_stations_list)
-                line_stations_list = []
-                current_line = ls.line
+    def build_graph(self, snapshot: NetworkSnapshot):
+        """Build the graph representation of the metro network from the shared snapshot"""
+        for station_id, line_ids in snapshot.station_lines.items():
+            self.station_lines[station_id].update(line_ids)
 
-            line_stations_list.append(ls)
-
-        if line_stations_list:
-            self._connect_sequential_stations(line_stations_list)
-
-        self._add_interchange_connections()
-
-    def _connect_sequential_stations(self, line_stations):
-        """Connect sequential stations on the same line"""
-        for i in range(len(line_stations) - 1):
-            current = line_stations[i]
-            next_station = line_stations[i + 1]
-            distance = self._calculate_distance(current.station, next_station.station)
-
-            self.graph[current.station.id][next_station.station.id] = {
-                'distance': distance,
-                'line_id': current.line.id,
-                'line_name': current.line.name,
-                'line_color': current.line.color_code
-            }
-            # Add reverse connection for bidirectional travel
-            self.graph[next_station.station.id][current.station.id] = {
+        for src, dst, line_id, distance in snapshot.edges():
+            line_name, line_color = snapshot.lines[line_id]
+            self.graph[src][dst] = {
                 'distance': distance,
-                'line_id': current.line.id,
-                'line_name': current.line.name,
-                'line_color': current.line.color_code
+                'line_id': line_id,
+                'line_name': line_name,
+                'line_color': line_color
             }
 
-    def _add_interchange_connections(self):
-        """Add connections between stations that share multiple lines"""
-        for station_id, lines in self.station_lines.items():
-            if len(lines) > 1:
-                connected_stations = LineStation.objects.filter(
-                    line_id__in=lines
-                ).exclude(
-                    station_id=station_id
-                ).select_related('station', 'line')
-
-                for cs in connected_stations:
-                    if station_id not in self.graph[cs.station.id]:
-                        station = Station.objects.get(id=station_id)
-                        distance = self._calculate_distance(station, cs.station)
-
-                        self.graph[station_id][cs.station.id] = {
-                            'distance': distance,
-                            'line_id': cs.line.id,
-                            'line_name': cs.line.name,
-                            'line_color': cs.line.color_code
-                        }
-
     def find_route(self, start_id: int, end_id: int) -> Optional[Dict]:
         """Find the optimal route between two stations"""
         try:
@@ -103,13 +44,6 @@ def find_route(self, start_id: int, end_id: int) -> Optional[Dict]:
         if cached_route:
             return cached_route
 
-        # Ensure both stations exist
-        try:
-            Station.objects.get(id=start_id)
-            Station.objects.get(id=end_id)
-        except Station.DoesNotExist:
-            return None
-
         # Calculate new route
         route_data = self._calculate_route(start_id, end_id)
 
@@ -145,30 +79,27 @@ def _get_direct_route(self, start_station: Station, end_station: Station, line:
         start_order = start_station.get_station_order(line)
         end_order = end_station.get_station_order(line)
 
-        # Get all stations in order
-        stations = []
-        if start_order < end_order:
-            for order in range(start_order, end_order + 1):
-                station = Station.objects.get(
-                    station_lines__line=line,
-                    station_lines__order=order
-                )
-                stations.append({
-                    'station': station.name,
-                    'line': line.name,
-                    'line_color': line.color_code
-                })
-        else:
-            for order in range(start_order, end_order - 1, -1):
-                station = Station.objects.get(
-                    station_lines__line=line,
-                    station_lines__order=order
-                )
-                stations.append({
-                    'station': station.name,
-                    'line': line.name,
-                    'line_color': line.color_code
-                })
+        # Load the whole stretch in one query instead of one per stop
+        low, high = sorted((start_order, end_order))
+        rows = LineStation.objects.filter(
+            line=line,
+            order__range=(low, high)
+        ).values_list('order', 'station__name')
+        names = dict(rows)
+
+        # Every stop in between must exist exactly once
+        if len(rows) != high - low + 1 or len(names) != len(rows):
+            raise Station.DoesNotExist("Station matching query does not exist.")
+
+        step = 1 if start_order < end_order else -1
+        stations = [
+            {
+                'station': names[order],
+                'line': line.name,
+                'line_color': line.color_code
+            }
+            for order in range(start_order, end_order + step, step)
+        ]
 
         return {
             'path': stations,
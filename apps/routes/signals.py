@@ -0,0 +1,26 @@
+# apps/routes/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.stations.models import Line, Station, LineStation
+from metro.prerender import bump_scope
+from metro.registry import registry
+from .services.network_snapshot import discard_network_snapshot
+
+
+def _rebuild_network():
+    discard_network_snapshot()
+    registry.reset('route_service')
+    bump_scope('network')
+
+
+@receiver([post_save, post_delete], sender=Line)
+@receiver([post_save, post_delete], sender=Station)
+@receiver([post_save, post_delete], sender=LineStation)
+def refresh_network_snapshot(sender, instance, **kwargs):
+    """Drop the network snapshot, route graph and pre-rendered network payloads after edits"""
+    if kwargs.get("raw", False):
+        return
+    transaction.on_commit(_rebuild_network)
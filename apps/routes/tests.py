@@ -0,0 +1,63 @@
+# apps/routes/tests.py
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from apps.stations.management.commands.populate_metro_data import Command as MetroDataCommand
+from apps.stations.models import Station
+from .services import network_snapshot
+from .services.network_snapshot import NetworkSnapshot, get_network_snapshot
+from .services.route_service import MetroRouteService
+
+
+class NetworkSnapshotTests(TestCase):
+    def setUp(self):
+        MetroDataCommand().handle()
+        self.path = os.path.join(tempfile.mkdtemp(), "network.snapshot")
+        network_snapshot._snapshot = None
+
+    def tearDown(self):
+        network_snapshot._snapshot = None
+
+    def test_mapped_snapshot_matches_built_one(self):
+        built = NetworkSnapshot.build()
+        built.write(self.path)
+        mapped = NetworkSnapshot.load(self.path)
+
+        self.assertTrue(mapped.is_mapped)
+        self.assertEqual(mapped.fingerprint, built.fingerprint)
+        self.assertEqual(mapped.stations, built.stations)
+        self.assertEqual(mapped.line_orders, built.line_orders)
+        self.assertEqual(list(mapped.edges()), list(built.edges()))
+
+    def test_route_service_graph_from_snapshot(self):
+        NetworkSnapshot.build().write(self.path)
+        service = MetroRouteService(NetworkSnapshot.load(self.path))
+
+        start = Station.objects.get(name="Helwan")
+        end = Station.objects.get(name="Attaba")
+        self.assertIn(end.id, service.graph)
+        self.assertEqual(len(service.station_lines[end.id]), 2)
+        self.assertIsNotNone(service.find_route(start.id, end.id))
+
+    def test_get_network_snapshot_attaches_file(self):
+        with override_settings(NETWORK_SNAPSHOT_PATH=self.path):
+            snapshot = get_network_snapshot()
+            self.assertTrue(os.path.exists(self.path))
+            self.assertTrue(snapshot.is_mapped)
+
+            # A second process attaches to the file without rebuilding
+            network_snapshot._snapshot = None
+            with self.assertNumQueries(2):
+                get_network_snapshot()
+
+    def test_stale_snapshot_is_rebuilt(self):
+        with override_settings(NETWORK_SNAPSHOT_PATH=self.path):
+            stale = get_network_snapshot()
+            Station.objects.create(name="Test Station", latitude=30.0, longitude=31.0)
+
+            network_snapshot._snapshot = None
+            fresh = get_network_snapshot()
+            self.assertNotEqual(fresh.fingerprint, stale.fingerprint)
+            self.assertIn(Station.objects.get(name="Test Station").id, fresh.stations)
@@ -2,7 +2,7 @@
 
 from rest_framework import views, status
 from rest_framework.response import Response
-from .services.route_service import MetroRouteService
+from metro.registry import LazyService
 from .models import Route
 from apps.stations.models import Station
 from django.core.exceptions import ValidationError
@@ -22,7 +22,8 @@ class RouteView(views.APIView):
         num_stations (int): Number of stations in the route
         interchanges (list): List of interchange points
     """
-    route_service = MetroRouteService()
+    route_service = LazyService('route_service')
+    query_budget = 8
 
     def get(self, request):
         try:
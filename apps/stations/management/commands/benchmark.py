@@ -0,0 +1,141 @@
+# apps/stations/management/commands/benchmark.py
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from metro.benchmarks import SCENARIOS, compare_results, run_scenario, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark route finding, nearest station, gates, wallet purchase, dashboard analytics "
+        "and export on a throwaway test database seeded with the real network"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+        parser.add_argument("--iterations", type=int, default=50, help="Timed runs per scenario")
+        parser.add_argument("--users", type=int, default=200, help="Users to seed")
+        parser.add_argument("--tickets-per-user", type=int, default=5, help="Tickets to seed per user")
+        parser.add_argument("--transactions-per-user", type=int, default=10, help="Transactions to seed per user")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, keep it fixed to compare runs")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--compare", help="Baseline JSON results to compare against")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.10,
+            help="Median slowdown counted as a regression (default: 0.10 = 10%%)",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a scenario regressed past the threshold",
+        )
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def _scratch_settings(directory):
+        """
+        Caches, network snapshot and metrics dumps of the run, all private
+        to it, so the benchmark neither reads nor clears the live ones
+        """
+        cache_settings = {}
+        for alias, config in settings.CACHES.items():
+            if config["BACKEND"] == "metro.cache.TieredCache":
+                cache_settings[alias] = config  # Its LOCATION is another alias, replaced below
+            else:
+                cache_settings[alias] = {
+                    "BACKEND": "metro.cache.InstrumentedLocMemCache",
+                    "LOCATION": f"benchmark-{alias}",
+                }
+        return {
+            "CACHES": cache_settings,
+            "NETWORK_SNAPSHOT_PATH": os.path.join(directory, "network.snapshot"),
+            "METRICS_DIR": os.path.join(directory, "metrics"),
+        }
+
+    def handle(self, *args, **options):
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        gate_runs = options["iterations"] + 3
+        if "gate_entry_exit" in names and options["users"] * options["tickets_per_user"] < gate_runs:
+            raise CommandError(f"gate_entry_exit needs at least {gate_runs} seeded tickets")
+
+        # Never touch the configured database, caches or files: seed a test
+        # database and point caches and shared files at a scratch directory
+        with tempfile.TemporaryDirectory() as scratch, override_settings(**self._scratch_settings(scratch)):
+            old_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                for backend in caches.all():
+                    backend.clear()
+                self.stdout.write("Seeding benchmark data...")
+                data = seed(
+                    users=options["users"],
+                    tickets_per_user=options["tickets_per_user"],
+                    transactions_per_user=options["transactions_per_user"],
+                    seed_value=options["seed"],
+                )
+
+                results = {
+                    "commit": self._git_commit(),
+                    "timestamp": timezone.now().isoformat(),
+                    "database": connection.vendor,
+                    "python": platform.python_version(),
+                    "seed": options["seed"],
+                    "data": data.sizes,
+                    "scenarios": {},
+                }
+                for name in names:
+                    results["scenarios"][name] = run_scenario(name, data, iterations=options["iterations"])
+                    result = results["scenarios"][name]
+                    self.stdout.write(
+                        f"{name:<22} median {result['median_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                        f"{result['ops_per_sec'] or 0:>9.1f} ops/s  {result['queries_per_op']:>6.1f} queries/op  {result['errors']} errors"
+                    )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        else:
+            sys.stdout.write(json.dumps(results) + "\n")
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            regressions = []
+            self.stdout.write(f"\nCompared with {baseline.get('commit') or options['compare']}:")
+            for name, before, after, change, regressed in compare_results(baseline, results, options["threshold"]):
+                line = f"{name:<22} {before:>9.2f}ms -> {after:>9.2f}ms  {change:+.1%}"
+                self.stdout.write(self.style.ERROR(line) if regressed else line)
+                if regressed:
+                    regressions.append(name)
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"Regressed: {', '.join(regressions)}")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed"))
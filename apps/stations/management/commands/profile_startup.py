@@ -0,0 +1,90 @@
+# apps/stations/management/commands/profile_startup.py
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so nothing is already imported
+STARTUP_SCRIPT = """
+import json, time
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings = {}
+if WARM_UP:
+    from metro.registry import registry
+    timings = registry.warm_up()
+print(json.dumps(timings))
+"""
+
+
+class Command(BaseCommand):
+    help = "Report import time per app for a cold process start (django.setup() plus URL import)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of packages to list",
+        )
+        parser.add_argument(
+            "--warm-up",
+            action="store_true",
+            help="Also build the registry services and report their build times",
+        )
+
+    @staticmethod
+    def _group(module):
+        parts = module.strip().split(".")
+        if parts[0] == "apps" and len(parts) > 1:
+            return f"apps.{parts[1]}"
+        return parts[0]
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT.replace("WARM_UP", str(options["warm_up"]))
+
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        elapsed = time.perf_counter() - started
+
+        if result.returncode != 0:
+            self.stdout.write(self.style.ERROR(f"Startup failed:\n{result.stderr[-2000:]}"))
+            return
+
+        # Lines look like: "import time:       120 |        450 |   apps.tickets.models"
+        per_group = defaultdict(int)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            fields = line[len("import time:"):].split("|")
+            try:
+                self_us = int(fields[0])
+            except ValueError:
+                continue  # Header line
+            per_group[self._group(fields[2])] += self_us
+
+        total_ms = sum(per_group.values()) / 1000
+        self.stdout.write(f"Cold start: {elapsed * 1000:.0f}ms wall, {total_ms:.0f}ms in imports\n")
+        self.stdout.write(f"{'package':<30} {'import ms':>10} {'share':>7}")
+        for group, self_us in sorted(per_group.items(), key=lambda item: item[1], reverse=True)[:options["limit"]]:
+            share = (self_us / 1000) / total_ms * 100 if total_ms else 0
+            self.stdout.write(f"{group:<30} {self_us / 1000:>10.1f} {share:>6.1f}%")
+
+        if options["warm_up"]:
+            timings = json.loads(result.stdout.strip().splitlines()[-1] or "{}")
+            self.stdout.write("\nService warm-up:")
+            for name, ms in timings.items():
+                self.stdout.write(f"{name:<30} {ms:>10.1f}")
+
+        self.stdout.write(self.style.SUCCESS("Startup profile completed"))
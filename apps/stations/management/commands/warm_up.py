@@ -0,0 +1,24 @@
+# apps/stations/management/commands/warm_up.py
+from django.core.management.base import BaseCommand
+
+from metro.registry import registry
+
+
+class Command(BaseCommand):
+    help = "Build the lazily created services (route graph, subscription and ticket services) and report timings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "services",
+            nargs="*",
+            help="Service names to build (default: all registered)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            timings = registry.warm_up(options["services"] or None)
+            for name, ms in timings.items():
+                self.stdout.write(f"{name}: {ms}ms")
+            self.stdout.write(self.style.SUCCESS("Services warmed up"))
+        except KeyError as e:
+            self.stdout.write(self.style.ERROR(f"Unknown service: {e}"))
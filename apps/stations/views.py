@@ -10,7 +10,8 @@
 from rest_framework.exceptions import APIException  # Import APIException for custom exceptions
 from django.db import DatabaseError     # Import DatabaseError for database exceptions
 from django.db.models import Q  # Import Q for complex queries
-from apps.routes.services.route_service import MetroRouteService
+from metro.prerender import prerendered, scope_version
+from metro.registry import registry
 from apps.stations.models import Station  # Import the Station model
 from .serializers import StationSerializer  # Import the StationSerializer
 from .pagination import StandardResultsSetPagination  # Import the pagination class
@@ -29,6 +30,13 @@ class StationListView(generics.ListAPIView):
     serializer_class = StationSerializer  # Use the StationSerializer
     pagination_class = StandardResultsSetPagination  # Apply pagination
     permission_classes = [AllowAny]  # Allow access
+    query_budget = 5
+
+    @prerendered(
+        'stations', version=lambda: scope_version('network'), vary=('page', 'page_size', 'search', 'ordering')
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
         """
@@ -71,6 +79,7 @@ class TripDetailsView(APIView):
     """
 
     permission_classes = [AllowAny]  # Public access
+    query_budget = 30  # Cold route cache; cached trips run about 4
 
     def get(self, request, start_station_id, end_station_id):
         try:
@@ -79,7 +88,7 @@ def get(self, request, start_station_id, end_station_id):
             end_station = get_object_or_404(Station, id=end_station_id)
 
             # Get route
-            route_service = MetroRouteService()
+            route_service = registry.get('route_service')
             route_data = route_service.find_route(start_station_id, end_station_id)
 
             if not route_data:
@@ -127,6 +136,7 @@ class NearestStationView(APIView):
     """
 
     permission_classes = [AllowAny]  # Public access
+    query_budget = 3
 
     def get(self, request):
         return self._get_nearest_station(request)
@@ -7,6 +7,7 @@
 from rangefilter.filters import DateRangeFilter
 
 from ..models.subscription import UserSubscription, SubscriptionPlan
+from ..services.entitlement_service import SubscriptionEntitlementService
 
 
 class IsActiveFilter(admin.SimpleListFilter):
@@ -299,20 +300,26 @@ def extend_subscription(self, request, queryset):
 
     def cancel_subscriptions(self, request, queryset):
         """Bulk action to cancel selected subscriptions"""
-        cancelled = queryset.filter(status='ACTIVE').update(
+        active = queryset.filter(status='ACTIVE')
+        user_ids = list(active.values_list('user_id', flat=True))
+        cancelled = active.update(
             status='CANCELLED',
             updated_at=timezone.now()
         )
+        SubscriptionEntitlementService.invalidate(user_ids)
         message = "Successfully cancelled {} subscription(s).".format(cancelled)
         self.message_user(request, message, messages.SUCCESS)
     cancel_subscriptions.short_description = "Cancel selected subscriptions"
 
     def mark_as_expired(self, request, queryset):
         """Bulk action to mark selected subscriptions as expired"""
-        expired = queryset.filter(status='ACTIVE').update(
+        active = queryset.filter(status='ACTIVE')
+        user_ids = list(active.values_list('user_id', flat=True))
+        expired = active.update(
             status='EXPIRED',
             updated_at=timezone.now()
         )
+        SubscriptionEntitlementService.invalidate(user_ids)
         message = "Marked {} subscription(s) as expired.".format(expired)
         self.message_user(request, message, messages.SUCCESS)
     mark_as_expired.short_description = "Mark selected subscriptions as expired"
@@ -325,4 +332,5 @@ def save_model(self, request, obj, form, change):
                 user=obj.user,
                 status='ACTIVE'
             ).update(status='CANCELLED')
+            SubscriptionEntitlementService.invalidate([obj.user_id])
         super().save_model(request, obj, form, change)
@@ -42,9 +42,8 @@ def post(self, request, format=None):
             ticket = Ticket.objects.select_for_update().get(ticket_number=ticket_number)
 
             # Check expiration
+            # Status is flipped by the expire_tickets sweeper, the gate only rejects
             if ticket.valid_until < timezone.now() and ticket.status == 'ACTIVE':
-                ticket.status = 'EXPIRED'
-                ticket.save(update_fields=['status'])
                 return Response({
                     'is_valid': False,
                     'message': 'Ticket has expired'
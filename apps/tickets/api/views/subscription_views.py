@@ -13,16 +13,26 @@
     SubscriptionValidationSerializer
 )
 from ...models.subscription import UserSubscription
-from ...services.subscription_service import SubscriptionService
+from metro.prerender import content_version, prerendered, scope_version
+from metro.registry import LazyService
 from ...services.subscription_qr_service import SubscriptionQRService
 from .wallet_integration import WalletSubscriptionMixin
+from ...constants.pricing import SubscriptionPricing
+from ...services.zone_index import get_zone_index
+
+PRICING_VERSION = content_version(SubscriptionPricing.MONTHLY, SubscriptionPricing.QUARTERLY, SubscriptionPricing.ANNUAL)
+
+
+def _recommendation_version():
+    return f"{PRICING_VERSION}.{scope_version('network')}.{get_zone_index().version}"
 
 
 class SubscriptionViewSet(WalletSubscriptionMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    subscription_service = SubscriptionService()
+    subscription_service = LazyService('subscription_service')
     qr_service = SubscriptionQRService()
     http_method_names = ['get', 'post', 'patch']
+    query_budget = {'list': 3, 'retrieve': 3}
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -57,6 +67,12 @@ def get_queryset(self):
         return queryset.select_related('user', 'plan')
 
     @action(detail=False, methods=['get'])
+    @prerendered(
+        'subscription-recommendations',
+        version=_recommendation_version,
+        vary=('start_station_id', 'end_station_id'),
+        public=False,
+    )
     def recommend(self, request):
         """Get subscription recommendations for a journey"""
         serializer = SubscriptionRecommendationSerializer(data=request.query_params)
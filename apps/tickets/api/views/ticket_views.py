@@ -11,7 +11,9 @@
     TicketSerializer,
 )
 from ...models.ticket import Ticket
-from ...services.ticket_service import TicketService
+from metro.prerender import content_version, prerendered
+from metro.query_budget import max_queries
+from metro.registry import LazyService
 from ...services.validation_service import ValidationService
 from .wallet_integration import WalletTicketMixin
 
@@ -19,9 +21,10 @@
 class TicketViewSet(WalletTicketMixin, viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     permission_classes = [AllowAny]
-    ticket_service = TicketService()
+    ticket_service = LazyService('ticket_service')
     http_method_names = ['get', 'post', 'patch']
     queryset = Ticket.objects.none()
+    query_budget = {'list': 5, 'retrieve': 4}
 
     def get_queryset(self):
         """Get and filter tickets for the current user with automatic expiry handling"""
@@ -69,6 +72,7 @@ def sync_tickets(self, request):
         }, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'], url_path='dashboard')
+    @max_queries(5)
     def dashboard(self, request):
         """Get user's ticket dashboard summary"""
         now = timezone.now()
@@ -105,6 +109,8 @@ def dashboard(self, request):
         })
 
     @action(detail=False, methods=['get'], url_path='types')
+    @max_queries(2)
+    @prerendered('ticket-types', version=content_version(TicketChoices.TICKET_TYPES))
     def types(self, request):
         """Get ticket types"""
         return Response({
@@ -238,9 +244,8 @@ def validate_scan(self, request):
             ticket = Ticket.objects.select_for_update().get(ticket_number=ticket_number)
 
             # Check expiration first
+            # Status is flipped by the expire_tickets sweeper, the gate only rejects
             if ticket.valid_until < timezone.now() and ticket.status == 'ACTIVE':
-                ticket.status = 'EXPIRED'
-                ticket.save(update_fields=['status'])
                 return Response({
                     'is_valid': False,
                     'message': 'Ticket has expired'
@@ -2,6 +2,7 @@
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.wallet.utils.decorators import idempotent
 from apps.wallet.services.integration_service import (
     TicketIntegrationService,
     SubscriptionIntegrationService
@@ -12,6 +13,7 @@ class WalletTicketMixin:
     """Mixin to add wallet payment functionality to ticket views"""
 
     @action(detail=False, methods=['post'], url_path='purchase-with-wallet')
+    @idempotent('tickets.purchase_with_wallet')
     def purchase_with_wallet(self, request):
         """Purchase a ticket using wallet balance"""
         ticket_type = request.data.get('ticket_type')
@@ -58,6 +60,7 @@ def purchase_with_wallet(self, request):
             }, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'], url_path='upgrade-with-wallet')
+    @idempotent('tickets.upgrade_with_wallet')
     def upgrade_with_wallet(self, request, pk=None):
         """Upgrade a ticket using wallet balance"""
         ticket = self.get_object()
@@ -99,6 +102,7 @@ class WalletSubscriptionMixin:
     """Mixin to add wallet payment functionality to subscription views"""
 
     @action(detail=False, methods=['post'], url_path='purchase-with-wallet')
+    @idempotent('subscriptions.purchase_with_wallet')
     def purchase_with_wallet(self, request):
         """Purchase a subscription using wallet balance"""
         subscription_type = request.data.get('subscription_type')
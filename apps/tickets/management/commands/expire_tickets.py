@@ -0,0 +1,37 @@
+# apps/tickets/management/commands/expire_tickets.py
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tickets.services.expiry_service import ExpiryService
+
+
+class Command(BaseCommand):
+    help = "Expire stale tickets and subscriptions in batches (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ExpiryService.DEFAULT_BATCH_SIZE,
+            help="Rows updated per batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count what would be expired",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive number of rows")
+
+        counts = ExpiryService.expire_all(
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+
+        verb = "Would expire" if options["dry_run"] else "Expired"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {counts['tickets']} tickets and {counts['subscriptions']} subscriptions"
+            )
+        )
@@ -0,0 +1,75 @@
+# apps/tickets/management/commands/index_usage.py
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Report how often each index has been used since statistics were last reset, "
+        "with its size and the table's write volume (PostgreSQL statistics views)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tables",
+            nargs="*",
+            default=["tickets_ticket"],
+            help="Tables to report on (default: tickets_ticket)",
+        )
+        parser.add_argument(
+            "--unused",
+            action="store_true",
+            help="Only list non-unique indexes that have never been scanned",
+        )
+
+    def handle(self, *args, **options):
+        tables = options["tables"]
+        if connection.vendor != "postgresql":
+            # No usage counters outside PostgreSQL; the index list still helps review
+            self.stdout.write(self.style.WARNING(
+                f"Index usage statistics need PostgreSQL ({connection.vendor} in use), listing indexes only"
+            ))
+            with connection.cursor() as cursor:
+                for table in tables:
+                    for index in connection.introspection.get_constraints(cursor, table).values():
+                        if index["index"]:
+                            self.stdout.write(f"{table:<28} {', '.join(index['columns'])}")
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT relname, n_tup_ins, n_tup_upd, n_tup_hot_upd, n_tup_del
+                FROM pg_stat_user_tables
+                WHERE relname = ANY(%s)
+                ORDER BY relname
+                """,
+                [tables],
+            )
+            for table, inserts, updates, hot_updates, deletes in cursor.fetchall():
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"{table}: {inserts} inserts, {updates} updates ({hot_updates} HOT), {deletes} deletes"
+                ))
+
+            cursor.execute(
+                """
+                SELECT s.relname, s.indexrelname, s.idx_scan, s.idx_tup_read,
+                       pg_size_pretty(pg_relation_size(s.indexrelid)), i.indisunique
+                FROM pg_stat_user_indexes s
+                JOIN pg_index i ON i.indexrelid = s.indexrelid
+                WHERE s.relname = ANY(%s)
+                ORDER BY s.relname, s.idx_scan DESC
+                """,
+                [tables],
+            )
+            rows = cursor.fetchall()
+
+        self.stdout.write(f"{'index':<48} {'scans':>12} {'tuples read':>14} {'size':>10}")
+        for table, index, scans, tuples_read, size, unique in rows:
+            if options["unused"] and (scans or unique):
+                continue
+            line = f"{index:<48} {scans:>12} {tuples_read:>14} {size:>10}"
+            if not scans and not unique:
+                line = self.style.WARNING(f"{line}  unused")
+            self.stdout.write(line)
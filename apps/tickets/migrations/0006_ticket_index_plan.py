@@ -0,0 +1,96 @@
+# Generated by Django 4.2.18 on 2026-10-19 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tickets", "0005_usersubscription_covered_zones"),
+    ]
+
+    # New indexes are built before the ones they replace are dropped
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(("status__in", ["ACTIVE", "IN_USE"])),
+                fields=["user", "status", "valid_until"],
+                include=("created_at",),
+                name="ticket_user_live_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["user", "status", "-created_at"], name="ticket_user_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(("status", "USED")),
+                fields=["user", "-exit_time"],
+                name="ticket_user_used_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["status", "created_at"], name="ticket_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(("status", "ACTIVE")),
+                fields=["valid_until"],
+                name="ticket_expiry_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_number_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="user_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="valid_until_idx",
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("ACTIVE", "Active"),
+                    ("IN_USE", "In Use"),
+                    ("USED", "Used"),
+                    ("USED_UPGRADED", "Used and Upgraded"),
+                    ("EXPIRED", "Expired"),
+                    ("CANCELLED", "Cancelled"),
+                ],
+                default="ACTIVE",
+                max_length=15,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tickets",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -31,7 +31,8 @@ class Ticket(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='tickets'
+        related_name='tickets',
+        db_index=False  # Covered by the indexes leading with user below
     )
 
     # Ticket Details
@@ -53,8 +54,7 @@ class Ticket(models.Model):
     status = models.CharField(
         max_length=15,
         choices=TicketChoices.STATUS,
-        default='ACTIVE',
-        db_index=True
+        default='ACTIVE'
     )
     color = models.CharField(
         max_length=10,
@@ -107,12 +107,35 @@ class Ticket(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # ticket_number and uuid are looked up through their unique indexes.
+        # Partial indexes only hold ACTIVE/IN_USE (or USED) rows, so they stay
+        # small and most saves of other tickets do not touch them. INCLUDE is
+        # PostgreSQL-only; other databases build the index without it.
         indexes = [
-            models.Index(fields=['ticket_number'], name='ticket_number_idx'),
-            models.Index(fields=['status'], name='ticket_status_idx'),
-            models.Index(fields=['user', 'status'], name='user_status_idx'),
+            # Live tickets of a user: list, sync, dashboard, pending upgrades
+            models.Index(
+                fields=['user', 'status', 'valid_until'],
+                include=['created_at'],
+                condition=models.Q(status__in=['ACTIVE', 'IN_USE']),
+                name='ticket_user_live_idx'
+            ),
+            # A user's tickets in any status, newest first
+            models.Index(fields=['user', 'status', '-created_at'], name='ticket_user_status_idx'),
+            # Recently used tickets on the dashboard
+            models.Index(
+                fields=['user', '-exit_time'],
+                condition=models.Q(status='USED'),
+                name='ticket_user_used_idx'
+            ),
+            # Admin and reports filtering by status over a period
+            models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'),
+            # Expiry sweep (ExpiryService)
+            models.Index(
+                fields=['valid_until'],
+                condition=models.Q(status='ACTIVE'),
+                name='ticket_expiry_idx'
+            ),
             models.Index(fields=['entry_station', 'exit_station'], name='stations_idx'),
-            models.Index(fields=['valid_until'], name='valid_until_idx'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -0,0 +1,143 @@
+# apps/tickets/services/entitlement_service.py
+import logging
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..models.subscription import UserSubscription
+from .zone_index import get_zone_index
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionEntitlementService:
+    """
+    Cached answer to "may this subscriber pass at this station".
+
+    For a user's active subscription we keep a bitset of covered zones and one
+    of covered lines (empty meaning every line). The entry is loaded when the
+    subscription is saved, dropped when it is cancelled, expired or deleted, and
+    checked against the in-memory zone index, so a gate check is a couple of
+    bit operations after one cache read.
+    """
+
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def _cache_key(user_id):
+        return f"subscription_entitlement:{user_id}"
+
+    @staticmethod
+    def _zone_mask(zones):
+        mask = 0
+        for zone in zones or []:
+            mask |= 1 << int(zone)
+        return mask
+
+    @staticmethod
+    def build_entitlement(user_id):
+        """Compute the entitlement of a user's current active subscription from the database"""
+        index = get_zone_index()
+        subscription = UserSubscription.objects.filter(
+            user_id=user_id,
+            status='ACTIVE',
+            end_date__gte=timezone.now().date()
+        ).select_related('plan').order_by('-end_date').first()
+
+        if not subscription:
+            return {'subscription_id': None, 'index_version': index.version}
+
+        plan = subscription.plan
+        if subscription.covered_zones:
+            zones = subscription.covered_zones
+        elif plan.type == 'ANNUAL':
+            # Lines 1 & 2 cover zones 1-9, all lines cover every zone
+            lines = plan.lines or []
+            zones = range(1, 11) if any('Third Line' in line for line in lines) else range(1, 10)
+        else:
+            zones = range(1, (plan.zones or 0) + 1)
+
+        line_mask = index.line_mask(plan.lines or []) if plan.type == 'ANNUAL' else 0
+
+        return {
+            'subscription_id': subscription.id,
+            'plan_type': plan.type,
+            'plan_lines': list(plan.lines or []),
+            'start_date': subscription.start_date.isoformat(),
+            'end_date': subscription.end_date.isoformat(),
+            'zone_mask': SubscriptionEntitlementService._zone_mask(zones),
+            'line_mask': line_mask,
+            'index_version': index.version,
+        }
+
+    @staticmethod
+    def get_entitlement(user_id):
+        """Get the cached entitlement of a user, loading it on a miss"""
+        key = SubscriptionEntitlementService._cache_key(user_id)
+        entitlement = cache.get(key)
+
+        # Line bits come from the zone index, reload if it was rebuilt since
+        if entitlement is None or entitlement['index_version'] != get_zone_index().version:
+            entitlement = SubscriptionEntitlementService.build_entitlement(user_id)
+            cache.set(key, entitlement, SubscriptionEntitlementService.CACHE_TIMEOUT)
+
+        return entitlement
+
+    @staticmethod
+    def check(user, station_id=None, station_name=None):
+        """
+        Check a user's subscription against a station given by id or name
+
+        Returns:
+            tuple: (entitled, reason) where reason is one of 'ok', 'no_subscription',
+            'invalid_station' or 'not_covered'
+        """
+        entitlement = SubscriptionEntitlementService.get_entitlement(user.id)
+        if entitlement['subscription_id'] is None:
+            return False, 'no_subscription'
+
+        today = timezone.now().date().isoformat()
+        if not entitlement['start_date'] <= today <= entitlement['end_date']:
+            return False, 'no_subscription'
+
+        index = get_zone_index()
+        if station_id is None:
+            station_id = index.station_id_of(station_name)
+            zone = index.zone_of_name(station_name)
+        else:
+            zone = index.zone_of(station_id)
+
+        if not zone:
+            return False, 'invalid_station'
+
+        if not entitlement['zone_mask'] & (1 << zone):
+            return False, 'not_covered'
+
+        if entitlement['line_mask'] and station_id is not None:
+            if not entitlement['line_mask'] & index.station_line_mask(station_id):
+                return False, 'not_covered'
+
+        return True, 'ok'
+
+    @staticmethod
+    def is_entitled(user, station):
+        """Whether the user's active subscription covers the station (a Station or its id)"""
+        station_id = getattr(station, 'id', station)
+        entitled, _ = SubscriptionEntitlementService.check(user, station_id=station_id)
+        return entitled
+
+    @staticmethod
+    def invalidate(user_ids):
+        """Drop cached entitlements, e.g. after bulk status updates"""
+        cache.delete_many([SubscriptionEntitlementService._cache_key(user_id) for user_id in set(user_ids)])
+
+    @staticmethod
+    def refresh_on_commit(user_id):
+        """Reload a user's entitlement once the current DB transaction commits"""
+        def refresh():
+            cache.set(
+                SubscriptionEntitlementService._cache_key(user_id),
+                SubscriptionEntitlementService.build_entitlement(user_id),
+                SubscriptionEntitlementService.CACHE_TIMEOUT
+            )
+        transaction.on_commit(refresh)
@@ -0,0 +1,102 @@
+# apps/tickets/services/expiry_service.py
+import logging
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Ticket, UserSubscription
+from .entitlement_service import SubscriptionEntitlementService
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryService:
+    """Set-based expiry of stale tickets and subscriptions in bounded batches"""
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def expire_tickets(batch_size: int = DEFAULT_BATCH_SIZE, now=None, dry_run: bool = False) -> int:
+        """
+        Mark ACTIVE tickets past valid_until as EXPIRED
+
+        Each batch selects ids through ticket_expiry_idx and flips them with one
+        UPDATE in its own transaction, so locks stay short on large backlogs.
+
+        Returns:
+            int: Number of tickets expired (or that would be, for a dry run)
+        """
+        now = now or timezone.now()
+        stale = Ticket.objects.filter(status='ACTIVE', valid_until__lt=now)
+
+        if dry_run:
+            return stale.count()
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(stale.order_by('valid_until').values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                # Re-check the status so tickets entered meanwhile are left alone
+                total += Ticket.objects.filter(id__in=ids, status='ACTIVE').update(
+                    status='EXPIRED',
+                    updated_at=now
+                )
+            if len(ids) < batch_size:
+                break
+
+        logger.info(f"Expired {total} tickets")
+        return total
+
+    @staticmethod
+    def expire_subscriptions(batch_size: int = DEFAULT_BATCH_SIZE, today=None, dry_run: bool = False) -> int:
+        """
+        Mark ACTIVE subscriptions whose end_date has passed as EXPIRED
+
+        Returns:
+            int: Number of subscriptions expired (or that would be, for a dry run)
+        """
+        today = today or timezone.now().date()
+        stale = UserSubscription.objects.filter(status='ACTIVE', end_date__lt=today)
+
+        if dry_run:
+            return stale.count()
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                rows = list(stale.order_by('end_date').values_list('id', 'user_id')[:batch_size])
+                if not rows:
+                    break
+                total += UserSubscription.objects.filter(
+                    id__in=[row[0] for row in rows],
+                    status='ACTIVE'
+                ).update(status='EXPIRED', updated_at=timezone.now())
+
+                user_ids = [row[1] for row in rows]
+                # Bind this batch's ids, the callback runs after the loop has moved on
+                transaction.on_commit(lambda ids=user_ids: SubscriptionEntitlementService.invalidate(ids))
+            if len(rows) < batch_size:
+                break
+
+        logger.info(f"Expired {total} subscriptions")
+        return total
+
+    @classmethod
+    def expire_all(cls, batch_size: Optional[int] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Run both sweeps and return their counts
+
+        Raises:
+            ValueError: If batch_size is not positive
+        """
+        if batch_size is None:
+            batch_size = cls.DEFAULT_BATCH_SIZE
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive number of rows")
+        return {
+            'tickets': cls.expire_tickets(batch_size=batch_size, dry_run=dry_run),
+            'subscriptions': cls.expire_subscriptions(batch_size=batch_size, dry_run=dry_run),
+        }
@@ -1,5 +1,5 @@
 import logging
-from django.core.cache import cache
+from django.core.cache import caches
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ def send_validation_result(self, is_valid: bool) -> bool:
         try:
             # Store result (1 for valid, 0 for invalid)
             result_value = "1" if is_valid else "0"
-            cache.set(self.VALIDATION_STATUS_KEY, result_value, self.CACHE_TIMEOUT)
+            caches['gates'].set(self.VALIDATION_STATUS_KEY, result_value, self.CACHE_TIMEOUT)
 
             logger.info(f"Set hardware gate validation result: {'VALID' if is_valid else 'INVALID'}")
             return True
@@ -31,9 +31,9 @@ def send_validation_result(self, is_valid: bool) -> bool:
     @classmethod
     def get_latest_validation_result(cls):
         """Get the latest validation result from cache"""
-        result = cache.get(cls.VALIDATION_STATUS_KEY)
+        result = caches['gates'].get(cls.VALIDATION_STATUS_KEY)
         if result is None:
             # Initialize with default "0" if not set
-            cache.set(cls.VALIDATION_STATUS_KEY, "0", cls.CACHE_TIMEOUT)
+            caches['gates'].set(cls.VALIDATION_STATUS_KEY, "0", cls.CACHE_TIMEOUT)
             return "0"
         return result
@@ -6,6 +6,7 @@
 from io import BytesIO
 from base64 import b64encode
 from django.utils import timezone
+from metro import codec
 from ..constants.choices import TicketChoices
 from django.conf import settings
 
@@ -72,7 +73,7 @@ def generate_ticket_qr(self, ticket_data: Dict) -> Tuple[str, str]:
                 box_size=self.QR_BOX_SIZE,
                 border=self.QR_BORDER
             )
-            qr.add_data(json.dumps(qr_data))
+            qr.add_data(codec.dumps(qr_data).decode())
             qr.make(fit=True)
 
             # Create QR code image
@@ -98,7 +99,7 @@ def validate_qr(cls, qr_data: str, stored_hash: str) -> Tuple[bool, Dict]:
         """
         try:
             # Parse QR data
-            ticket_data = json.loads(qr_data)
+            ticket_data = codec.loads(qr_data)
 
             # Verify required fields
             required_fields = [
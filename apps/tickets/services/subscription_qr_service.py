@@ -7,6 +7,7 @@
 from io import BytesIO
 from base64 import b64encode
 from django.utils import timezone
+from metro import codec
 from django.conf import settings
 from ..models.subscription import SubscriptionPlan
 
@@ -73,7 +74,7 @@ def generate_subscription_qr(self, subscription_data: Dict) -> Tuple[str, str]:
                 box_size=self.QR_BOX_SIZE,
                 border=self.QR_BORDER
             )
-            qr.add_data(json.dumps(qr_data))
+            qr.add_data(codec.dumps(qr_data).decode())
             qr.make(fit=True)
 
             # Create QR code image
@@ -99,7 +100,7 @@ def validate_qr(cls, qr_data: str, stored_hash: str) -> Tuple[bool, Dict]:
         """
         try:
             # Parse QR data
-            subscription_data = json.loads(qr_data)
+            subscription_data = codec.loads(qr_data)
 
             # Verify it's a subscription QR code
             if subscription_data.get('qr_type') != 'subscription':
@@ -5,8 +5,10 @@
 from django.utils import timezone
 
 from apps.stations.models import Station
-from ..models.subscription import SubscriptionPlan, UserSubscription, StationZone, ZoneMatrix
-from ..constants.pricing import SubscriptionPricing, ZONE_STATIONS, ZONE_MATRIX
+from ..models.subscription import SubscriptionPlan, UserSubscription, ZoneMatrix
+from ..constants.pricing import SubscriptionPricing, ZONE_MATRIX
+from .zone_index import get_zone_index
+from .entitlement_service import SubscriptionEntitlementService
 
 logger = logging.getLogger(__name__)
 
@@ -43,43 +45,22 @@ def _initialize_zone_matrix(self):
     def get_station_zone(self, station_id):
         """Get zone number for a station"""
         try:
-            station_zone = StationZone.objects.filter(station_id=station_id).first()
-            if station_zone:
-                return station_zone.zone_number
-
-            # If not found in database, try to find in constants
-            station = Station.objects.get(id=station_id)
-            for zone_num, stations in ZONE_STATIONS.items():
-                if any(station_name.lower() in station.name.lower() for station_name in stations):
-                    # Create the mapping in the database for future lookups
-                    StationZone.objects.create(station=station, zone_number=zone_num)
-                    return zone_num
-
-            return None
+            return get_zone_index().zone_of(station_id)
         except Exception as e:
             logger.error(f"Error getting station zone: {str(e)}")
             return None
 
     def get_zones_between(self, start_station_id, end_station_id):
         """Calculate zones between two stations"""
-        start_zone = self.get_station_zone(start_station_id)
-        end_zone = self.get_station_zone(end_station_id)
-
-        if not start_zone or not end_zone:
-            return None
-
         try:
-            # First check database
-            matrix_entry = ZoneMatrix.objects.filter(
-                source_zone=start_zone,
-                destination_zone=end_zone
-            ).first()
+            index = get_zone_index()
+            start_zone = index.zone_of(start_station_id)
+            end_zone = index.zone_of(end_station_id)
 
-            if matrix_entry:
-                return matrix_entry.zones_crossed
+            if not start_zone or not end_zone:
+                return None
 
-            # If not in database, use the constants
-            return ZONE_MATRIX[str(start_zone)][str(end_zone)]
+            return index.zones_between(start_zone, end_zone)
         except Exception as e:
             logger.error(f"Error calculating zones between stations: {str(e)}")
             return None
@@ -99,8 +80,7 @@ def get_price_category(self, num_zones):
     def get_station_lines(self, station_id):
         """Get metro lines for a station"""
         try:
-            station = Station.objects.get(id=station_id)
-            return [line.name for line in station.lines.all()]
+            return list(get_zone_index().lines_of(station_id))
         except Exception as e:
             logger.error(f"Error getting station lines: {str(e)}")
             return []
@@ -109,8 +89,9 @@ def recommend_subscription(self, start_station_id, end_station_id):
         """Generate subscription recommendations based on journey"""
         try:
             # Get stations
-            start_station = Station.objects.get(id=start_station_id)
-            end_station = Station.objects.get(id=end_station_id)
+            index = get_zone_index()
+            if not index.has_station(start_station_id) or not index.has_station(end_station_id):
+                return {"error": "One or both stations do not exist"}
 
             # Calculate zones
             num_zones = self.get_zones_between(start_station_id, end_station_id)
@@ -131,8 +112,8 @@ def recommend_subscription(self, start_station_id, end_station_id):
 
             # Prepare recommendations
             recommendations = {
-                "start_station": start_station.name,
-                "end_station": end_station.name,
+                "start_station": index.station_name(start_station_id),
+                "end_station": index.station_name(end_station_id),
                 "zones_traveled": num_zones,
                 "recommendations": []
             }
@@ -183,8 +164,6 @@ def recommend_subscription(self, start_station_id, end_station_id):
 
             return recommendations
 
-        except Station.DoesNotExist:
-            return {"error": "One or both stations do not exist"}
         except Exception as e:
             logger.error(f"Error recommending subscription: {str(e)}")
             return {"error": str(e)}
@@ -290,59 +269,47 @@ def create_subscription(self, user, subscription_type, zones_count, payment_conf
 
     def validate_subscription(self, user, station_name):
         """Validates if a user's subscription covers a given station"""
-        active_sub = UserSubscription.objects.filter(
-            user=user,
-            status='ACTIVE',
-            end_date__gte=timezone.now().date()
-        ).first()
+        entitled, reason = SubscriptionEntitlementService.check(user, station_name=station_name)
 
-        if not active_sub:
+        if reason == 'no_subscription':
             return {
                 'valid': False,
                 'message': 'No active subscription'
             }
 
-        # Find zone for the station
-        station_zone = None
-        for zone_num, stations in ZONE_STATIONS.items():
-            if station_name in stations:
-                station_zone = zone_num
-                break
-
-        if not station_zone:
+        if reason == 'invalid_station':
             return {
                 'valid': False,
                 'message': 'Invalid station'
             }
 
-        # Check if zone is covered by subscription
-        if active_sub.plan.type == 'ANNUAL':
-            # For annual plans, check based on lines
-            lines = active_sub.plan.lines or []
-            if any('Third Line' in line for line in lines):
-                # All lines covers all zones
+        if not entitled:
+            return {
+                'valid': False,
+                'message': 'Station not covered by subscription'
+            }
+
+        entitlement = SubscriptionEntitlementService.get_entitlement(user.id)
+        if entitlement['plan_type'] == 'ANNUAL':
+            if any('Third Line' in line for line in entitlement['plan_lines']):
                 return {
                     'valid': True,
                     'message': 'Valid subscription for all lines'
                 }
-            elif station_zone <= 9:  # Lines 1&2 cover zones 1-9
-                return {
-                    'valid': True,
-                    'message': 'Valid subscription for Lines 1 & 2'
-                }
-        else:
-            # For monthly/quarterly, check if zone is covered based on plan zones
-            if active_sub.plan.zones and station_zone <= active_sub.plan.zones:
-                return {
-                    'valid': True,
-                    'message': f'Valid {active_sub.plan.type} subscription'
-                }
+            return {
+                'valid': True,
+                'message': 'Valid subscription for Lines 1 & 2'
+            }
 
         return {
-            'valid': False,
-            'message': 'Station not covered by subscription'
+            'valid': True,
+            'message': f"Valid {entitlement['plan_type']} subscription"
         }
 
+    def is_entitled(self, user, station):
+        """Constant-time gate check of a user's subscription at a station"""
+        return SubscriptionEntitlementService.is_entitled(user, station)
+
     def _get_zone_path(self, start_zone, end_zone):
         """Get the predefined path between two zones"""
         from ..constants.pricing import ZONE_PATHS
@@ -7,12 +7,13 @@
 from ..models import Ticket
 from ..constants.choices import TicketChoices
 from .qr_service import QRService
-from apps.routes.services.route_service import MetroRouteService
+from metro.registry import LazyService
 
 
 class TicketService:
+    route_service = LazyService('route_service')
+
     def __init__(self):
-        self.route_service = MetroRouteService()
         self.qr_service = QRService()
 
     @transaction.atomic
@@ -71,9 +72,8 @@ def validate_entry(self, ticket_number: str, station_id: int) -> Dict:
                 status='ACTIVE'
             )
 
+            # Status is flipped by the expire_tickets sweeper, the gate only rejects
             if ticket.valid_until < timezone.now():
-                ticket.status = 'EXPIRED'
-                ticket.save()
                 return {
                     'is_valid': False,
                     'message': 'Ticket has expired'
@@ -7,11 +7,10 @@
 from apps.tickets.services.hardware_service import HardwareService
 from ..models.ticket import Ticket
 from .qr_service import QRService
-from apps.routes.services.route_service import MetroRouteService
+from metro.registry import registry
 
 
 class ValidationService:
-    route_service = MetroRouteService()
     qr_service = QRService()
     hardware_service = HardwareService()
 
@@ -31,9 +30,8 @@ def validate_entry(cls, ticket_number: str, station_id: int) -> Dict:
             )
 
             # Expiration validation
+            # Status is flipped by the expire_tickets sweeper, the gate only rejects
             if ticket.valid_until < timezone.now():
-                ticket.status = 'EXPIRED'
-                ticket.save(update_fields=['status'])
                 cls.hardware_service.send_validation_result(False)
                 return {
                     'is_valid': False,
@@ -93,7 +91,7 @@ def validate_exit(cls, ticket_number: str, station_id: int) -> Dict:
                 }
 
             # Validate route
-            route_data = cls.route_service.find_route(
+            route_data = registry.get('route_service').find_route(
                 ticket.entry_station_id,
                 station_id
             )
@@ -232,7 +230,7 @@ def validate_route(cls, ticket: Ticket, station_id: int) -> Dict:
         """
         Validate route and calculate upgrade requirements if needed
         """
-        route_data = cls.route_service.find_route(
+        route_data = registry.get('route_service').find_route(
             ticket.entry_station_id,
             station_id
         )
@@ -0,0 +1,169 @@
+# apps/tickets/services/zone_index.py
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+
+from ..constants.pricing import ZONE_STATIONS, ZONE_MATRIX
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'zone_index_version'
+CHECK_INTERVAL = 60  # Seconds between checks of the shared version
+
+
+class ZoneIndex:
+    """
+    Read-only lookup tables for subscription zones.
+
+    Maps station ids (and names) to zones, keeps each station's line names and
+    holds the zone travel matrix as a dense tuple indexed by zone number. Built
+    from four queries, after which every lookup is a plain dict or tuple access.
+    """
+
+    __slots__ = ('_station_zones', '_station_names', '_name_ids', '_station_lines', '_line_bits',
+                 '_name_zones', '_matrix', 'version')
+
+    def __init__(self, station_zones: Dict[int, int], station_names: Dict[int, str],
+                 station_lines: Dict[int, Tuple[str, ...]], line_bits: Dict[str, int],
+                 name_zones: Dict[str, int], matrix: Tuple[Tuple[Optional[int], ...], ...], version=None):
+        self._station_zones = MappingProxyType(dict(station_zones))
+        self._station_names = MappingProxyType(dict(station_names))
+        self._name_ids = MappingProxyType({name: station_id for station_id, name in station_names.items()})
+        self._station_lines = MappingProxyType(dict(station_lines))
+        self._line_bits = MappingProxyType(dict(line_bits))
+        self._name_zones = MappingProxyType(dict(name_zones))
+        self._matrix = matrix
+        self.version = version
+
+    @classmethod
+    def build(cls, version=None) -> 'ZoneIndex':
+        """Load the index from the database, falling back to the zone constants"""
+        from apps.stations.models import Station, LineStation
+        from ..models.subscription import StationZone, ZoneMatrix
+
+        station_names = dict(Station.objects.values_list('id', 'name'))
+
+        station_lines: Dict[int, list] = {}
+        line_bits: Dict[str, int] = {}
+        for station_id, line_id, line_name in LineStation.objects.values_list(
+            'station_id', 'line_id', 'line__name'
+        ):
+            station_lines.setdefault(station_id, []).append(line_name)
+            line_bits[line_name] = 1 << line_id
+
+        station_zones = dict(StationZone.objects.values_list('station_id', 'zone_number'))
+
+        # Stations without a StationZone row are matched by name, as the service used to
+        for station_id, name in station_names.items():
+            if station_id in station_zones:
+                continue
+            for zone_num, names in ZONE_STATIONS.items():
+                if any(zone_station.lower() in name.lower() for zone_station in names):
+                    station_zones[station_id] = zone_num
+                    break
+
+        name_zones = {name: zone_num for zone_num, names in ZONE_STATIONS.items() for name in names}
+        for station_id, zone_num in station_zones.items():
+            name_zones.setdefault(station_names.get(station_id), zone_num)
+        name_zones.pop(None, None)
+
+        crossed = {
+            (int(source), int(dest)): zones_crossed
+            for source, destinations in ZONE_MATRIX.items()
+            for dest, zones_crossed in destinations.items()
+        }
+        for source, dest, zones_crossed in ZoneMatrix.objects.values_list(
+            'source_zone', 'destination_zone', 'zones_crossed'
+        ):
+            crossed[(source, dest)] = zones_crossed
+
+        size = max([zone for pair in crossed for zone in pair] + list(station_zones.values()) + [0]) + 1
+        matrix = tuple(
+            tuple(crossed.get((source, dest)) for dest in range(size))
+            for source in range(size)
+        )
+
+        return cls(
+            station_zones=station_zones,
+            station_names=station_names,
+            station_lines={station_id: tuple(lines) for station_id, lines in station_lines.items()},
+            line_bits=line_bits,
+            name_zones=name_zones,
+            matrix=matrix,
+            version=version
+        )
+
+    def has_station(self, station_id) -> bool:
+        return station_id in self._station_names
+
+    def station_name(self, station_id) -> Optional[str]:
+        return self._station_names.get(station_id)
+
+    def zone_of(self, station_id) -> Optional[int]:
+        return self._station_zones.get(station_id)
+
+    def station_id_of(self, station_name) -> Optional[int]:
+        return self._name_ids.get(station_name)
+
+    def zone_of_name(self, station_name) -> Optional[int]:
+        return self._name_zones.get(station_name)
+
+    def lines_of(self, station_id) -> Tuple[str, ...]:
+        return self._station_lines.get(station_id, ())
+
+    def line_mask(self, line_names) -> int:
+        """Bitset of the given line names, unknown names are ignored"""
+        mask = 0
+        for name in line_names:
+            mask |= self._line_bits.get(name, 0)
+        return mask
+
+    def station_line_mask(self, station_id) -> int:
+        return self.line_mask(self._station_lines.get(station_id, ()))
+
+    def zones_between(self, source_zone, destination_zone) -> Optional[int]:
+        """Number of zones crossed travelling between two zones"""
+        try:
+            return self._matrix[source_zone][destination_zone]
+        except (IndexError, TypeError):
+            return None
+
+
+_index: Optional[ZoneIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_zone_index() -> ZoneIndex:
+    """
+    Return the process-wide zone index, rebuilding it when zone data changed.
+
+    The shared version in the cache is looked at no more than once per
+    CHECK_INTERVAL, so steady-state lookups make no queries at all.
+    """
+    global _index, _checked_at
+
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - _checked_at < CHECK_INTERVAL:
+        return index
+
+    with _lock:
+        version = cache.get(VERSION_CACHE_KEY)
+        if _index is None or _index.version != version:
+            _index = ZoneIndex.build(version=version)
+            logger.info(f"Built zone index (version {version})")
+        _checked_at = now
+        return _index
+
+
+def invalidate_zone_index():
+    """Mark zone data as changed so every process rebuilds its index"""
+    global _index
+
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), None)
+    _index = None
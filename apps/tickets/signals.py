@@ -1,15 +1,20 @@
 import logging
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from apps.tickets.models import Ticket, UserSubscription
-from apps.analytics.services import record_ticket_usage, record_subscription_usage
+from apps.stations.models import Station, LineStation
+from apps.tickets.models import Ticket, UserSubscription, StationZone, ZoneMatrix
+from apps.tickets.services.zone_index import invalidate_zone_index
+from apps.tickets.services.entitlement_service import SubscriptionEntitlementService
+from apps.analytics.od_matrix import ODMatrixService
+from apps.analytics.tasks import record_ticket_usage, record_subscription_usage
 
 logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Ticket)
 def track_ticket_usage(sender, instance, created, **kwargs):
-    """Track ticket usage for both entry and exit events"""
+    """Track ticket usage for both entry and exit events, in a background job"""
     if created:
         return  # Skip new ticket creation
 
@@ -17,17 +22,13 @@ def track_ticket_usage(sender, instance, created, **kwargs):
         # Track entry (ACTIVE → IN_USE)
         if instance.status == 'IN_USE' and instance.entry_station:
             logger.info(f"Tracking entry for ticket {instance.ticket_number} at station {instance.entry_station.name}")
-            record_ticket_usage(
-                ticket_id=instance.id,
-                station_id=instance.entry_station.id,
-                usage_type='ENTRY'
-            )
+            record_ticket_usage.delay(instance.id, instance.entry_station_id, 'ENTRY')
 
         # Track exit (IN_USE → USED) - could use different analytics if needed
         elif instance.status == 'USED' and instance.exit_station:
             logger.info(f"Tracking exit for ticket {instance.ticket_number} at station {instance.exit_station.name}")
-            # Optionally record exit analytics (could be a separate function if needed)
-            # For now, we'll continue to attribute revenue to the entry station
+            # Revenue stays attributed to the entry station; the completed trip feeds the OD matrices
+            ODMatrixService.schedule_refresh()
 
     except Exception as e:
         logger.error(f"Error recording ticket analytics: {str(e)}", exc_info=True)
@@ -44,8 +45,29 @@ def track_subscription_usage(sender, instance, created, **kwargs):
         # Track when subscription becomes active
         if instance.status == 'ACTIVE' and instance.start_station:
             logger.info(f"Tracking activation for subscription {instance.id} at station {instance.start_station.name}")
-            record_subscription_usage(instance.id, instance.start_station.id)
+            record_subscription_usage.delay(instance.id, instance.start_station_id)
 
     except Exception as e:
         logger.error(f"Error recording subscription analytics: {str(e)}", exc_info=True)
         print(f"Error recording subscription analytics: {str(e)}")
+
+
+@receiver([post_save, post_delete], sender=StationZone)
+@receiver([post_save, post_delete], sender=ZoneMatrix)
+@receiver([post_save, post_delete], sender=Station)
+@receiver([post_save, post_delete], sender=LineStation)
+def refresh_zone_index(sender, instance, **kwargs):
+    """Rebuild the in-memory zone index after zone or station data changes"""
+    transaction.on_commit(invalidate_zone_index)
+
+
+@receiver(post_save, sender=UserSubscription)
+def refresh_subscription_entitlement(sender, instance, **kwargs):
+    """Load the entitlement on activation and drop it on cancel or expiry"""
+    SubscriptionEntitlementService.refresh_on_commit(instance.user_id)
+
+
+@receiver(post_delete, sender=UserSubscription)
+def drop_subscription_entitlement(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: SubscriptionEntitlementService.invalidate([user_id]))
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.stations.management.commands.populate_metro_data import Command as MetroDataCommand
+from apps.stations.models import Station
+from ..models import StationZone, SubscriptionPlan, Ticket, UserSubscription
+from ..services import zone_index
+from ..services.entitlement_service import SubscriptionEntitlementService
+from ..services.expiry_service import ExpiryService
+from ..services.subscription_service import SubscriptionService
+
+User = get_user_model()
+
+
+class ZoneIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        MetroDataCommand().handle()
+
+    def setUp(self):
+        cache.clear()
+        zone_index.invalidate_zone_index()
+        self.service = SubscriptionService()
+        self.sadat = Station.objects.get(name="Sadat")
+        self.helwan = Station.objects.get(name="Helwan")
+
+    def test_lookups_make_no_queries_once_built(self):
+        zone_index.get_zone_index()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_station_zone(self.sadat.id), 1)
+            self.assertEqual(self.service.get_zones_between(self.sadat.id, self.helwan.id), 4)
+            recommendations = self.service.recommend_subscription(self.sadat.id, self.helwan.id)
+
+        self.assertEqual(recommendations["start_station"], "Sadat")
+        self.assertEqual(recommendations["zones_traveled"], 4)
+
+    def test_unknown_station(self):
+        result = self.service.recommend_subscription(self.sadat.id, 999999)
+        self.assertEqual(result, {"error": "One or both stations do not exist"})
+
+    def test_zone_change_rebuilds_index(self):
+        old_index = zone_index.get_zone_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StationZone.objects.create(station=self.sadat, zone_number=3)
+
+        new_index = zone_index.get_zone_index()
+        self.assertIsNot(new_index, old_index)
+        self.assertEqual(new_index.zone_of(self.sadat.id), 3)
+
+
+class SubscriptionEntitlementTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        MetroDataCommand().handle()
+
+    def setUp(self):
+        cache.clear()
+        zone_index.invalidate_zone_index()
+        self.service = SubscriptionService()
+        self.user = User.objects.create_user(
+            email="subscriber@example.com",
+            username="subscriber",
+            password="testpass123",
+        )
+        self.sadat = Station.objects.get(name="Sadat")
+        self.helwan = Station.objects.get(name="Helwan")
+        self.dokki = Station.objects.get(name="Dokki")
+
+    def subscribe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.service.create_subscription(
+                user=self.user,
+                subscription_type='MONTHLY',
+                zones_count=3,
+                payment_confirmed=True,
+                start_station_id=self.sadat.id,
+                end_station_id=self.helwan.id
+            )
+
+    def test_entitlement_loaded_at_activation(self):
+        self.subscribe()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.service.is_entitled(self.user, self.sadat))
+            self.assertTrue(self.service.is_entitled(self.user, self.helwan.id))
+            self.assertFalse(self.service.is_entitled(self.user, self.dokki))
+
+        self.assertEqual(
+            self.service.validate_subscription(self.user, "Helwan"),
+            {'valid': True, 'message': 'Valid MONTHLY subscription'}
+        )
+
+    def test_cancel_drops_entitlement(self):
+        subscription = self.subscribe()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.status = 'CANCELLED'
+            subscription.save(update_fields=['status', 'updated_at'])
+
+        self.assertFalse(self.service.is_entitled(self.user, self.sadat))
+        self.assertEqual(
+            self.service.validate_subscription(self.user, "Sadat")['message'],
+            'No active subscription'
+        )
+
+
+class ExpiryServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="sweeper@example.com",
+            username="sweeper",
+            password="testpass123",
+        )
+        now = timezone.now()
+        tickets = [
+            Ticket.objects.create(user=self.user, ticket_type='BASIC', valid_until=now + timedelta(days=1))
+            for _ in range(5)
+        ]
+        # Three of them went stale
+        Ticket.objects.filter(id__in=[t.id for t in tickets[:3]]).update(valid_until=now - timedelta(hours=1))
+
+    def test_expire_tickets_in_batches(self):
+        self.assertEqual(ExpiryService.expire_tickets(dry_run=True), 3)
+        self.assertEqual(ExpiryService.expire_tickets(batch_size=2), 3)
+        self.assertEqual(Ticket.objects.filter(status='EXPIRED').count(), 3)
+        self.assertEqual(Ticket.objects.filter(status='ACTIVE').count(), 2)
+        self.assertEqual(ExpiryService.expire_tickets(), 0)
+
+    def test_command_reports_counts(self):
+        out = StringIO()
+        call_command('expire_tickets', stdout=out)
+        self.assertIn("Expired 3 tickets and 0 subscriptions", out.getvalue())
+
+    def test_command_rejects_non_positive_batch_size(self):
+        for batch_size in ('0', '-5'):
+            with self.assertRaises(CommandError):
+                call_command('expire_tickets', '--batch-size', batch_size, stdout=StringIO())
+        with self.assertRaises(ValueError):
+            ExpiryService.expire_all(batch_size=0)
+        self.assertEqual(Ticket.objects.filter(status='EXPIRED').count(), 0)
+
+    def test_every_batch_invalidates_its_own_users(self):
+        plan = SubscriptionPlan.objects.create(name="Monthly", type='MONTHLY', price=100, zones=2)
+        users = [self.user] + [
+            User.objects.create_user(email=f"rider{n}@example.com", username=f"rider{n}", password="testpass123")
+            for n in range(2)
+        ]
+        for user in users:
+            subscription = UserSubscription.objects.create(user=user, plan=plan)
+            UserSubscription.objects.filter(id=subscription.id).update(
+                end_date=timezone.now().date() - timedelta(days=1)
+            )
+
+        with mock.patch.object(SubscriptionEntitlementService, 'invalidate') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(ExpiryService.expire_subscriptions(batch_size=1), 3)
+        invalidated = [user_id for call in invalidate.call_args_list for user_id in call.args[0]]
+        self.assertCountEqual(invalidated, [user.id for user in users])
+
+
+class TicketIndexTests(TestCase):
+    def test_index_usage_command_lists_ticket_indexes(self):
+        out = StringIO()
+        call_command('index_usage', stdout=out)
+        if connection.vendor != 'postgresql':
+            self.assertIn('user_id, status, valid_until', out.getvalue())
+        self.assertNotIn('ticket_number_idx', out.getvalue())
@@ -1,10 +1,11 @@
 import qrcode
-import json
 import hashlib
 from typing import Dict
 from base64 import b64encode
 from io import BytesIO
 
+from metro import codec
+
 
 def generate_ticket_qr(ticket_data: Dict) -> tuple:
     """
@@ -38,7 +39,7 @@ def generate_ticket_qr(ticket_data: Dict) -> tuple:
         box_size=10,
         border=4,
     )
-    qr.add_data(json.dumps(ticket_data))
+    qr.add_data(codec.dumps(ticket_data).decode())
     qr.make(fit=True)
 
     # Create QR code image and convert to base64
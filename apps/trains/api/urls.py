@@ -1,6 +1,7 @@
 # apps/trains/api/urls.py
 
 from django.urls import path
+from .views.async_views import CrowdLevelUpdateView, CrowdStatusView, StationScheduleView
 from .views.train_views import TrainViewSet
 
 app_name = 'trains'
@@ -38,14 +39,14 @@
     ),
     path(
         '<int:pk>/station-schedule/',
-        TrainViewSet.as_view({'get': 'station_schedule'}),
+        StationScheduleView.as_view(),
         name='station-schedule'
     ),
 
     # Protected Endpoints
     path(
         '<int:pk>/update-crowd-level/',
-        TrainViewSet.as_view({'post': 'update_crowd_level'}),
+        CrowdLevelUpdateView.as_view(),
         name='update-crowd'
     ),
     path(
@@ -55,7 +56,7 @@
     ),
     path(
         '<int:pk>/crowd-status/',
-        TrainViewSet.as_view({'get': 'get_crowd_status'}),
+        CrowdStatusView.as_view(),
         name='crowd-status'
     ),
 ]
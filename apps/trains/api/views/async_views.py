@@ -0,0 +1,243 @@
+# apps/trains/api/views/async_views.py
+
+"""
+Native async endpoints for the I/O-bound train operations
+
+The crowd level upload waits on the AI service for up to
+AI_SERVICE_CONFIG['TIMEOUT'] seconds. As an async view served through
+metro/asgi.py it awaits that call on the event loop instead of holding a
+worker thread for the whole request, and the crowd and schedule reads next
+to it are served the same way. The ORM is used through its async API.
+
+DRF views cannot be async, so these are plain Django views that
+authenticate with JWT and apply the default throttles themselves, and
+answer in the same JSON shapes as the TrainViewSet actions they replace.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+from apps.trains.utils.file_validator import FileValidator
+from apps.users.authentication import CachedJWTAuthentication
+from metro import codec
+from ...services.crowd_service import CrowdDetectionService
+from ...services.schedule_service import ScheduleService
+from ...services.train_service import TrainService
+from ...utils.error_handling import APIError
+
+logger = logging.getLogger(__name__)
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    """JSON response rendered like the API's DRF responses"""
+    return HttpResponse(
+        codec.dumps(data),
+        content_type='application/json',
+        status=status_code,
+        headers=headers,
+    )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """
+    Base class for async JSON endpoints
+
+    Authentication and throttling run in a worker thread before the handler,
+    as both may touch the database or cache. Their failures are answered the
+    way DRF answers them.
+    """
+
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    def check_request(self, request):
+        result = CachedJWTAuthentication().authenticate(request)
+        if result is not None:
+            request.user, request.auth = result
+
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await sync_to_async(self.check_request)(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIError as e:
+            return json_response({'error': e.message}, e.status_code)
+        except exceptions.APIException as e:
+            headers = {'Retry-After': str(e.wait)} if getattr(e, 'wait', None) else None
+            data = e.detail if isinstance(e.detail, (dict, list)) else {'detail': e.detail}
+            return json_response(data, e.status_code, headers)
+
+
+class CrowdLevelUpdateView(AsyncAPIView):
+    """
+    POST /api/trains/{id}/update-crowd-level/
+
+    Counts passengers in a car camera image with the AI service and stores
+    the resulting crowd level. Takes multipart ``car_number`` and ``image``
+    (or ``file``).
+    """
+
+    async def post(self, request, pk):
+        car_number = request.POST.get('car_number') or request.GET.get('car_number')
+        if not car_number:
+            return json_response(
+                {
+                    "error": "Car number is required",
+                    "details": "Please provide car_number parameter",
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        image_input = request.FILES.get('image') or request.FILES.get('file')
+        if not image_input:
+            return json_response(
+                {
+                    "error": "Image is required",
+                    "details": "Please provide an image file",
+                    "suggestions": [
+                        "Use 'image' or 'file' as the form field name",
+                        "Ensure the file is properly selected",
+                        "Check content-type is multipart/form-data"
+                    ]
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            car_number = int(car_number)
+        except ValueError:
+            return json_response(
+                {
+                    "error": "Invalid car number format",
+                    "details": "Car number must be an integer",
+                    "received": car_number
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Content sniffing reads the file, so keep it off the event loop
+        is_valid, validated_file, error_message = await sync_to_async(
+            FileValidator.validate_file, thread_sensitive=False
+        )(image_input)
+        if not is_valid:
+            return json_response(
+                {
+                    "error": "File validation failed",
+                    "details": error_message,
+                    "suggestions": [
+                        "Check file format and size",
+                        "Ensure file is not corrupted",
+                        "Try with a different image"
+                    ]
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        car = await TrainService.get_car(pk, car_number)
+        image_content = validated_file.read()
+        if hasattr(validated_file, 'close'):
+            validated_file.close()
+        logger.info(
+            f"Processing {len(image_content)} byte image for Train {car.train.train_number}, Car {car.car_number}"
+        )
+
+        result = await CrowdDetectionService().update_car_crowd_level(car, image_content)
+        if not result.get('success', False):
+            logger.warning(f"Crowd detection failed: {result}")
+            return json_response(
+                {
+                    "error": "Crowd detection failed",
+                    "details": result.get('details', 'Unknown error'),
+                    "suggestions": result.get('suggestions', [
+                        "Verify AI service status",
+                        "Check network connectivity",
+                        "Retry the request"
+                    ])
+                },
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        return json_response({
+            "success": True,
+            "crowd_level": result.get('crowd_level'),
+            "passenger_count": result.get('passenger_count'),
+            "train_number": car.train.train_number,
+            "car_number": car.car_number,
+            "timestamp": result.get('timestamp')
+        })
+
+
+class CrowdStatusView(AsyncAPIView):
+    """
+    GET /api/trains/{id}/crowd-status/
+
+    Latest crowd data of a train, or of one car with ``?car_number=``, if
+    updated within the last hour.
+    """
+
+    async def get(self, request, pk):
+        car_number = request.GET.get('car_number')
+        try:
+            car_number = int(car_number) if car_number else None
+        except ValueError:
+            return json_response(
+                {"error": "Invalid car number format"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        train = await TrainService.get_train(pk)
+        car = await TrainService.get_latest_crowd_data(train, car_number)
+        if car is None:
+            return json_response(
+                {
+                    "success": False,
+                    "message": "No recent crowd data available",
+                    "train_number": train.train_number,
+                    "crowd_level": "UNKNOWN",
+                    "current_passengers": 0,
+                    "timestamp": None
+                },
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        return json_response({
+            "success": True,
+            "train_number": train.train_number,
+            "car_number": car.car_number,
+            "crowd_level": car.crowd_level,
+            "current_passengers": car.current_passengers,
+            "timestamp": car.last_updated.isoformat()
+        })
+
+
+class StationScheduleView(AsyncAPIView):
+    """
+    GET /api/trains/{id}/station-schedule/?time_window=30
+
+    Trains arriving within ``time_window`` minutes.
+    """
+
+    async def get(self, request, pk):
+        try:
+            time_window = int(request.GET.get('time_window', 30))
+        except ValueError:
+            return json_response(
+                {"error": "Invalid time window value"},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Next-station lookups walk the line graph through model methods,
+        # so the schedule is built in one sync call rather than query by query
+        result = await sync_to_async(ScheduleService().get_station_schedule)(pk, time_window)
+        return json_response(result)
@@ -1,7 +1,6 @@
 # apps/trains/api/views/train_views.py
 
 from django.utils import timezone
-from datetime import timedelta
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -9,23 +8,19 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.shortcuts import get_object_or_404
 from django.urls import get_resolver
-from asgiref.sync import async_to_sync
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 from apps.stations.models import Station
 from apps.trains.models.schedule import Schedule
-from apps.trains.utils.file_validator import FileValidator
-from ...services.schedule_service import ScheduleService
-from ...services.crowd_service import CrowdDetectionService
 from ...models.train import Train
 from ..serializers.train_serializer import TrainSerializer, TrainDetailSerializer
 from ..serializers.schedule_serializer import ScheduleSerializer
 from ..pagination import StandardResultsSetPagination
 from ..permissions import IsStaffOrReadOnly, CanUpdateCrowdLevel
 from ..filters import TrainFilter
+from metro.query_budget import max_queries
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,7 +33,6 @@ class TrainViewSet(viewsets.ModelViewSet):
 
     Provides endpoints for:
     - Train schedules retrieval
-    - Crowd level monitoring
     - Train location updates
     - Debug information
 
@@ -47,14 +41,15 @@ class TrainViewSet(viewsets.ModelViewSet):
     - GET /api/trains/{id}/ - Get train details
     - POST /api/trains/get-schedules/ - Get upcoming schedules
     - GET /api/trains/debug/ - Get API debug info
-    - GET /api/trains/{id}/station-schedule/ - Get station schedule
 
     Protected Endpoints (require authentication):
-    - POST /api/trains/{id}/update-crowd-level/ - Update crowd level
     - POST /api/trains/{id}/update-location/ - Update train location
     - POST /api/trains/ - Create new train
     - PUT/PATCH /api/trains/{id}/ - Update train
     - DELETE /api/trains/{id}/ - Delete train
+
+    Crowd level upload, crowd status and station schedule are async views,
+    see async_views.py.
     """
 
     queryset = (
@@ -67,6 +62,7 @@ class TrainViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_class = TrainFilter
     http_method_names = ["get", "post", "put", "patch", "delete", "head", "options"]
+    query_budget = {"list": 5, "retrieve": 4}
 
     def get_permissions(self):
         """
@@ -77,9 +73,6 @@ def get_permissions(self):
             "retrieve",
             "get_schedules",
             "debug_info",
-            "station_schedule",
-            "get_crowd_status",
-            "update_crowd_level",
         ]
         staff_actions = ["update_location", "create", "destroy"]
 
@@ -92,7 +85,7 @@ def get_permissions(self):
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action in ["retrieve", "update_crowd_level"]:
+        if self.action == "retrieve":
             return TrainDetailSerializer
         return TrainSerializer
 
@@ -125,6 +118,7 @@ def get_serializer_class(self):
         url_name="get_schedules",
         permission_classes=[AllowAny],
     )
+    @max_queries(8)
     def get_schedules(self, request):
         """Get upcoming trains and their crowd levels"""
         try:
@@ -243,7 +237,9 @@ def _get_monitored_car_info(self, train):
             return None
 
         try:
-            car = train.cars.get(car_number=train.camera_car_number)
+            car = train.get_monitored_car()
+            if car is None:
+                return None
             return {
                 "car_number": car.car_number,
                 "current_passengers": car.current_passengers,
@@ -252,239 +248,6 @@ def _get_monitored_car_info(self, train):
         except Exception:
             return None
 
-    @action(detail=True, methods=["get"])
-    def station_schedule(self, request, pk=None):
-        """Get schedule for a specific station"""
-        try:
-            time_window = int(request.query_params.get("time_window", 30))
-            schedule_service = ScheduleService()
-            result = schedule_service.get_station_schedule(pk, time_window)
-            return Response(result)
-        except ValueError:
-            return Response(
-                {"error": "Invalid time window value"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        except Exception as e:
-            logger.error(f"Error getting station schedule: {str(e)}")
-            return Response(
-                {"error": "Failed to retrieve station schedule"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-    @action(
-        detail=True,
-        methods=['post'],
-        permission_classes=[AllowAny],
-        url_path='update-crowd-level'
-    )
-    def update_crowd_level(self, request, pk=None):
-        """
-        Update crowd level for a specific train car with proper async handling
-        """
-        try:
-            # Log request details
-            logger.info("=" * 50)
-            logger.info("Crowd Level Update Request Received")
-            logger.info(f"Request Method: {request.method}")
-            logger.info(f"Content Type: {request.content_type}")
-            logger.info(f"Request DATA keys: {list(request.data.keys())}")
-            logger.info(f"Request FILES keys: {list(request.FILES.keys()) if request.FILES else 'No files'}")
-            logger.info(f"Raw POST data: {request.POST}")
-
-            # Extract and validate car_number
-            car_number = (
-                request.data.get('car_number')
-                or request.POST.get('car_number')
-                or request.GET.get('car_number')
-            )
-            if not car_number:
-                return Response(
-                    {
-                        "error": "Car number is required",
-                        "details": "Please provide car_number parameter",
-                        "request_info": {
-                            "data_keys": list(request.data.keys()),
-                            "files_keys": list(request.FILES.keys()) if request.FILES else []
-                        }
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Extract and validate image
-            image_input = (
-                request.FILES.get('image')
-                or request.FILES.get('file')
-                or request.data.get('image')
-            )
-            if not image_input:
-                return Response(
-                    {
-                        "error": "Image is required",
-                        "details": "Please provide an image file",
-                        "suggestions": [
-                            "Use 'image' or 'file' as the form field name",
-                            "Ensure the file is properly selected",
-                            "Check content-type is multipart/form-data"
-                        ]
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Validate file format and content
-            file_validator = FileValidator()
-            is_valid, validated_file, error_message = file_validator.validate_file(image_input)
-            if not is_valid:
-                return Response(
-                    {
-                        "error": "File validation failed",
-                        "details": error_message,
-                        "suggestions": [
-                            "Check file format and size",
-                            "Ensure file is not corrupted",
-                            "Try with a different image"
-                        ]
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Convert car number to integer
-            try:
-                car_number = int(car_number)
-            except ValueError:
-                return Response(
-                    {
-                        "error": "Invalid car number format",
-                        "details": "Car number must be an integer",
-                        "received": car_number
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Get train and car objects
-            train = self.get_object()
-            car = get_object_or_404(train.cars, car_number=car_number)
-
-            # Process the image
-            try:
-                # Read image content
-                image_content = validated_file.read()
-                logger.info(f"Processing image for Train {train.train_number}, Car {car.car_number}")
-                logger.info(f"Image size: {len(image_content)} bytes")
-
-                # Process with crowd detection service
-                crowd_service = CrowdDetectionService()
-                result = async_to_sync(crowd_service.update_car_crowd_level)(car, image_content)
-
-                # Clean up resources
-                if hasattr(validated_file, 'close'):
-                    validated_file.close()
-
-                # Handle unsuccessful result
-                if not result.get('success', False):
-                    logger.warning(f"Crowd detection failed: {result}")
-                    return Response(
-                        {
-                            "error": "Crowd detection failed",
-                            "details": result.get('details', 'Unknown error'),
-                            "suggestions": result.get('suggestions', [
-                                "Verify AI service status",
-                                "Check network connectivity",
-                                "Retry the request"
-                            ])
-                        },
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                # Return success response
-                return Response({
-                    "success": True,
-                    "crowd_level": result.get('crowd_level'),
-                    "passenger_count": result.get('passenger_count'),
-                    "train_number": train.train_number,
-                    "car_number": car.car_number,
-                    "timestamp": result.get('timestamp')
-                })
-
-            except Exception as processing_error:
-                logger.error(f"Processing error: {processing_error}", exc_info=True)
-                return Response(
-                    {
-                        "error": "Image processing failed",
-                        "details": str(processing_error),
-                        "suggestions": [
-                            "Verify AI service availability",
-                            "Check network connectivity",
-                            "Try again later"
-                        ]
-                    },
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE
-                )
-
-        except Exception as e:
-            logger.error(f"Unexpected error in crowd level update: {e}", exc_info=True)
-            return Response(
-                {
-                    "error": "System error",
-                    "details": str(e),
-                    "suggestions": [
-                        "Contact system administrator",
-                        "Check system logs",
-                        "Retry the request"
-                    ]
-                },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-            
-    @action(
-        detail=True,
-        methods=['get'],
-        permission_classes=[AllowAny],
-        url_path='crowd-status'
-    )
-    def get_crowd_status(self, request, pk=None):
-        """
-        Get the latest crowd status for a specific train or car.
-        Optional query param: car_number
-        """
-        try:
-            train = self.get_object()
-            car_number = request.query_params.get('car_number')
-
-            threshold_time = timezone.now() - timedelta(hours=1)
-
-            if car_number:
-                car = train.cars.filter(car_number=car_number, last_updated__gte=threshold_time).first()
-            else:
-                car = train.cars.filter(last_updated__gte=threshold_time).order_by('-last_updated').first()
-
-            if not car:
-                return Response({
-                    "success": False,
-                    "message": "No recent crowd data available",
-                    "train_number": train.train_number,
-                    "crowd_level": "UNKNOWN",
-                    "current_passengers": 0,
-                    "timestamp": None
-                }, status=status.HTTP_404_NOT_FOUND)
-
-            return Response({
-                "success": True,
-                "train_number": train.train_number,
-                "car_number": car.car_number,
-                "crowd_level": car.crowd_level,
-                "current_passengers": car.current_passengers,
-                "timestamp": car.last_updated.isoformat()
-            })
-
-        except Exception as e:
-            return Response({
-                "success": False,
-                "error": str(e),
-                "crowd_level": "UNKNOWN",
-                "current_passengers": 0
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
     @swagger_auto_schema(
         operation_description="Get API debug information",
         responses={
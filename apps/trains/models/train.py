@@ -57,16 +57,22 @@ def save(self, *args, **kwargs):
     def is_monitored(self):
         return self.camera_car_number is not None
 
-    def get_crowd_level(self):
-        """Get crowd level for the monitored car"""
+    def get_monitored_car(self):
+        """Get the camera car, from prefetched cars when they were loaded with prefetch_related"""
         if not self.is_monitored:
             return None
+        if 'cars' in getattr(self, '_prefetched_objects_cache', {}):
+            return next((car for car in self.cars.all() if car.car_number == self.camera_car_number), None)
         try:
-            car = self.cars.get(car_number=self.camera_car_number)
-            return car.crowd_level
+            return self.cars.get(car_number=self.camera_car_number)
         except TrainCar.DoesNotExist:
             return None
 
+    def get_crowd_level(self):
+        """Get crowd level for the monitored car"""
+        car = self.get_monitored_car()
+        return car.crowd_level if car else None
+
 
 class TrainCar(models.Model):
     train = models.ForeignKey(Train, on_delete=models.CASCADE, related_name='cars')
@@ -1,6 +1,4 @@
-from asgiref.sync import sync_to_async
 from django.utils import timezone
-from django.db import transaction
 from django.conf import settings
 from typing import Dict, Any
 import logging
@@ -18,21 +16,18 @@ def __init__(self):
         self.max_file_size = settings.AI_SERVICE_CONFIG['MAX_FILE_SIZE']
         self.allowed_extensions = settings.AI_SERVICE_CONFIG['ALLOWED_EXTENSIONS']
 
-    @sync_to_async
-    def _update_train_car(self, train_car: TrainCar, passenger_count: int, crowd_level: str) -> bool:
-        """Update train car data in a sync context"""
+    async def _update_train_car(self, train_car: TrainCar, passenger_count: int, crowd_level: str) -> bool:
+        """Save the new crowd data with a single UPDATE"""
         try:
-            with transaction.atomic():
-                train_car.current_passengers = passenger_count
-                train_car.crowd_level = crowd_level
-                train_car.last_updated = timezone.now()
-                train_car.save(
-                    update_fields=[
-                        'current_passengers',
-                        'crowd_level',
-                        'last_updated'
-                    ]
-                )
+            now = timezone.now()
+            await TrainCar.objects.filter(pk=train_car.pk).aupdate(
+                current_passengers=passenger_count,
+                crowd_level=crowd_level,
+                last_updated=now
+            )
+            train_car.current_passengers = passenger_count
+            train_car.crowd_level = crowd_level
+            train_car.last_updated = now
             return True
         except Exception as e:
             logger.error(f"Database update error: {e}", exc_info=True)
@@ -54,7 +49,12 @@ async def update_car_crowd_level(
         train_car: TrainCar,
         image_data: bytes
     ) -> Dict[str, Any]:
-        """Process image and update crowd level with proper async/sync handling"""
+        """
+        Process image and update crowd level
+
+        ``train_car`` must have its train loaded (select_related), as related
+        objects cannot be fetched lazily from async code.
+        """
         start_time = timezone.now()
 
         # Input validation
@@ -2,8 +2,9 @@
 
 from typing import Any, List, Dict, Optional
 from django.db.models import Q
-from datetime import datetime, timedelta
-from ..models.train import Train
+from django.utils import timezone
+from datetime import timedelta
+from ..models.train import Train, TrainCar
 from ..utils.error_handling import APIError
 
 
@@ -23,14 +24,17 @@ async def get_train_details(train_id: int) -> Dict[str, Any]:
             APIError: If train is not found
         """
         try:
-            train = await Train.objects.aget(id=train_id)
+            train = await Train.objects.select_related(
+                'line', 'current_station', 'next_station'
+            ).aget(id=train_id)
+            now = timezone.now()
             return {
                 'train': train,
-                'cars': await train.cars.all(),
+                'cars': [car async for car in train.cars.order_by('car_number')],
                 'current_schedule': await train.schedules.filter(
-                    arrival_time__lte=datetime.now(),
-                    departure_time__gte=datetime.now()
-                ).afirst()
+                    arrival_time__lte=now,
+                    departure_time__gte=now
+                ).select_related('station').afirst()
             }
         except Train.DoesNotExist:
             raise APIError("Train not found", 404)
@@ -50,7 +54,7 @@ async def get_trains_by_station(
         Returns:
             List of Train objects
         """
-        now = datetime.now()
+        now = timezone.now()
         query = Q(current_station_id=station_id) | Q(
             schedules__station_id=station_id,
             schedules__arrival_time__gte=now,
@@ -60,7 +64,8 @@ async def get_trains_by_station(
         if direction:
             query &= Q(direction=direction)
 
-        return await Train.objects.filter(query).distinct()
+        trains = Train.objects.filter(query).select_related('line').distinct()
+        return [train async for train in trains]
 
     @staticmethod
     async def update_train_location(
@@ -83,6 +88,50 @@ async def update_train_location(
             train = await Train.objects.aget(id=train_id)
             train.current_station_id = station_id
             train.next_station_id = next_station_id
-            await train.asave()
+            await train.asave(update_fields=['current_station', 'next_station'])
         except Train.DoesNotExist:
             raise APIError("Train not found", 404)
+
+    @staticmethod
+    async def get_car(train_id: int, car_number: int) -> TrainCar:
+        """
+        Get a car of a train, with the train loaded
+
+        Raises:
+            APIError: If the train has no such car
+        """
+        try:
+            return await TrainCar.objects.select_related('train').aget(
+                train_id=train_id, car_number=car_number
+            )
+        except TrainCar.DoesNotExist:
+            raise APIError("Train car not found", 404)
+
+    @staticmethod
+    async def get_train(train_id: int) -> Train:
+        """
+        Raises:
+            APIError: If train is not found
+        """
+        try:
+            return await Train.objects.aget(id=train_id)
+        except Train.DoesNotExist:
+            raise APIError("Train not found", 404)
+
+    @staticmethod
+    async def get_latest_crowd_data(
+        train: Train,
+        car_number: Optional[int] = None,
+        max_age: timedelta = timedelta(hours=1)
+    ) -> Optional[TrainCar]:
+        """
+        Get the most recently updated car of a train, or the given car, if its
+        crowd data is newer than max_age
+
+        Returns:
+            The TrainCar, or None if there is no recent data
+        """
+        cars = train.cars.filter(last_updated__gte=timezone.now() - max_age)
+        if car_number is not None:
+            cars = cars.filter(car_number=car_number)
+        return await cars.order_by('-last_updated').afirst()
@@ -0,0 +1,72 @@
+# apps/trains/tests/test_async_views.py
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.stations.models import Line, Station
+from apps.trains.models import Train
+
+# 1x1 transparent PNG
+PNG = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89'
+    b'\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+class AsyncTrainViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        line = Line.objects.create(name='First Line', color_code='#FF0000')
+        station = Station.objects.create(name='Sadat', latitude=30.04, longitude=31.23)
+        cls.train = Train.objects.create(
+            train_number='T-100', line=line, direction='HELWAN', current_station=station
+        )
+
+    def setUp(self):
+        for backend in caches.all():
+            backend.clear()
+
+    def upload(self, car_number='1'):
+        return self.client.post(
+            reverse('train-api:update-crowd', kwargs={'pk': self.train.pk}),
+            {'car_number': car_number, 'image': SimpleUploadedFile('car.png', PNG, content_type='image/png')},
+        )
+
+    @mock.patch('apps.trains.services.ai_service.AIService.process_image', new_callable=mock.AsyncMock)
+    def test_crowd_upload_stores_level(self, process_image):
+        process_image.return_value = {'success': True, 'message': 42}
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['passenger_count'], 42)
+        self.assertEqual(response.json()['train_number'], 'T-100')
+        car = self.train.cars.get(car_number=1)
+        self.assertEqual(car.current_passengers, 42)
+        self.assertEqual(response.json()['crowd_level'], car.crowd_level)
+
+    def test_crowd_upload_validates_input(self):
+        self.assertEqual(self.upload(car_number='one').status_code, 400)
+        self.assertEqual(self.upload(car_number='99').status_code, 404)
+
+    async def test_crowd_status_through_async_stack(self):
+        url = reverse('train-api:crowd-status', kwargs={'pk': self.train.pk})
+
+        response = await self.async_client.get(url, {'car_number': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['train_number'], 'T-100')
+
+        missing = await self.async_client.get(reverse('train-api:crowd-status', kwargs={'pk': 0}))
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json(), {'error': 'Train not found'})
+
+    def test_invalid_token_is_rejected(self):
+        response = self.client.get(
+            reverse('train-api:crowd-status', kwargs={'pk': self.train.pk}),
+            HTTP_AUTHORIZATION='Bearer not-a-token',
+        )
+        self.assertEqual(response.status_code, 401)
@@ -1,6 +1,7 @@
 # apps/users/api/views/base.py
 from time import timezone
 from typing import Any
+import json
 import logging
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
@@ -9,9 +10,12 @@
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.http import HttpResponse
 from django.utils.translation import gettext_lazy as _
+from ...services.profile_service import ProfileService
 from ...utils.response_helpers import ApiResponse
-from ...utils.decorators import log_api_request, rate_limit
+from metro.ratelimit import rate_limit
+from ...utils.decorators import log_api_request
 
 logger = logging.getLogger(__name__)
 
@@ -68,14 +72,22 @@ def finalize_response(self, request: Any, response: Response, *args: Any, **kwar
 
         return super().finalize_response(request, response, *args, **kwargs)
 
+    def prerendered_success(self, request: Any, data_json: bytes) -> HttpResponse:
+        """ApiResponse.success with data that is already rendered JSON, as finalize_response would send it"""
+        request_id = json.dumps(request.META.get('REQUEST_ID')).encode()
+        return HttpResponse(
+            b'{"success":true,"data":' + data_json + b',"request_id":' + request_id + b',"api_version":"1.0"}',
+            content_type='application/json',
+        )
+
     def get_cache_key(self, prefix: str, identifier: str) -> str:
         """Generate standardized cache key"""
         return f"{prefix}_{identifier}"
 
     def clear_user_cache(self, user_id: int) -> None:
         """Clear all user-related cache"""
+        ProfileService.bump_profile_version(user_id)
         cache_keys = [
-            f'profile_{user_id}',
             f'subscription_{user_id}',
             f'preferences_{user_id}'
         ]
@@ -10,7 +10,8 @@
 from ..serializers.user import UpdateUserSerializer
 from ...services.profile_service import ProfileService
 from ...utils.response_helpers import ApiResponse
-from ...utils.decorators import log_api_request, rate_limit
+from metro.ratelimit import rate_limit
+from ...utils.decorators import log_api_request
 
 logger = logging.getLogger(__name__)
 
@@ -23,17 +24,8 @@ class UserProfileView(BaseAPIView):
     @log_api_request
     def get(self, request):
         try:
-            # Try to get profile from cache
-            cache_key = f'profile_{request.user.id}'
-            profile = cache.get(cache_key)
-
-            if not profile:
-                profile = request.user
-                # Cache profile for 5 minutes
-                cache.set(cache_key, profile, timeout=300)
-
-            serializer = self.serializer_class(profile)
-            return ApiResponse.success(data=serializer.data)
+            profile = ProfileService.get_profile_json(request.user.id)
+            return self.prerendered_success(request, profile)
         except Exception as e:
             return ApiResponse.error(str(e))
 
@@ -66,10 +58,7 @@ def patch(self, request):
             )
 
             # Clear cache
-            cache.delete_many([
-                f'profile_{request.user.id}',
-                f'user_details_{request.user.id}'
-            ])
+            cache.delete(f'user_details_{request.user.id}')
 
             response_serializer = ProfileSerializer(updated_user)
             return ApiResponse.success(
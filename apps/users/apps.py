@@ -9,6 +9,7 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         from django.contrib import admin
+        from . import signals  # noqa: F401
         # Ensure admin customizations are loaded
         admin.site.site_header = "Egypt Metro Administration"
         admin.site.site_title = "Egypt Metro Admin Portal"
@@ -0,0 +1,72 @@
+# apps/users/authentication.py
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+User = get_user_model()
+
+_principals = {}  # user id -> (expires at, password hash claim, field values)
+_principals_lock = threading.Lock()
+_FIELD_NAMES = [field.attname for field in User._meta.concrete_fields]
+
+
+def forget_principal(user_id):
+    """Drop a user from this process's principal cache"""
+    with _principals_lock:
+        _principals.pop(user_id, None)
+
+
+@receiver([post_save, post_delete], sender=User)
+def _forget_changed_user(sender, instance, **kwargs):
+    forget_principal(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that skips the user query for recently seen users
+
+    Users loaded from the database are kept per process for AUTH_PRINCIPAL_TTL
+    seconds. Each request gets its own User instance rebuilt from the cached
+    field values, so views can change and save request.user safely.
+
+    The database is only read again when the entry expires, or when the token's
+    password hash claim (CHECK_REVOKE_TOKEN) no longer matches the cached user.
+    That happens after a password change or for a token issued after this
+    process cached the user. Edits saved in this process drop the entry
+    straight away. Edits saved in other processes, such as deactivation, are
+    picked up within the TTL.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        revoke_claim = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+
+        entry = _principals.get(user_id)
+        if entry is not None:
+            expires_at, password_claim, values = entry
+            revoked = api_settings.CHECK_REVOKE_TOKEN and password_claim != revoke_claim
+            if expires_at > time.monotonic() and not revoked:
+                return User.from_db('default', _FIELD_NAMES, values)
+
+        # Also checks that the user exists, is active and the token is not revoked
+        user = super().get_user(validated_token)
+
+        ttl = getattr(settings, 'AUTH_PRINCIPAL_TTL', 60)
+        if ttl:
+            entry = (
+                time.monotonic() + ttl,
+                get_md5_hash_password(user.password),
+                [getattr(user, name) for name in _FIELD_NAMES],
+            )
+            with _principals_lock:
+                if len(_principals) >= getattr(settings, 'AUTH_PRINCIPAL_MAX_ENTRIES', 10000):
+                    _principals.clear()
+                _principals[user_id] = entry
+        return user
@@ -1,6 +1,8 @@
 # apps/users/services/profile_service.py
 
 import logging
+import time
+from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.core.cache import cache
 from apps.users.constants.messages import UserMessages
@@ -9,7 +11,69 @@
 
 
 class ProfileService:
-    """Service for handling profile-related operations"""
+    """
+    Service for handling profile-related operations
+
+    Profiles are cached as rendered ProfileSerializer JSON under a per-user
+    version, so a hit is served without loading or serializing anything.
+    Saving a user bumps the version once the transaction commits.
+    """
+
+    PROFILE_CACHE_TIMEOUT = 300  # Subscription details in the profile may go stale this long
+
+    @staticmethod
+    def _profile_version_key(user_id):
+        return f"profile_version:{user_id}"
+
+    @staticmethod
+    def _profile_key(user_id, version):
+        return f"profile:{user_id}:v{version}"
+
+    @staticmethod
+    def _get_profile_version(user_id):
+        key = ProfileService._profile_version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            # Start from the clock, never from a value an old profile may use
+            cache.add(key, time.time_ns() // 1000, None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def bump_profile_version(user_id):
+        """Make the cached profile of a user stale"""
+        key = ProfileService._profile_version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns() // 1000, None)
+
+    @staticmethod
+    def invalidate_profile_on_commit(user_id):
+        """Bump the profile version once the current DB transaction commits"""
+        transaction.on_commit(lambda: ProfileService.bump_profile_version(user_id))
+
+    @staticmethod
+    def get_profile_json(user_id):
+        """
+        Get the rendered ProfileSerializer JSON of a user, as bytes
+
+        A miss always renders the user as loaded from the database. The
+        authenticated request.user may come from another worker's principal
+        cache and predate the update that bumped the version.
+        """
+        version = ProfileService._get_profile_version(user_id)
+        key = ProfileService._profile_key(user_id, version)
+
+        profile = cache.get(key)
+        if profile is None:
+            from metro import codec
+            from ..api.serializers.profile import ProfileSerializer
+
+            user = get_user_model().objects.get(pk=user_id)
+            profile = codec.dumps(ProfileSerializer(user).data)
+            cache.add(key, profile, ProfileService.PROFILE_CACHE_TIMEOUT)
+        return profile
 
     @staticmethod
     @transaction.atomic
@@ -56,8 +120,8 @@ def update_profile(user, validated_data):
             user.save()
 
             # Clear cache
+            ProfileService.invalidate_profile_on_commit(user.id)
             cache_keys = [
-                f'profile_{user.id}',
                 f'user_details_{user.id}',
                 f'user_subscription_{user.id}'
             ]
@@ -2,6 +2,7 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import User
+from .services.profile_service import ProfileService
 
 
 @receiver(post_save, sender=User)
@@ -12,3 +13,10 @@ def create_user_profile(sender, instance, created, **kwargs):
     if created:
         # You can add any additional setup needed when a user is created
         pass
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_profile(sender, instance, created, **kwargs):
+    """Admin edits and balance changes reach the profile cache too"""
+    if not created:
+        ProfileService.invalidate_profile_on_commit(instance.pk)
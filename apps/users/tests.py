@@ -0,0 +1,90 @@
+# apps/users/tests.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from .authentication import CachedJWTAuthentication, forget_principal
+from .services.auth_service import AuthService
+from .services.profile_service import ProfileService
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="jwt@example.com", username="jwt", password="testpass123")
+        self.token = AuthService.generate_tokens(self.user)['access']
+        forget_principal(self.user.pk)
+
+    def authenticate(self, token=None):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {token or self.token}")
+        with CaptureQueriesContext(connection) as context:
+            user, _ = CachedJWTAuthentication().authenticate(request)
+        return user, len(context)
+
+    def test_user_query_skipped_once_cached(self):
+        first, first_queries = self.authenticate()
+        second, second_queries = self.authenticate()
+
+        self.assertEqual((first_queries, second_queries), (1, 0))
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertEqual(second.email, self.user.email)
+        self.assertIsNot(first, second)
+
+    def test_password_change_revokes_cached_tokens(self):
+        self.authenticate()
+        self.user.set_password("newpass456")
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        new_token = AuthService.generate_tokens(self.user)['access']
+        self.assertEqual(self.authenticate(new_token)[0].pk, self.user.pk)
+
+    def test_saved_changes_are_not_served_stale(self):
+        self.authenticate()
+        self.user.first_name = "Changed"
+        self.user.save()
+
+        user, queries = self.authenticate()
+        self.assertEqual(queries, 1)
+        self.assertEqual(user.first_name, "Changed")
+
+
+class ProfileCacheTests(TestCase):
+    url = '/api/users/profile/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="profile@example.com", username="profile", password="testpass123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_profile_served_from_cache(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(second.json()['data']['email'], "profile@example.com")
+        self.assertEqual(second.json()['api_version'], '1.0')
+        self.assertEqual(len(context), 0)
+
+    def test_update_profile_bumps_version(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfileService.update_profile(self.user, {'first_name': 'Updated'})
+
+        self.assertEqual(self.client.get(self.url).json()['data']['first_name'], 'Updated')
+
+    def test_miss_renders_database_user_not_request_user(self):
+        # Another worker saved the user; this one still authenticates a stale instance
+        User.objects.filter(pk=self.user.pk).update(first_name='Fresh')
+        ProfileService.bump_profile_version(self.user.pk)
+
+        self.assertEqual(self.client.get(self.url).json()['data']['first_name'], 'Fresh')
@@ -1,12 +1,9 @@
 # utils/helpers.py
-from django.core.cache import cache
-from django.contrib.auth.models import User
+import json
+
+from ..services.profile_service import ProfileService
 
 
 def get_cached_user_profile(user_id):
-    cache_key = f'user_profile_{user_id}'
-    profile = cache.get(cache_key)
-    if not profile:
-        profile = User.objects.get(id=user_id)
-        cache.set(cache_key, profile, timeout=300)
-    return profile
+    """Serialized profile of a user, from the profile cache"""
+    return json.loads(ProfileService.get_profile_json(user_id))
@@ -1,9 +1,11 @@
 __all__ = [
     'UserWalletAdmin',
     'TransactionAdmin',
-    'PaymentMethodAdmin'
+    'PaymentMethodAdmin',
+    'IdempotencyKeyAdmin'
 ]
 
 from .wallet_admin import UserWalletAdmin
 from .transaction_admin import TransactionAdmin
 from .payment_method_admin import PaymentMethodAdmin
+from .idempotency_admin import IdempotencyKeyAdmin
@@ -0,0 +1,15 @@
+from django.contrib import admin
+from ..models.idempotency import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'endpoint', 'response_status', 'created_at')
+    list_filter = ('endpoint', 'response_status', 'created_at')
+    search_fields = ('key', 'user__username', 'user__email')
+    readonly_fields = ('id', 'user', 'key', 'endpoint', 'request_hash',
+                       'response_status', 'response_body', 'created_at')
+    date_hierarchy = 'created_at'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
@@ -46,3 +46,9 @@ class TransactionFilterSerializer(serializers.Serializer):
     start_date = serializers.DateTimeField(required=False)
     end_date = serializers.DateTimeField(required=False)
     limit = serializers.IntegerField(min_value=1, max_value=100, required=False)
+
+
+class TransactionHistorySerializer(TransactionFilterSerializer):
+    """Serializer for cursor-paginated transaction history"""
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, required=False, default=20)
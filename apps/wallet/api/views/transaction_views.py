@@ -2,22 +2,26 @@
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.core.exceptions import ValidationError
 
 from ...services.wallet_service import WalletService
 from ...models.transaction import Transaction
+from metro.query_budget import max_queries
 from ..serializers.transaction_serializers import (
     TransactionListSerializer,
     TransactionDetailSerializer,
-    TransactionFilterSerializer
+    TransactionFilterSerializer,
+    TransactionHistorySerializer
 )
 
 
 class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for transaction operations"""
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 4, 'retrieve': 3}
 
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user)
+        return Transaction.objects.filter(user=self.request.user).select_related('payment_method')
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -67,3 +71,38 @@ def recent(self, request):
             'count': len(transactions),
             'data': serializer.data
         })
+
+    @action(detail=False, methods=['get'])
+    @max_queries(3)
+    def history(self, request):
+        """Get transaction history, paginated by cursor"""
+        serializer = TransactionHistorySerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page = WalletService.get_transaction_page(
+                user=request.user,
+                cursor=serializer.validated_data.get('cursor'),
+                page_size=serializer.validated_data['page_size'],
+                transaction_type=serializer.validated_data.get('type'),
+                status=serializer.validated_data.get('status'),
+                start_date=serializer.validated_data.get('start_date'),
+                end_date=serializer.validated_data.get('end_date')
+            )
+        except ValidationError as e:
+            return Response({
+                'success': False,
+                'message': str(e.messages[0])
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'count': len(page['results']),
+            'next_cursor': page['next_cursor'],
+            'data': page['results']
+        })
@@ -6,6 +6,9 @@
 from django.db import transaction
 
 from ...services.wallet_service import WalletService
+from ...services.summary_service import WalletSummaryService
+from ...utils.decorators import idempotent
+from metro.query_budget import max_queries
 from ...models.wallet import UserWallet
 from ...models.payment_method import PaymentMethod
 from ..serializers.wallet_serializers import (
@@ -24,17 +27,40 @@ def get_queryset(self):
         return UserWallet.objects.filter(user=self.request.user)
 
     @action(detail=False, methods=['get'])
+    @max_queries(8)
     def my_wallet(self, request):
         """Get user's wallet details"""
-        wallet = WalletService.get_or_create_wallet(request.user)
-        serializer = WalletSerializer(wallet)
+        summary = WalletSummaryService.get_summary(request.user)
+
+        if summary['wallet'] is None:
+            wallet = WalletService.get_or_create_wallet(request.user)
+            return Response({
+                'success': True,
+                'data': WalletSerializer(wallet).data
+            })
+
+        return Response({
+            'success': True,
+            'data': summary['wallet']
+        })
+
+    @action(detail=False, methods=['get'])
+    @max_queries(8)
+    def summary(self, request):
+        """Get balance, recent transactions and pending count in one call"""
+        summary = WalletSummaryService.get_summary(request.user)
 
         return Response({
             'success': True,
-            'data': serializer.data
+            'data': {
+                'balance': summary['balance'],
+                'recent_transactions': summary['recent_transactions'],
+                'pending_count': summary['pending_count']
+            }
         })
 
     @action(detail=False, methods=['post'])
+    @idempotent('wallet.add_funds')
     @transaction.atomic
     def add_funds(self, request):
         """Add funds to user's wallet"""
@@ -86,6 +112,7 @@ def add_funds(self, request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'])
+    @idempotent('wallet.withdraw_funds')
     @transaction.atomic
     def withdraw_funds(self, request):
         """Withdraw funds from user's wallet"""
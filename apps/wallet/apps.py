@@ -5,3 +5,6 @@ class WalletConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.wallet"
     verbose_name = 'Wallet Management'
+
+    def ready(self):
+        import apps.wallet.signals  # noqa: F401
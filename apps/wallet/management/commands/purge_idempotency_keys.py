@@ -0,0 +1,15 @@
+# apps/wallet/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+
+from apps.wallet.services.idempotency_service import IdempotencyService
+
+
+class Command(BaseCommand):
+    help = (
+        f"Delete idempotency keys older than {IdempotencyService.RETENTION_DAYS} days "
+        "(run periodically, e.g. from cron)"
+    )
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyService.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys"))
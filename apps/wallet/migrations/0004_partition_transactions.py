@@ -0,0 +1,21 @@
+# Partition the transaction table by month on PostgreSQL; a no-op elsewhere
+
+from django.db import migrations
+
+from metro.partitioning import partition_table
+
+
+def partition_transactions(apps, schema_editor):
+    partition_table(schema_editor, "wallet_transaction", "created_at")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet", "0003_idempotencykey"),
+    ]
+
+    operations = [
+        # A partitioned table works as a plain one for Django, so there is nothing to undo
+        migrations.RunPython(partition_transactions, migrations.RunPython.noop),
+    ]
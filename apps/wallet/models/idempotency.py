@@ -0,0 +1,36 @@
+import uuid
+from django.db import models
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+
+class IdempotencyKey(models.Model):
+    """Stored result of a wallet-affecting request, replayed when the client retries with the same key"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=100)
+    request_hash = models.CharField(max_length=64, help_text=_("SHA-256 of the request payload"))
+
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Idempotency Key")
+        verbose_name_plural = _("Idempotency Keys")
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} - {self.key}"
@@ -69,7 +69,10 @@ class Meta:
         verbose_name_plural = _("Transactions")
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['user'], name='transaction_user_idx'),
+            # Keyset pagination of a user's history: (user, created_at, id)
+            models.Index(fields=['user', 'created_at', 'id'], name='transaction_user_date_idx'),
+            models.Index(fields=['user', 'type', 'status', 'created_at'],
+                         name='transaction_user_filter_idx'),
             models.Index(fields=['wallet'], name='transaction_wallet_idx'),
             models.Index(fields=['type'], name='transaction_type_idx'),
             models.Index(fields=['status'], name='transaction_status_idx'),
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from metro import codec
+
+from ..models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyService:
+    """Stores and replays responses of wallet-affecting requests keyed by the client's Idempotency-Key"""
+
+    HEADER = 'HTTP_IDEMPOTENCY_KEY'
+    MAX_KEY_LENGTH = 255
+    CACHE_TIMEOUT = 60 * 60 * 24  # Replays within a day are served from the cache
+    LOCK_TIMEOUT = 30  # Longest a single request may hold the key
+    RETENTION_DAYS = 7  # Older keys are no longer replayed and are purged
+
+    @staticmethod
+    def _cache_key(user_id, key):
+        return f"idempotency:{user_id}:{key}"
+
+    @staticmethod
+    def _lock_key(user_id, key):
+        return f"idempotency_lock:{user_id}:{key}"
+
+    @staticmethod
+    def get_key(request):
+        """Return the idempotency key sent with the request, if any"""
+        key = request.META.get(IdempotencyService.HEADER, '').strip()
+        return key or None
+
+    @staticmethod
+    def hash_request(request, endpoint):
+        """Fingerprint the payload so a reused key with a different body can be rejected"""
+        payload = json.dumps(request.data, sort_keys=True, default=str)
+        return hashlib.sha256(f"{endpoint}:{request.path}:{payload}".encode()).hexdigest()
+
+    @staticmethod
+    def get_stored_response(user, key):
+        """
+        Get the stored response for a key
+
+        Returns:
+            dict or None: {'request_hash', 'status', 'body'}
+        """
+        cache_key = IdempotencyService._cache_key(user.id, key)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return stored
+
+        record = IdempotencyKey.objects.filter(
+            user=user, key=key, created_at__gte=IdempotencyService.expiry_cutoff()
+        ).values(
+            'request_hash', 'response_status', 'response_body'
+        ).first()
+        if record is None:
+            return None
+
+        stored = {
+            'request_hash': record['request_hash'],
+            'status': record['response_status'],
+            'body': record['response_body'],
+        }
+        cache.set(cache_key, stored, IdempotencyService.CACHE_TIMEOUT)
+        return stored
+
+    @staticmethod
+    def acquire_lock(user, key):
+        """Take the short per-key lock, returns False if another request holds it"""
+        return cache.add(IdempotencyService._lock_key(user.id, key), True, IdempotencyService.LOCK_TIMEOUT)
+
+    @staticmethod
+    def release_lock(user, key):
+        cache.delete(IdempotencyService._lock_key(user.id, key))
+
+    @staticmethod
+    def expiry_cutoff():
+        return timezone.now() - timedelta(days=IdempotencyService.RETENTION_DAYS)
+
+    @staticmethod
+    def store_response(user, key, endpoint, request_hash, response):
+        """
+        Persist a completed response and prime the replay cache once it commits
+
+        Call inside the transaction that made the response's changes, so the
+        key is stored if and only if they are.
+
+        Returns:
+            bool: False if the key was already stored by another request
+        """
+        # Store exactly what the client received
+        body = codec.loads(codec.dumps(response.data))
+        stored = {
+            'request_hash': request_hash,
+            'status': response.status_code,
+            'body': body,
+        }
+
+        try:
+            with transaction.atomic():
+                # An expired record for the key no longer replays, make way for the new one
+                IdempotencyKey.objects.filter(
+                    user=user, key=key, created_at__lt=IdempotencyService.expiry_cutoff()
+                ).delete()
+                IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    endpoint=endpoint,
+                    request_hash=request_hash,
+                    response_status=response.status_code,
+                    response_body=body
+                )
+        except IntegrityError:
+            logger.warning(f"Idempotency key {key} was already stored for user {user.id}")
+            return False
+
+        cache_key = IdempotencyService._cache_key(user.id, key)
+        transaction.on_commit(lambda: cache.set(cache_key, stored, IdempotencyService.CACHE_TIMEOUT))
+        return True
+
+    @staticmethod
+    def purge_expired(batch_size=1000):
+        """
+        Delete keys past the retention period, in batches
+
+        Returns:
+            int: Number of keys deleted
+        """
+        cutoff = IdempotencyService.expiry_cutoff()
+        deleted = 0
+        while True:
+            ids = list(
+                IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
@@ -2,6 +2,8 @@
 from django.db import transaction
 from django.core.exceptions import ValidationError
 
+from metro.registry import registry
+
 from .payment_service import PaymentService
 
 
@@ -13,7 +15,6 @@ class TicketIntegrationService:
     def purchase_ticket(user, ticket_type, quantity=1):
         """Purchase a ticket using the wallet"""
         from apps.tickets.constants.choices import TicketChoices
-        from apps.tickets.services.ticket_service import TicketService
 
         # Get ticket price
         ticket_details = TicketChoices.TICKET_TYPES.get(ticket_type)
@@ -36,7 +37,7 @@ def purchase_ticket(user, ticket_type, quantity=1):
 
         # Create the ticket(s) if payment was successful
         try:
-            ticket_service = TicketService()
+            ticket_service = registry.get('ticket_service')
             tickets = ticket_service.create_ticket(
                 user=user,
                 ticket_type=ticket_type,
@@ -80,7 +81,6 @@ def purchase_ticket(user, ticket_type, quantity=1):
     def upgrade_ticket(user, ticket_number, new_ticket_type):
         """Upgrade a ticket using the wallet"""
         from apps.tickets.constants.choices import TicketChoices
-        from apps.tickets.services.ticket_service import TicketService
         from apps.tickets.models.ticket import Ticket
 
         try:
@@ -113,7 +113,7 @@ def upgrade_ticket(user, ticket_number, new_ticket_type):
                 return payment_result
 
             # Upgrade the ticket if payment was successful
-            ticket_service = TicketService()
+            ticket_service = registry.get('ticket_service')
             upgrade_result = ticket_service.upgrade_ticket(
                 ticket_number=ticket_number,
                 new_ticket_type=new_ticket_type,
@@ -158,14 +158,13 @@ class SubscriptionIntegrationService:
     def purchase_subscription(user, subscription_type, zones_count, start_station_id=None, end_station_id=None):
         """Purchase a subscription using the wallet"""
         from apps.tickets.constants.pricing import SubscriptionPricing
-        from apps.tickets.services.subscription_service import SubscriptionService
 
         # Determine price based on type and zones
         if subscription_type == 'MONTHLY':
-            price_category = SubscriptionService().get_price_category(zones_count)
+            price_category = registry.get('subscription_service').get_price_category(zones_count)
             price = SubscriptionPricing.MONTHLY.get(price_category)
         elif subscription_type == 'QUARTERLY':
-            price_category = SubscriptionService().get_price_category(zones_count)
+            price_category = registry.get('subscription_service').get_price_category(zones_count)
             price = SubscriptionPricing.QUARTERLY.get(price_category)
         elif subscription_type == 'ANNUAL':
             price = SubscriptionPricing.ANNUAL['LINES_1_2'] if zones_count == 2 else SubscriptionPricing.ANNUAL['ALL_LINES']
@@ -190,7 +189,7 @@ def purchase_subscription(user, subscription_type, zones_count, start_station_id
 
         # Create the subscription if payment was successful
         try:
-            subscription_service = SubscriptionService()
+            subscription_service = registry.get('subscription_service')
             subscription = subscription_service.create_subscription(
                 user=user,
                 subscription_type=subscription_type,
@@ -5,6 +5,7 @@
 from ..models.wallet import UserWallet
 from ..models.transaction import Transaction
 from .wallet_service import WalletService
+from .spend_service import SpendCounterService
 
 
 class PaymentService:
@@ -57,6 +58,7 @@ def process_payment(
             # Update transaction status
             transaction.status = 'COMPLETED'
             transaction.save(update_fields=['status', 'updated_at'])
+            SpendCounterService.record(transaction)
 
             return {
                 'success': True,
@@ -120,6 +122,9 @@ def process_refund(transaction_id):
             original_transaction.status = 'REFUNDED'
             original_transaction.save(update_fields=['status', 'updated_at'])
 
+            SpendCounterService.record(refund_transaction)
+            SpendCounterService.release(original_transaction)
+
             return {
                 'success': True,
                 'wallet': wallet,
@@ -0,0 +1,158 @@
+import datetime
+import logging
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class SpendCounterService:
+    """
+    Rolling daily and monthly spend counters per user and transaction type.
+
+    Counters live in the cache as integer piastres, keyed by the calendar day
+    or month (UTC) they cover, so they roll over without any cleanup. They are
+    bumped after the wallet transaction commits; on a cache miss the total is
+    rebuilt once from a single ``Sum`` aggregate and cached again.
+
+    A transaction committing while a rebuild runs may be missed by the
+    aggregate and also find no counter to bump. Every bump therefore also
+    advances a per user and type generation; a rebuild that sees it move is
+    returned but not cached. Rebuilt counters expire after REBUILD_TIMEOUT,
+    which bounds the error of any remaining interleaving.
+    """
+
+    CACHE_PREFIX = 'wallet_spend'
+    DAILY_TIMEOUT = 60 * 60 * 48  # Two days, comfortably covers the period
+    MONTHLY_TIMEOUT = 60 * 60 * 24 * 32  # One month plus a day
+    REBUILD_TIMEOUT = 60 * 10  # Rebuilt counters are recomputed at least this often
+
+    @staticmethod
+    def _to_piastres(amount):
+        return int((Decimal(str(amount)) * 100).to_integral_value())
+
+    @staticmethod
+    def _from_piastres(value):
+        return Decimal(value) / 100
+
+    @staticmethod
+    def _periods(moment=None):
+        """Return (period, cache suffix, start, end, timeout) for the day and month of moment"""
+        moment = moment or timezone.now()
+        day = moment.astimezone(datetime.timezone.utc).date()
+
+        day_start = datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+        month_start = datetime.datetime(day.year, day.month, 1, tzinfo=datetime.timezone.utc)
+        if day.month == 12:
+            next_month = datetime.datetime(day.year + 1, 1, 1, tzinfo=datetime.timezone.utc)
+        else:
+            next_month = datetime.datetime(day.year, day.month + 1, 1, tzinfo=datetime.timezone.utc)
+
+        return [
+            ('daily', day.strftime('%Y%m%d'), day_start, day_start + datetime.timedelta(days=1),
+             SpendCounterService.DAILY_TIMEOUT),
+            ('monthly', day.strftime('%Y%m'), month_start, next_month,
+             SpendCounterService.MONTHLY_TIMEOUT),
+        ]
+
+    @classmethod
+    def _cache_key(cls, user_id, transaction_type, suffix):
+        return f"{cls.CACHE_PREFIX}:{user_id}:{transaction_type}:{suffix}"
+
+    @classmethod
+    def _generation_key(cls, user_id, transaction_type):
+        return f"{cls.CACHE_PREFIX}:{user_id}:{transaction_type}:generation"
+
+    @classmethod
+    def get_totals(cls, user, transaction_type, moment=None):
+        """
+        Get the completed spend of a user for the current day and month
+
+        Args:
+            user: User model instance
+            transaction_type: Transaction type to total
+            moment: Point in time the periods are computed for (defaults to now)
+
+        Returns:
+            dict: {'daily': Decimal, 'monthly': Decimal}
+        """
+        periods = cls._periods(moment)
+        generation_key = cls._generation_key(user.id, transaction_type)
+        keys = [cls._cache_key(user.id, transaction_type, suffix) for _, suffix, _, _, _ in periods]
+        cached = cache.get_many(keys + [generation_key])
+
+        totals = {}
+        for period, suffix, start, end, timeout in periods:
+            key = cls._cache_key(user.id, transaction_type, suffix)
+            if key in cached:
+                totals[period] = cls._from_piastres(cached[key])
+                continue
+
+            # Fallback: rebuild the counter from the database
+            total = Transaction.objects.filter(
+                user=user,
+                type=transaction_type,
+                status='COMPLETED',
+                created_at__gte=start,
+                created_at__lt=end
+            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+
+            # Only cache it if no transaction was recorded while it was summed
+            if cache.get(generation_key) == cached.get(generation_key):
+                cache.add(key, cls._to_piastres(total), min(timeout, cls.REBUILD_TIMEOUT))
+            totals[period] = total
+
+        return totals
+
+    @classmethod
+    def _apply(cls, user_id, transaction_type, amount, created_at):
+        delta = cls._to_piastres(amount)
+        for _, suffix, _, _, _ in cls._periods(created_at):
+            key = cls._cache_key(user_id, transaction_type, suffix)
+            try:
+                # Missing counters are left alone, the next read rebuilds them
+                cache.incr(key, delta)
+            except ValueError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to update spend counter {key}: {str(e)}")
+                cache.delete(key)
+
+        # After the counters, so a rebuild that started before this sees it move
+        generation_key = cls._generation_key(user_id, transaction_type)
+        try:
+            cache.incr(generation_key)
+        except ValueError:
+            cache.set(generation_key, 1, cls.MONTHLY_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to update spend generation {generation_key}: {str(e)}")
+
+    @classmethod
+    def record(cls, wallet_transaction):
+        """Add a completed transaction to the counters once the surrounding DB transaction commits"""
+        user_id = wallet_transaction.user_id
+        transaction_type = wallet_transaction.type
+        amount = wallet_transaction.amount
+        created_at = wallet_transaction.created_at
+
+        transaction.on_commit(
+            lambda: cls._apply(user_id, transaction_type, amount, created_at)
+        )
+
+    @classmethod
+    def release(cls, wallet_transaction):
+        """Remove a transaction that is no longer completed (e.g. refunded) from the counters on commit"""
+        user_id = wallet_transaction.user_id
+        transaction_type = wallet_transaction.type
+        amount = -Decimal(wallet_transaction.amount)
+        created_at = wallet_transaction.created_at
+
+        transaction.on_commit(
+            lambda: cls._apply(user_id, transaction_type, amount, created_at)
+        )
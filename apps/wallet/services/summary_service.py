@@ -0,0 +1,154 @@
+import logging
+import time
+import weakref
+
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models.wallet import UserWallet
+from ..models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class WalletSummaryService:
+    """
+    Cached per-user wallet summary: wallet fields, balance, recent transactions
+    and pending transaction count.
+
+    Each user has a version counter and the summary is stored under the current
+    version. Saving or deleting a wallet or transaction calls ``refresh_on_commit``
+    (apps/wallet/signals.py), which bumps the version and writes the new summary
+    after the DB transaction commits, so a reader never gets a summary older
+    than the last committed write. Queryset ``update()`` sends no signals; call
+    ``refresh_on_commit`` after one.
+    """
+
+    RECENT_TRANSACTIONS = 5
+    CACHE_TIMEOUT = 60 * 60  # Versions make expiry a memory concern only
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"wallet_summary_version:{user_id}"
+
+    @staticmethod
+    def _summary_key(user_id, version):
+        return f"wallet_summary:{user_id}:v{version}"
+
+    @staticmethod
+    def _new_version():
+        # A lost counter restarts from the clock, never from a value an old summary may use
+        return time.time_ns() // 1000
+
+    @staticmethod
+    def _get_version(user_id):
+        key = WalletSummaryService._version_key(user_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, WalletSummaryService._new_version(), None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def _bump_version(user_id):
+        key = WalletSummaryService._version_key(user_id)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            version = WalletSummaryService._new_version()
+            cache.set(key, version, None)
+            return version
+
+    @staticmethod
+    def build_summary(user_id):
+        """Build the summary from the database"""
+        from ..api.serializers.wallet_serializers import WalletSerializer
+        from .wallet_service import WalletService
+
+        wallet = UserWallet.objects.filter(user_id=user_id).values(
+            'id', 'balance', 'is_active', 'created_at', 'updated_at'
+        ).first()
+
+        if wallet is None:
+            return {
+                'wallet': None,
+                'balance': '0.00',
+                'recent_transactions': [],
+                'pending_count': 0,
+            }
+
+        recent = WalletService.get_transaction_page(
+            user_id, page_size=WalletSummaryService.RECENT_TRANSACTIONS
+        )['results']
+        pending_count = Transaction.objects.filter(user_id=user_id, status='PENDING').count()
+
+        wallet_data = dict(WalletSerializer(wallet).data)
+        return {
+            'wallet': wallet_data,
+            'balance': wallet_data['balance'],
+            'recent_transactions': recent,
+            'pending_count': pending_count,
+        }
+
+    @staticmethod
+    def get_summary(user):
+        """Get the wallet summary of a user, building it on a cache miss"""
+        version = WalletSummaryService._get_version(user.id)
+        key = WalletSummaryService._summary_key(user.id, version)
+
+        summary = cache.get(key)
+        if summary is None:
+            summary = WalletSummaryService.build_summary(user.id)
+            # add() so a concurrent write-through for this version is never overwritten
+            cache.add(key, summary, WalletSummaryService.CACHE_TIMEOUT)
+
+        return summary
+
+    @staticmethod
+    def refresh(user_id):
+        """Bump the user's version and write the fresh summary under it"""
+        try:
+            version = WalletSummaryService._bump_version(user_id)
+            summary = WalletSummaryService.build_summary(user_id)
+            cache.set(WalletSummaryService._summary_key(user_id, version), summary,
+                      WalletSummaryService.CACHE_TIMEOUT)
+        except Exception as e:
+            # Readers fall back to a rebuild under whatever version is current
+            logger.error(f"Failed to refresh wallet summary for user {user_id}: {str(e)}")
+
+    @staticmethod
+    def refresh_on_commit(user_id):
+        """
+        Schedule a write-through refresh once the current DB transaction commits
+
+        A transaction saving several rows of one user refreshes it only once.
+        A refresh already pending on this connection is reused: it was
+        registered at this savepoint level or an enclosing one, since a
+        rolled back savepoint drops its callbacks. Only weak references are
+        kept, so a dropped callback leaves the registry with it.
+        """
+        connection = transaction.get_connection()
+        key = (id(connection), user_id)
+        pending = _pending_refreshes.get(key)
+        if connection.in_atomic_block and pending is not None and not pending.done:
+            return
+
+        callback = _SummaryRefresh(user_id)
+        _pending_refreshes[key] = callback
+        transaction.on_commit(callback)
+
+
+class _SummaryRefresh:
+    """An on_commit callback refreshing one user's summary"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        WalletSummaryService.refresh(self.user_id)
+
+
+# (connection, user id) -> refresh scheduled on that connection and not yet dropped
+_pending_refreshes = weakref.WeakValueDictionary()
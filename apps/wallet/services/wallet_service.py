@@ -1,10 +1,15 @@
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Q
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
 from ..models.wallet import UserWallet
 from ..models.transaction import Transaction
+from ..models.payment_method import PaymentMethod
+from .spend_service import SpendCounterService
+from .summary_service import WalletSummaryService
+from ..utils.pagination import encode_cursor, decode_cursor
 
 User = get_user_model()
 
@@ -48,6 +53,7 @@ def add_funds(user, amount, payment_method=None, reference=None, description=Non
             # Update transaction status
             transaction.status = 'COMPLETED'
             transaction.save(update_fields=['status', 'updated_at'])
+            SpendCounterService.record(transaction)
 
             return {
                 'success': True,
@@ -101,6 +107,7 @@ def withdraw_funds(user, amount, description=None):
             # Update transaction status
             transaction.status = 'COMPLETED'
             transaction.save(update_fields=['status', 'updated_at'])
+            SpendCounterService.record(transaction)
 
             return {
                 'success': True,
@@ -123,19 +130,14 @@ def withdraw_funds(user, amount, description=None):
 
     @staticmethod
     def get_wallet_balance(user):
-        """Get a user's wallet balance"""
-        try:
-            wallet = UserWallet.objects.get(user=user)
-            return wallet.balance
-        except UserWallet.DoesNotExist:
-            # Create wallet if it doesn't exist
-            wallet = UserWallet.objects.create(user=user)
-            return wallet.balance
+        """Get a user's wallet balance from the cached wallet summary"""
+        # Users without a wallet read as zero; the wallet is created on first deposit
+        return Decimal(WalletSummaryService.get_summary(user)['balance'])
 
     @staticmethod
     def get_transaction_history(user, transaction_type=None, status=None, start_date=None, end_date=None, limit=None):
         """Get a user's transaction history with optional filters"""
-        queryset = Transaction.objects.filter(user=user)
+        queryset = Transaction.objects.filter(user=user).select_related('payment_method')
 
         if transaction_type:
             queryset = queryset.filter(type=transaction_type)
@@ -155,3 +157,68 @@ def get_transaction_history(user, transaction_type=None, status=None, start_date
             queryset = queryset[:limit]
 
         return queryset
+
+    HISTORY_FIELDS = (
+        'id', 'amount', 'type', 'status', 'payment_method_id',
+        'reference_number', 'description', 'created_at'
+    )
+
+    @staticmethod
+    def get_transaction_page(user, cursor=None, page_size=20, transaction_type=None, status=None,
+                             start_date=None, end_date=None):
+        """
+        Get one page of a user's transaction history using keyset pagination
+
+        Rows are ordered by (created_at, id) descending and the cursor points at
+        the last row of the previous page, so every page is a single index range
+        scan on (user, created_at, id) no matter how deep it is.
+
+        Returns:
+            dict: {'results': list of dicts, 'next_cursor': str or None}
+        """
+        queryset = Transaction.objects.filter(user=user)
+
+        if transaction_type:
+            queryset = queryset.filter(type=transaction_type)
+
+        if status:
+            queryset = queryset.filter(status=status)
+
+        if start_date:
+            queryset = queryset.filter(created_at__gte=start_date)
+
+        if end_date:
+            queryset = queryset.filter(created_at__lte=end_date)
+
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+            )
+
+        # Fetch one extra row to know whether there is a next page
+        rows = list(
+            queryset.order_by('-created_at', '-id').values(*WalletService.HISTORY_FIELDS)[:page_size + 1]
+        )
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        # Resolve payment method names for the whole page in one query
+        method_ids = {row['payment_method_id'] for row in rows if row['payment_method_id']}
+        method_names = {
+            method.id: str(method)
+            for method in PaymentMethod.objects.filter(id__in=method_ids)
+        } if method_ids else {}
+
+        for row in rows:
+            row['amount'] = str(row['amount'])
+            row['payment_method_name'] = method_names.get(row.pop('payment_method_id'))
+
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+        return {
+            'results': rows,
+            'next_cursor': next_cursor
+        }
@@ -0,0 +1,17 @@
+# apps/wallet/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models.transaction import Transaction
+from .models.wallet import UserWallet
+from .services.summary_service import WalletSummaryService
+
+
+@receiver([post_save, post_delete], sender=UserWallet)
+@receiver([post_save, post_delete], sender=Transaction)
+def refresh_wallet_summary(sender, instance, **kwargs):
+    """Refresh the owner's cached wallet summary once the change commits"""
+    if kwargs.get("raw", False):
+        return
+    WalletSummaryService.refresh_on_commit(instance.user_id)
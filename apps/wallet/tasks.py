@@ -0,0 +1,28 @@
+# apps/wallet/tasks.py
+from django.contrib.auth import get_user_model
+
+from apps.jobs.queue import task
+
+from .models.transaction import Transaction
+from .utils import notification_helpers
+
+
+@task(max_attempts=5)
+def send_transaction_notification(transaction_id, notification_type):
+    transaction = Transaction.objects.select_related('user', 'wallet').get(id=transaction_id)
+    notification_helpers.send_transaction_notification(transaction, notification_type, fail_silently=False)
+
+
+@task(max_attempts=5)
+def send_low_balance_notification(user_id, threshold=20.0):
+    """Checks the balance when the job runs, so a top-up in between cancels it"""
+    user = get_user_model().objects.select_related('wallet').get(id=user_id)
+    notification_helpers.send_low_balance_notification(
+        user, user.wallet.balance, threshold, fail_silently=False
+    )
+
+
+@task
+def send_push_notification(user_id, title, body, data=None):
+    user = get_user_model().objects.get(id=user_id)
+    notification_helpers.send_push_notification(user, title, body, data)
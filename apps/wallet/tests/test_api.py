@@ -0,0 +1,87 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ..models.idempotency import IdempotencyKey
+from ..models.transaction import Transaction
+from ..services.idempotency_service import IdempotencyService
+from ..services.wallet_service import WalletService
+
+User = get_user_model()
+
+
+class IdempotentWalletApiTests(APITestCase):
+    url = '/api/wallet/wallet/add_funds/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="retry@example.com",
+            username="retry",
+            password="testpass123",
+        )
+        WalletService.get_or_create_wallet(self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_retry_replays_original_response(self):
+        first = self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+        retry = self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(IdempotencyKey.objects.filter(user=self.user).count(), 1)
+
+    def test_replay_survives_cache_loss(self):
+        self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+        cache.clear()
+        retry = self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-2')
+
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(WalletService.get_wallet_balance(self.user), Decimal('25.00'))
+
+    def test_key_reused_with_different_payload(self):
+        self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-3')
+        response = self.client.post(self.url, {'amount': '30.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-3')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self.client.post(self.url, {'amount': '25.00'}, format='json')
+        self.client.post(self.url, {'amount': '25.00'}, format='json')
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_failed_key_write_rolls_back_the_charge(self):
+        with mock.patch.object(IdempotencyService, 'store_response', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-4')
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 0)
+        self.assertEqual(WalletService.get_wallet_balance(self.user), Decimal('0.00'))
+
+    def test_expired_keys_are_not_replayed_and_get_purged(self):
+        self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-5')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=IdempotencyService.RETENTION_DAYS + 1))
+        cache.clear()
+
+        retry = self.client.post(self.url, {'amount': '25.00'}, format='json', HTTP_IDEMPOTENCY_KEY='abc-5')
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+        IdempotencyKey.objects.create(
+            user=self.user, key='old', endpoint='wallet.add_funds', request_hash='x', response_status=200
+        )
+        IdempotencyKey.objects.filter(key='old').update(created_at=timezone.now() - timedelta(days=30))
+        call_command('purge_idempotency_keys', stdout=mock.MagicMock())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['abc-5'])
@@ -0,0 +1,203 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.query import QuerySet
+from django.test import TestCase
+
+from ..models.transaction import Transaction
+from ..models.wallet import UserWallet
+from ..services.payment_service import PaymentService
+from ..services.spend_service import SpendCounterService
+from ..services.summary_service import WalletSummaryService
+from ..services.wallet_service import WalletService
+from ..utils.validators import validate_transaction_limits
+
+User = get_user_model()
+
+
+class SpendCounterServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="rider@example.com",
+            username="rider",
+            password="testpass123",
+        )
+        WalletService.get_or_create_wallet(self.user)
+
+    def test_totals_fall_back_to_database(self):
+        """Counters are rebuilt from the DB aggregate on a cache miss"""
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.add_funds(self.user, Decimal('150.00'))
+            WalletService.add_funds(self.user, Decimal('50.00'))
+
+        cache.clear()
+        with self.assertNumQueries(2):
+            totals = SpendCounterService.get_totals(self.user, 'DEPOSIT')
+        self.assertEqual(totals['daily'], Decimal('200.00'))
+        self.assertEqual(totals['monthly'], Decimal('200.00'))
+
+        # Second read is served from the cache
+        with self.assertNumQueries(0):
+            SpendCounterService.get_totals(self.user, 'DEPOSIT')
+
+    def test_rebuild_racing_a_commit_is_not_cached(self):
+        """A transaction committed while the total is summed must not be lost from the counter"""
+        aggregate = QuerySet.aggregate
+
+        def commit_during_aggregate(queryset, *args, **kwargs):
+            result = aggregate(queryset, *args, **kwargs)
+            with self.captureOnCommitCallbacks(execute=True):
+                WalletService.add_funds(self.user, Decimal('20.00'))
+            return result
+
+        with mock.patch.object(QuerySet, 'aggregate', commit_during_aggregate):
+            stale = SpendCounterService.get_totals(self.user, 'DEPOSIT')
+        self.assertEqual(stale['daily'], Decimal('0'))
+
+        totals = SpendCounterService.get_totals(self.user, 'DEPOSIT')
+        self.assertEqual(totals['daily'], Decimal('40.00'))
+        self.assertEqual(totals['monthly'], Decimal('40.00'))
+
+    def test_counters_follow_committed_transactions(self):
+        """Deposits and refunds update warm counters without hitting the DB"""
+        SpendCounterService.get_totals(self.user, 'DEPOSIT')
+        SpendCounterService.get_totals(self.user, 'TICKET_PURCHASE')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.add_funds(self.user, Decimal('100.00'))
+            result = PaymentService.process_payment(self.user, Decimal('30.00'), 'TICKET_PURCHASE')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(SpendCounterService.get_totals(self.user, 'DEPOSIT')['daily'], Decimal('100.00'))
+            self.assertEqual(SpendCounterService.get_totals(self.user, 'TICKET_PURCHASE')['daily'], Decimal('30.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PaymentService.process_refund(result['transaction'].id)
+
+        totals = SpendCounterService.get_totals(self.user, 'TICKET_PURCHASE')
+        self.assertEqual(totals['daily'], Decimal('0'))
+        self.assertEqual(totals['monthly'], Decimal('0'))
+
+    def test_daily_limit_uses_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                WalletService.add_funds(self.user, Decimal('5000.00'))
+
+        with self.assertRaises(ValidationError):
+            validate_transaction_limits(self.user, Decimal('10.00'), 'DEPOSIT')
+
+
+class TransactionHistoryPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="history@example.com",
+            username="history",
+            password="testpass123",
+        )
+        WalletService.get_or_create_wallet(self.user)
+        for amount in range(1, 8):
+            WalletService.add_funds(self.user, Decimal(amount))
+
+    def test_pages_walk_the_full_history(self):
+        seen = []
+        cursor = None
+        while True:
+            page = WalletService.get_transaction_page(self.user, cursor=cursor, page_size=3)
+            seen.extend(row['id'] for row in page['results'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_page_rows_are_projections(self):
+        page = WalletService.get_transaction_page(self.user, page_size=2, transaction_type='DEPOSIT')
+        self.assertEqual(len(page['results']), 2)
+        self.assertIsInstance(page['results'][0], dict)
+        self.assertIn('payment_method_name', page['results'][0])
+        self.assertIsNotNone(page['next_cursor'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValidationError):
+            WalletService.get_transaction_page(self.user, cursor='not-a-cursor')
+
+
+class WalletSummaryServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="summary@example.com",
+            username="summary",
+            password="testpass123",
+        )
+
+    def test_balance_read_does_not_create_wallet(self):
+        self.assertEqual(WalletService.get_wallet_balance(self.user), Decimal('0'))
+        self.assertFalse(UserWallet.objects.filter(user=self.user).exists())
+
+    def test_summary_is_written_through_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.get_or_create_wallet(self.user)
+        WalletSummaryService.get_summary(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.add_funds(self.user, Decimal('40.00'))
+            WalletService.withdraw_funds(self.user, Decimal('15.00'))
+
+        with self.assertNumQueries(0):
+            summary = WalletSummaryService.get_summary(self.user)
+            balance = WalletService.get_wallet_balance(self.user)
+
+        self.assertEqual(balance, Decimal('25.00'))
+        self.assertEqual(summary['pending_count'], 0)
+        self.assertEqual(
+            [row['type'] for row in summary['recent_transactions']],
+            ['WITHDRAW', 'DEPOSIT']
+        )
+
+    def test_direct_model_changes_refresh_the_summary_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet = WalletService.get_or_create_wallet(self.user)
+        WalletSummaryService.get_summary(self.user)
+
+        # e.g. an admin edit, which goes through none of the services
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            wallet.balance = Decimal('12.00')
+            wallet.save()
+            Transaction.objects.create(user=self.user, wallet=wallet, amount=Decimal('12.00'), type='DEPOSIT')
+        self.assertEqual(len(callbacks), 1)
+
+        with self.assertNumQueries(0):
+            summary = WalletSummaryService.get_summary(self.user)
+        self.assertEqual(summary['balance'], '12.00')
+        self.assertEqual(summary['pending_count'], 1)
+
+    def test_refresh_dropped_with_a_savepoint_is_scheduled_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            wallet = WalletService.get_or_create_wallet(self.user)
+        WalletSummaryService.get_summary(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    wallet.balance = Decimal('99.00')
+                    wallet.save()
+                    raise RuntimeError("rolled back")
+            except RuntimeError:
+                pass
+            Transaction.objects.create(user=self.user, wallet=wallet, amount=Decimal('5.00'), type='DEPOSIT')
+        self.assertEqual(len(callbacks), 1)
+
+        with self.assertNumQueries(0):
+            summary = WalletSummaryService.get_summary(self.user)
+        self.assertEqual(summary['pending_count'], 1)
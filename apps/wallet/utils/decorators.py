@@ -0,0 +1,90 @@
+import logging
+from functools import wraps
+
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..services.idempotency_service import IdempotencyService
+
+logger = logging.getLogger(__name__)
+
+
+class _AlreadyStored(Exception):
+    """Rolls back a request whose key another request stored first"""
+
+
+def _in_progress():
+    return Response({
+        'success': False,
+        'message': 'A request with this idempotency key is already being processed'
+    }, status=status.HTTP_409_CONFLICT)
+
+
+def idempotent(endpoint):
+    """
+    Make a wallet-affecting view action safe to retry
+
+    Requests carrying an ``Idempotency-Key`` header are executed once per user
+    and key; retries get the stored response back. Requests without the header
+    are processed as before.
+
+    The view and the stored key share one transaction, so a crash between
+    them cannot leave a charge without its key (and a retry charging again).
+
+    :param endpoint: Name recorded with the stored response
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(view_instance, request, *args, **kwargs):
+            key = IdempotencyService.get_key(request)
+            if key is None:
+                return func(view_instance, request, *args, **kwargs)
+
+            if len(key) > IdempotencyService.MAX_KEY_LENGTH:
+                return Response({
+                    'success': False,
+                    'message': 'Idempotency key is too long'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            user = request.user
+            request_hash = IdempotencyService.hash_request(request, endpoint)
+
+            stored = IdempotencyService.get_stored_response(user, key)
+            if stored is None:
+                if not IdempotencyService.acquire_lock(user, key):
+                    return _in_progress()
+
+                try:
+                    # Re-check now that we hold the lock, the previous holder may have just finished
+                    stored = IdempotencyService.get_stored_response(user, key)
+                    if stored is None:
+                        with transaction.atomic():
+                            response = func(view_instance, request, *args, **kwargs)
+
+                            # Only successful results are replayed, failures can be retried
+                            if status.is_success(response.status_code) and not IdempotencyService.store_response(
+                                user, key, endpoint, request_hash, response
+                            ):
+                                raise _AlreadyStored
+                        return response
+                except _AlreadyStored:
+                    # The lock expired and another request stored the key first, replay its response
+                    stored = IdempotencyService.get_stored_response(user, key)
+                    if stored is None:
+                        return _in_progress()
+                finally:
+                    IdempotencyService.release_lock(user, key)
+
+            if stored['request_hash'] != request_hash:
+                return Response({
+                    'success': False,
+                    'message': 'Idempotency key was already used with a different request'
+                }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+            logger.info(f"Replaying {endpoint} response for idempotency key {key}")
+            response = Response(stored['body'], status=stored['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+        return wrapper
+    return decorator
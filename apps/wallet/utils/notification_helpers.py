@@ -7,16 +7,21 @@
 logger = logging.getLogger(__name__)
 
 
-def send_email_notification(user, subject, message_body, template=None, context=None):
+def send_email_notification(user, subject, message_body, template=None, context=None, fail_silently=True):
     """
     Send email notification to a user
 
+    Queue the tasks in apps/wallet/tasks.py instead of calling the helpers
+    here from a request, so the response does not wait on the mail provider.
+
     Args:
         user: User model instance
         subject: Email subject
         message_body: Plain text message
         template: Optional HTML template path
         context: Optional context for the template
+        fail_silently: Return False instead of raising when sending fails,
+            pass False from jobs so they are retried
 
     Returns:
         bool: True if email was sent successfully, False otherwise
@@ -41,10 +46,12 @@ def send_email_notification(user, subject, message_body, template=None, context=
         return True
     except Exception as e:
         logger.error(f"Failed to send email to {user.email}: {str(e)}")
+        if not fail_silently:
+            raise
         return False
 
 
-def send_transaction_notification(transaction, notification_type):
+def send_transaction_notification(transaction, notification_type, fail_silently=True):
     """
     Send transaction notification based on type
 
@@ -111,10 +118,10 @@ def send_transaction_notification(transaction, notification_type):
         'wallet': wallet
     }
 
-    return send_email_notification(user, subject, message, template, context)
+    return send_email_notification(user, subject, message, template, context, fail_silently)
 
 
-def send_low_balance_notification(user, balance, threshold=20.0):
+def send_low_balance_notification(user, balance, threshold=20.0, fail_silently=True):
     """
     Send notification when wallet balance is low
 
@@ -139,7 +146,7 @@ def send_low_balance_notification(user, balance, threshold=20.0):
         'threshold': threshold
     }
 
-    return send_email_notification(user, subject, message, template, context)
+    return send_email_notification(user, subject, message, template, context, fail_silently)
 
 
 def send_push_notification(user, title, body, data=None):
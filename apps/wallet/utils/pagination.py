@@ -0,0 +1,49 @@
+import base64
+import binascii
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+
+def encode_cursor(created_at, object_id):
+    """
+    Encode a keyset position into an opaque cursor string
+
+    Args:
+        created_at: Timestamp of the last row on the page
+        object_id: Primary key of the last row on the page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{object_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        tuple: (created_at, object_id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, object_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        created_at = parse_datetime(created_at)
+        object_id = uuid.UUID(object_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError(_("Invalid cursor."))
+
+    if created_at is None:
+        raise ValidationError(_("Invalid cursor."))
+
+    return created_at, object_id
@@ -35,9 +35,7 @@ def validate_transaction_limits(user, amount, transaction_type):
     Raises:
         ValidationError: If amount exceeds any limits
     """
-    from ..models.transaction import Transaction
-    from django.utils import timezone
-    import datetime
+    from ..services.spend_service import SpendCounterService
 
     amount = Decimal(str(amount))
 
@@ -62,20 +60,12 @@ def validate_transaction_limits(user, amount, transaction_type):
                 _("Maximum withdrawal amount is {0} EGP.").format(TransactionLimits.MAX_WITHDRAW)
             )
 
-    # Check daily limit
-    today = timezone.now().date()
-    today_start = datetime.datetime.combine(today, datetime.time.min, tzinfo=timezone.utc)
-    today_end = datetime.datetime.combine(today, datetime.time.max, tzinfo=timezone.utc)
-
-    daily_transactions = Transaction.objects.filter(
-        user=user,
-        type=transaction_type,
-        status='COMPLETED',
-        created_at__range=(today_start, today_end)
-    )
-
-    daily_total = sum(t.amount for t in daily_transactions)
+    # Current spend comes from the rolling counters (DB aggregate on a cache miss)
+    totals = SpendCounterService.get_totals(user, transaction_type)
+    daily_total = totals['daily']
+    monthly_total = totals['monthly']
 
+    # Check daily limit
     if daily_total + amount > TransactionLimits.DAILY_LIMIT:
         raise ValidationError(
             _("This transaction would exceed your daily limit of {0} EGP.").format(
@@ -84,18 +74,6 @@ def validate_transaction_limits(user, amount, transaction_type):
         )
 
     # Check monthly limit
-    month_start = datetime.datetime(today.year, today.month, 1, tzinfo=timezone.utc)
-    month_end = today_end
-
-    monthly_transactions = Transaction.objects.filter(
-        user=user,
-        type=transaction_type,
-        status='COMPLETED',
-        created_at__range=(month_start, month_end)
-    )
-
-    monthly_total = sum(t.amount for t in monthly_transactions)
-
     if monthly_total + amount > TransactionLimits.MONTHLY_LIMIT:
         raise ValidationError(
             _("This transaction would exceed your monthly limit of {0} EGP.").format(
@@ -0,0 +1,278 @@
+# metro/benchmarks.py
+"""
+Benchmark scenarios for the hot paths, run by ``manage.py benchmark``.
+
+Every scenario is a callable taking the seeded ``BenchmarkData`` and running
+one operation. ``run_scenario`` times it and counts its queries, and
+``compare_results`` diffs two result files so numbers can be tracked between
+commits.
+"""
+import contextlib
+import io
+import logging
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.utils import timezone
+
+from .middleware import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Register a benchmark scenario under a name"""
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+class BenchmarkData:
+    """Handles to the seeded data, with a seeded RNG so runs are repeatable"""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.users = []
+        self.station_ids = []
+        self.gate_trips = []  # (station, station a few stops further on the same line)
+        self.fresh_tickets = []
+        self.export_rows = []
+        self.payloads = {}  # name -> serializer output, for the JSON rendering scenarios
+        self.sizes = {}
+
+    def pick_user(self):
+        return self.random.choice(self.users)
+
+
+def seed(users=200, tickets_per_user=5, transactions_per_user=10, seed_value=42):
+    """
+    Load the real network from populate_metro_data plus bulk users, wallets,
+    tickets and transactions
+
+    Returns:
+        BenchmarkData
+    """
+    from apps.stations.management.commands.populate_metro_data import Command as MetroDataCommand
+    from apps.stations.models import LineStation
+    from apps.tickets.api.serializers.ticket_serializers import TicketSerializer
+    from apps.tickets.constants.choices import TicketChoices
+    from apps.tickets.models import Ticket
+    from apps.wallet.models.transaction import Transaction
+    from apps.wallet.models.wallet import UserWallet
+
+    data = BenchmarkData(seed_value)
+    rng = data.random
+    User = get_user_model()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        MetroDataCommand().handle()
+
+    line_orders = {}
+    for line_id, station_id in LineStation.objects.order_by('line_id', 'order').values_list('line_id', 'station_id'):
+        line_orders.setdefault(line_id, []).append(station_id)
+    data.station_ids = [station_id for ids in line_orders.values() for station_id in ids]
+    data.gate_trips = [
+        (ids[i], ids[min(i + 4, len(ids) - 1)])
+        for ids in line_orders.values()
+        for i in range(len(ids) - 1)
+    ]
+
+    password = make_password('benchmark')
+    User.objects.bulk_create([
+        User(email=f"bench{i}@example.com", username=f"bench{i}", password=password)
+        for i in range(users)
+    ], batch_size=500)
+    data.users = list(User.objects.filter(username__startswith='bench').order_by('id'))
+
+    UserWallet.objects.bulk_create([
+        UserWallet(user=user, balance=Decimal('100000.00')) for user in data.users
+    ], batch_size=500)
+    wallets = {wallet.user_id: wallet for wallet in UserWallet.objects.filter(user__in=data.users)}
+
+    # The widest ticket type, so seeded gate trips never need an upgrade
+    ticket_type, details = max(TicketChoices.TICKET_TYPES.items(), key=lambda item: item[1]['max_stations'])
+    valid_until = timezone.now() + timedelta(days=1)
+    Ticket.objects.bulk_create([
+        Ticket(
+            user=user,
+            ticket_type=ticket_type,
+            price=details['price'],
+            color=details['color'],
+            max_stations=details['max_stations'],
+            valid_until=valid_until,
+        )
+        for user in data.users
+        for _ in range(tickets_per_user)
+    ], batch_size=1000)
+    data.fresh_tickets = list(Ticket.objects.filter(status='ACTIVE').values_list('ticket_number', flat=True))
+    rng.shuffle(data.fresh_tickets)
+
+    types = ['DEPOSIT', 'TICKET_PURCHASE', 'SUBSCRIPTION_PURCHASE', 'REFUND']
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user,
+            wallet=wallets[user.id],
+            amount=Decimal(rng.randint(5, 500)),
+            type=rng.choice(types),
+            status='COMPLETED',
+            description='Benchmark seed',
+        )
+        for user in data.users
+        for _ in range(transactions_per_user)
+    ], batch_size=1000)
+    data.export_rows = list(Transaction.objects.values('id', 'user_id', 'amount', 'type', 'status', 'created_at'))
+
+    # One page of each, the size the list endpoints return
+    data.payloads = {
+        'ticket_list': TicketSerializer(Ticket.objects.order_by('id')[:100], many=True).data,
+        'transactions': data.export_rows[:100],
+    }
+
+    data.sizes = {
+        'stations': len(set(data.station_ids)),
+        'users': len(data.users),
+        'tickets': len(data.fresh_tickets),
+        'transactions': len(data.export_rows),
+    }
+    return data
+
+
+@scenario('route_find')
+def route_find(data):
+    from metro.registry import registry
+    start, end = data.random.sample(data.station_ids, 2)
+    registry.get('route_service').find_route(start, end)
+
+
+@scenario('nearest_station')
+def nearest_station(data):
+    from apps.stations.utils.location_utils import find_nearest_station
+    # Greater Cairo bounding box
+    find_nearest_station(data.random.uniform(29.85, 30.15), data.random.uniform(31.2, 31.45))
+
+
+@scenario('gate_entry_exit')
+def gate_entry_exit(data):
+    from apps.tickets.services.validation_service import ValidationService
+    ticket_number = data.fresh_tickets.pop()
+    entry, exit_ = data.random.choice(data.gate_trips)
+    ValidationService.validate_entry(ticket_number, entry)
+    ValidationService.validate_exit(ticket_number, exit_)
+
+
+@scenario('wallet_purchase')
+def wallet_purchase(data):
+    from apps.wallet.services.integration_service import TicketIntegrationService
+    TicketIntegrationService.purchase_ticket(data.pick_user(), 'BASIC')
+
+
+@scenario('dashboard_analytics')
+def dashboard_analytics(data):
+    from apps.dashboard.services.analytics_service import AnalyticsService
+    ranges = AnalyticsService.get_date_ranges()
+    start, end = ranges['thirty_days_ago'], ranges['today']
+    AnalyticsService.get_revenue_overview(start, end)
+    AnalyticsService.get_top_stations(start, end)
+    AnalyticsService.get_revenue_by_line(start, end)
+    AnalyticsService.get_ticket_analytics(start, end)
+
+
+@scenario('export_csv')
+def export_csv(data):
+    from apps.dashboard.services.export_service import ExportService
+    ExportService.export_to_csv(data.export_rows, 'benchmark')
+
+
+def _render_payloads(data, renderer):
+    for payload in data.payloads.values():
+        renderer.render(payload)
+
+
+@scenario('json_render')
+def json_render(data):
+    from metro.renderers import ORJSONRenderer
+    _render_payloads(data, ORJSONRenderer())
+
+
+@scenario('json_render_stdlib')
+def json_render_stdlib(data):
+    # DRF's stock renderer, the baseline for json_render
+    from rest_framework.renderers import JSONRenderer
+    _render_payloads(data, JSONRenderer())
+
+
+def run_scenario(name, data, iterations=50, warmup=3):
+    """
+    Time a scenario and count its queries
+
+    Returns:
+        dict: Latency statistics in milliseconds, throughput, queries per
+        operation and the number of operations that raised
+    """
+    scenario_func = SCENARIOS[name]
+    errors = 0
+    logged = False
+
+    def func(data):
+        # A failing operation is counted, not fatal: the error rate is a result too
+        nonlocal errors, logged
+        try:
+            scenario_func(data)
+        except Exception as e:
+            if not logged:
+                logger.warning(f"Benchmark {name} raised: {e!r}")
+                logged = True
+            errors += 1
+
+    for _ in range(warmup):
+        func(data)
+    errors = 0
+
+    recorder = QueryRecorder(slow_ms=float('inf'), sample_rate=0)
+    timings = []
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func(data)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'min_ms': round(timings[0], 3),
+        'max_ms': round(timings[-1], 3),
+        'ops_per_sec': round(1000 * iterations / sum(timings), 1) if sum(timings) else None,
+        'queries_per_op': round(recorder.count / iterations, 2),
+        'errors': errors,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare median latency per scenario against a baseline result file
+
+    Returns:
+        list: (scenario, baseline ms, current ms, relative change, regressed) rows
+    """
+    rows = []
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0
+        rows.append((name, before['median_ms'], result['median_ms'], change, change > threshold))
+    return rows
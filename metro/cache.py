@@ -0,0 +1,205 @@
+# metro/cache.py
+"""
+Cache backends for the cache aliases in ``settings.CACHES``.
+
+The Instrumented* backends are drop-in subclasses of Django's backends that
+report hits and misses to ``metro.metrics``, labelled by the alias's
+KEY_PREFIX (or LOCATION). Each one hooks the lookup methods the others go
+through (LocMemCache and FileBasedCache build get_many on get,
+DatabaseCache builds get on get_many), so every key is counted once.
+
+TieredCache puts a small per-process in-memory L1 in front of another
+alias, for data that tolerates being a few seconds stale in other worker
+processes.
+
+Redis and LocMem have an incr of their own. DatabaseCache and
+FileBasedCache fall back to BaseCache.incr, a get followed by a set that
+gives the key the default timeout; ``incr_resets_timeout`` tells callers
+keeping long-lived counters when they must put the timeout back.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from .metrics import metrics
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    metrics_label = 'default'
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_label = params.get('KEY_PREFIX') or location
+
+    def _record(self, hits, misses):
+        if hits:
+            metrics.inc('cache_requests_total', (self.metrics_label, 'hit'), hits)
+        if misses:
+            metrics.inc('cache_requests_total', (self.metrics_label, 'miss'), misses)
+
+
+class CountGetMixin:
+    """Count lookups in get(), for backends whose get_many is built on it"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._record(0, 1)
+            return default
+        self._record(1, 0)
+        return value
+
+
+class CountGetManyMixin:
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        self._record(len(found), len(keys) - len(found))
+        return found
+
+
+class InstrumentedDatabaseCache(InstrumentedCacheMixin, CountGetManyMixin, DatabaseCache):
+    pass
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, CountGetMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, CountGetMixin, FileBasedCache):
+    """Shared by every worker process on the host, used when no Redis is configured"""
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, CountGetMixin, CountGetManyMixin, RedisCache):
+    """
+    RedisCache whose clear() only removes the alias's own keys
+
+    The aliases share one Redis database and are told apart by KEY_PREFIX,
+    so the stock clear() (FLUSHDB) would empty every alias at once.
+    """
+
+    def clear(self):
+        if not self.key_prefix:
+            return super().clear()
+        client = self._cache.get_client(write=True)
+        batch = []
+        for key in client.scan_iter(match=f"{self.key_prefix}:*", count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                client.delete(*batch)
+                batch = []
+        if batch:
+            client.delete(*batch)
+        return True
+
+
+class TieredCache(InstrumentedCacheMixin, BaseCache):
+    """
+    Per-process LocMem L1 in front of the alias named in LOCATION
+
+    Reads try L1 first and fill it on an L2 hit. Writes and deletes go to
+    both, but only reach this process's L1: other workers keep their copy
+    until OPTIONS['L1_TIMEOUT'] (default 5 seconds) runs out. Counters
+    (incr/decr) always go to L2.
+    """
+
+    def __init__(self, location, params):
+        BaseCache.__init__(self, params)  # BaseCache takes no location
+        self.metrics_label = f"{params.get('KEY_PREFIX') or location}-l1"
+        self._l2_alias = location
+        self._l1_timeout = params.get('OPTIONS', {}).get('L1_TIMEOUT', 5)
+        self._l1 = LocMemCache(f"l1-{location}", {
+            'TIMEOUT': self._l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': params.get('OPTIONS', {}).get('L1_MAX_ENTRIES', 1000)},
+        })
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_timeout_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self._l1_timeout
+        return min(timeout, self._l1_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self._l1.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            self._record(1, 0)
+            return value
+        self._record(0, 1)
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._l1.set(key, value, self._l1_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self._l1.get_many(keys, version=version)
+        self._record(len(found), len(keys) - len(found))
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.l2.get_many(missing, version=version)
+            if fetched:
+                self._l1.set_many(fetched, self._l1_timeout, version=version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self._l1.set(key, value, self._l1_timeout_for(timeout), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version=version)
+        self._l1.set_many(
+            {key: value for key, value in data.items() if key not in failed},
+            self._l1_timeout_for(timeout),
+            version=version,
+        )
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version=version)
+        if added:
+            self._l1.set(key, value, self._l1_timeout_for(timeout), version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1.delete(key, version=version)
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._l1.delete(key, version=version)
+        return self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._l1.delete_many(keys, version=version)
+        self.l2.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self._l1.has_key(key, version=version) or self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1.delete(key, version=version)
+        return self.l2.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+
+
+def incr_resets_timeout(cache):
+    """Whether incr/decr on ``cache`` replaces the key's timeout with the default"""
+    if isinstance(cache, TieredCache):
+        cache = cache.l2
+    return type(cache).incr is BaseCache.incr
@@ -0,0 +1,52 @@
+# metro/codec.py
+"""
+The project's JSON codec: API renderer and parser, pre-rendered responses,
+QR payloads and dashboard chart data.
+
+Uses orjson when it is installed and the standard library otherwise.
+Datetimes, dates and UUIDs are written the way DRF writes them (ISO 8601,
+UTC as "Z"). Anything else JSON has no literal for (Decimal, lazy
+translations, ...) goes through DRF's JSONEncoder, so output matches
+DRF's JSONRenderer either way.
+"""
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def dumps(data, indent=None, default=None) -> bytes:
+    """
+    Encode ``data`` as UTF-8 JSON, compact unless ``indent`` is given
+
+    ``default`` replaces DRF's encoder for unsupported types, e.g. to write
+    Decimals differently.
+    """
+    if orjson is not None and indent in (None, 2):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default or _encoder.default, option=option)
+
+    separators = None if indent else (',', ':')
+    return json.dumps(
+        data, cls=JSONEncoder, default=default, ensure_ascii=False, indent=indent, separators=separators
+    ).encode()
+
+
+def loads(data):
+    """
+    Decode JSON from bytes or str
+
+    Raises:
+        json.JSONDecodeError: orjson's error is a subclass of it
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,216 @@
+# metro/metrics.py
+"""
+In-process request metrics with a Prometheus text exposition.
+
+Each worker keeps its own counters and histograms in memory. When
+``settings.METRICS_DIR`` is set, workers periodically dump their state to
+``<METRICS_DIR>/<pid>.json`` and the metrics endpoint merges every file, so a
+scrape that lands on any worker reports the whole node. Files left behind by
+workers that have exited are deleted when the endpoint collects, so restarted
+or recycled workers are not counted twice.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# name: (help, label names, buckets)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Request latency by endpoint', ('method', 'view', 'status'), LATENCY_BUCKETS
+    ),
+    'http_request_db_queries': (
+        'Database queries per request', ('method', 'view'), QUERY_BUCKETS
+    ),
+    'http_request_db_seconds': (
+        'Time spent in database queries per request', ('method', 'view'), LATENCY_BUCKETS
+    ),
+}
+
+# name: (help, label names)
+COUNTERS = {
+    'cache_requests_total': ('Cache lookups by result', ('cache', 'result')),
+    'db_slow_queries_total': ('Queries slower than SLOW_QUERY_MS', ('view',)),
+    'query_budget_exceeded_total': ('Requests that ran more queries than their view budget', ('view',)),
+}
+
+FLUSH_INTERVAL = 10  # seconds between dumps to METRICS_DIR
+TEMP_FILE_MAX_AGE = 60  # seconds before an unfinished dump counts as abandoned
+
+
+class MetricsRegistry:
+    """Thread-safe counters and cumulative histograms keyed by label values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._counters = {name: {} for name in COUNTERS}
+        self._last_flush = 0.0
+
+    def observe(self, name, labels, value):
+        """Record one observation in a histogram, labels is a tuple of label values"""
+        buckets = HISTOGRAMS[name][2]
+        with self._lock:
+            series = self._histograms[name].get(labels)
+            if series is None:
+                # One slot per bucket, then +Inf, sum and count
+                series = self._histograms[name][labels] = [0] * (len(buckets) + 1) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(buckets)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            counters = self._counters[name]
+            counters[labels] = counters.get(labels, 0) + amount
+
+    def state(self):
+        """JSON-serializable copy of the current values"""
+        with self._lock:
+            return {
+                'histograms': {
+                    name: [[list(labels), list(series)] for labels, series in values.items()]
+                    for name, values in self._histograms.items()
+                },
+                'counters': {
+                    name: [[list(labels), value] for labels, value in values.items()]
+                    for name, values in self._counters.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            for values in list(self._histograms.values()) + list(self._counters.values()):
+                values.clear()
+
+    def flush(self, force=False):
+        """Dump this process's state to METRICS_DIR, at most every FLUSH_INTERVAL seconds"""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        now = time.monotonic()
+        if not directory or (not force and now - self._last_flush < FLUSH_INTERVAL):
+            return
+        self._last_flush = now
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.metrics-', delete=False) as tmp:
+                json.dump(self.state(), tmp)
+            os.replace(tmp.name, os.path.join(directory, f"{os.getpid()}.json"))
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {directory}: {str(e)}")
+
+    def collect(self):
+        """Merged state of every worker on the node (or just this one without METRICS_DIR)"""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return self.state()
+
+        self.flush(force=True)
+        prune_stale_files(directory)
+        states = []
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # A worker is replacing its file right now
+        return merge_states(states)
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+def prune_stale_files(directory):
+    """Delete the dumps of processes that have exited and abandoned temporary files"""
+    now = time.time()
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        try:
+            if filename.endswith('.json'):
+                pid = filename[:-len('.json')]
+                if pid.isdigit() and not _process_exists(int(pid)):
+                    os.remove(path)
+            elif filename.startswith('.metrics-') and now - os.path.getmtime(path) > TEMP_FILE_MAX_AGE:
+                os.remove(path)
+        except OSError:
+            continue  # Removed by another worker meanwhile
+
+
+def merge_states(states):
+    histograms = {name: {} for name in HISTOGRAMS}
+    counters = {name: {} for name in COUNTERS}
+    for state in states:
+        for name, rows in state.get('histograms', {}).items():
+            if name not in histograms:
+                continue
+            for labels, series in rows:
+                merged = histograms[name].setdefault(tuple(labels), [0] * len(series))
+                for i, value in enumerate(series):
+                    merged[i] += value
+        for name, rows in state.get('counters', {}).items():
+            if name not in counters:
+                continue
+            for labels, value in rows:
+                counters[name][tuple(labels)] = counters[name].get(tuple(labels), 0) + value
+
+    return {
+        'histograms': {name: [[list(k), v] for k, v in values.items()] for name, values in histograms.items()},
+        'counters': {name: [[list(k), v] for k, v in values.items()] for name, values in counters.items()},
+    }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_prometheus(state):
+    """Render a collected state in the Prometheus text format (version 0.0.4)"""
+    lines = []
+    for name, (help_text, label_names, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, series in state['histograms'].get(name, []):
+            bounds = [str(bound) for bound in buckets] + ['+Inf']
+            for bound, value in zip(bounds, series):
+                lines.append(f"{name}_bucket{_format_labels(label_names, labels, ('le', bound))} {value}")
+            lines.append(f"{name}_sum{_format_labels(label_names, labels)} {series[-2]}")
+            lines.append(f"{name}_count{_format_labels(label_names, labels)} {series[-1]}")
+
+    for name, (help_text, label_names) in COUNTERS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in state['counters'].get(name, []):
+            lines.append(f"{name}{_format_labels(label_names, labels)} {value}")
+
+    return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,155 @@
+# metro/middleware.py
+
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import metrics
+from .query_budget import check_query_budget, get_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """execute_wrapper hook that counts and times the queries of one request"""
+
+    def __init__(self, slow_ms, sample_rate):
+        self.count = 0
+        self.duration = 0.0
+        self.slow = 0
+        self.view = 'unmatched'
+        self.budget = None
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed * 1000 >= self.slow_ms:
+                self.slow += 1
+                if random.random() < self.sample_rate:
+                    logger.warning(f"Slow query ({elapsed * 1000:.0f}ms) in {self.view}: {sql[:1000]}")
+
+
+class InstrumentationMiddleware:
+    """
+    Always-on request metrics: latency, query count and query time per view.
+
+    Views are labelled by their URL name (e.g. ``tickets:ticket-detail``) so the
+    series stay bounded whatever the path parameters. Queries slower than
+    SLOW_QUERY_MS are counted, and a SLOW_QUERY_SAMPLE_RATE share of them is
+    logged with their SQL. Views with a query budget are checked against it
+    (see metro/query_budget.py).
+
+    Under ASGI the query hooks are installed on the request's sync thread,
+    where the ORM runs for both sync views and async views' awaited queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_QUERY_MS', 200)
+        self.sample_rate = getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 0.1)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route or 'unmatched'
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = getattr(request, '_query_recorder', None)
+        if recorder is not None:
+            recorder.view = self._view_name(request)
+            recorder.budget = get_query_budget(view_func, request.method)
+
+    def _start(self, request, stack):
+        recorder = QueryRecorder(self.slow_ms, self.sample_rate)
+        request._query_recorder = recorder
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return recorder
+
+    def _finish(self, request, response, recorder, elapsed):
+        view = self._view_name(request)
+        method = request.method
+        metrics.observe('http_request_duration_seconds', (method, view, f"{response.status_code // 100}xx"), elapsed)
+        metrics.observe('http_request_db_queries', (method, view), recorder.count)
+        metrics.observe('http_request_db_seconds', (method, view), recorder.duration)
+        if recorder.slow:
+            metrics.inc('db_slow_queries_total', (view,), recorder.slow)
+        metrics.flush()
+
+        check_query_budget(view, recorder.budget, recorder.count)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            recorder = self._start(request, stack)
+            response = self.get_response(request)
+        self._finish(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stack = ExitStack()
+        recorder = await sync_to_async(self._start)(request, stack)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        await sync_to_async(self._finish)(request, response, recorder, time.perf_counter() - started)
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs natively under ASGI
+
+    The stock middleware is sync-only, which makes Django run every async
+    view beneath it through async_to_sync on a worker thread. Here only the
+    static file lookup and serving go to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,17 @@
+# metro/parsers.py
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import codec
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser reading through metro.codec (orjson when installed)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if codec.orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return codec.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,357 @@
+# metro/partitioning.py
+"""
+Monthly partitioning and archiving of the append-only history tables
+(ticket and subscription usage records, wallet transactions).
+
+On PostgreSQL each table in PARTITIONED_TABLES is range partitioned by month
+on its timestamp column (see the ``partition_table`` migrations), so a query
+bounded on that column only touches the months it covers, and an old month
+is dropped by detaching its partition instead of deleting rows. Partitions
+are named ``<table>_pYYYY_MM``; a ``<table>_default`` partition catches rows
+outside the months created so far.
+
+Elsewhere the tables stay plain, and old months are archived by exporting
+their rows and deleting them.
+
+Either way an archived month ends up as a gzipped CSV file (with a header
+row) under PARTITION_ARCHIVE_DIR/<table>/. Archiving deletes the rows from
+the database, so it is refused unless that directory is set explicitly; it
+must be on persistent storage, not the host's ephemeral filesystem.
+``manage.py partitions`` creates upcoming partitions and archives months
+past the retention period.
+"""
+import csv
+import gzip
+import logging
+import re
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Model label -> partition column
+PARTITIONED_TABLES = {
+    "analytics.TicketUsageRecord": "timestamp",
+    "analytics.SubscriptionUsageRecord": "timestamp",
+    "wallet.Transaction": "created_at",
+}
+
+
+def month_start(value):
+    """First instant (UTC) of the month containing ``value``"""
+    if timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def get_archive_dir(archive_dir=None):
+    """
+    Directory archived months are written to
+
+    Raises:
+        ImproperlyConfigured: If neither ``archive_dir`` nor PARTITION_ARCHIVE_DIR is set
+    """
+    archive_dir = archive_dir or settings.PARTITION_ARCHIVE_DIR
+    if not archive_dir:
+        raise ImproperlyConfigured(
+            "Set PARTITION_ARCHIVE_DIR (or pass an archive directory) to a persistent path before archiving"
+        )
+    return Path(archive_dir)
+
+
+def archive_path(table, month, archive_dir=None):
+    """File for an archived month; never overwrites an earlier archive of it"""
+    directory = get_archive_dir(archive_dir) / table
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{table}_{month:%Y_%m}.csv.gz"
+    copy = 1
+    while path.exists():
+        copy += 1
+        path = directory / f"{table}_{month:%Y_%m}.{copy}.csv.gz"
+    return path
+
+
+def is_partitioned(table, using=None):
+    using = using or connection
+    if using.vendor != "postgresql":
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+
+def partition_table(schema_editor, table, column, months_ahead=3):
+    """
+    Turn ``table`` into a table partitioned by month on ``column``
+
+    Migration helper, PostgreSQL only. The existing rows are copied into the
+    new table, so this holds an exclusive lock on the table while it runs.
+    The primary key gains the partition column, as PostgreSQL requires. A
+    unique index that does not include the partition column cannot be
+    enforced across partitions and is not recreated, so the model must not
+    declare it either (see TicketUsageRecord); the code paths that write
+    these tables prevent duplicates themselves.
+    """
+    using = schema_editor.connection
+    if using.vendor != "postgresql" or is_partitioned(table, using):
+        return
+
+    qn = using.ops.quote_name
+    legacy = f"{table}_unpartitioned"
+    with using.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT a.attname
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+            WHERE i.indrelid = %s::regclass AND i.indisprimary
+            """,
+            [table],
+        )
+        primary_key = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid), i.indisunique,
+                   EXISTS (
+                       SELECT 1 FROM pg_attribute a
+                       WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) AND a.attname = %s
+                   )
+            FROM pg_index i
+            WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+            """,
+            [column, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT MIN({qn(column)}) FROM {qn(table)}")
+        first = cursor.fetchone()[0] or timezone.now()
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT")
+        month = month_start(first)
+        last = add_months(month_start(timezone.now()), months_ahead)
+        while month <= last:
+            _create_partition(cursor, qn, table, month)
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+
+        # Keep id sequences going from where the old table left off. A serial
+        # column's sequence belongs to the old table and would be dropped with it.
+        for key in primary_key:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [legacy, key])
+            sequence = cursor.fetchone()[0]
+            if sequence is None:
+                continue
+            cursor.execute(
+                "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = %s",
+                [legacy, key],
+            )
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.{qn(key)}")
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({qn(key)}), 0) + 1, false) "
+                f"FROM {qn(table)}",
+                [table, key],
+            )
+
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+        if column not in primary_key:
+            primary_key.append(column)
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY ({', '.join(qn(key) for key in primary_key)})")
+        for name, definition, unique, has_column in indexes:
+            if unique and not has_column:
+                logger.warning(f"Not recreating {name} on {table}: unique without {column}, drop it from the model")
+                continue
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+
+
+def _create_partition(cursor, qn, table, month):
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {qn(partition_name(table, month))} PARTITION OF {qn(table)} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def month_partitions(table):
+    """Months that have a partition of ``table``, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+    months = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            months.append(datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc))
+    return sorted(months)
+
+
+def _add_partition(cursor, qn, table, column, month):
+    """
+    Create the partition for ``month`` on a table that may already hold rows
+    for it in its default partition
+
+    PostgreSQL refuses to create a partition whose range the default
+    partition has rows in, so the month is built as a plain table, the rows
+    are moved into it, and it is then attached. Attaching copies the
+    parent's primary key, indexes and foreign keys onto it.
+    """
+    partition = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    with transaction.atomic():
+        cursor.execute(
+            f"CREATE TABLE {qn(partition)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(table + '_default')} WHERE {qn(column)} >= %s AND {qn(column)} < %s "
+            f"RETURNING *) INSERT INTO {qn(partition)} SELECT * FROM moved",
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(partition)} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    if moved:
+        logger.info(f"Moved {moved} rows of {table} for {month:%Y-%m} out of the default partition")
+
+
+def ensure_partitions(model, months_ahead=None, now=None):
+    """
+    Create the partitions for the current month and ``months_ahead`` more
+
+    Rows that landed in the default partition for one of those months (the
+    command did not run in time) are moved into its new partition.
+
+    Returns:
+        list: Months whose partition was created
+    """
+    table = model._meta.db_table
+    if not is_partitioned(table):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+    column = PARTITIONED_TABLES[model._meta.label]
+    existing = set(month_partitions(table))
+    current = month_start(now or timezone.now())
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                _add_partition(cursor, connection.ops.quote_name, table, column, month)
+                created.append(month)
+    return created
+
+
+def archive_months(model, before, archive_dir=None, detach_only=False, dry_run=False):
+    """
+    Archive every month of ``model``'s table that ends on or before ``before``
+
+    On a partitioned table the month's partition is detached, copied out and
+    dropped (or only detached, with ``detach_only``). Otherwise the month's
+    rows are exported and deleted.
+
+    Returns:
+        list: (month, archive file or None) for each month archived
+
+    Raises:
+        ImproperlyConfigured: If there is nowhere to write the archive
+    """
+    if not (detach_only or dry_run):
+        get_archive_dir(archive_dir)
+    table = model._meta.db_table
+    column = PARTITIONED_TABLES[model._meta.label]
+    before = month_start(before)
+    if is_partitioned(table):
+        months = [month for month in month_partitions(table) if month < before]
+        archive = _archive_partition
+    else:
+        months = [
+            month_start(month)
+            for month in model.objects.filter(**{f"{column}__lt": before}).datetimes(
+                column, "month", tzinfo=dt_timezone.utc
+            )
+        ]
+        archive = _archive_rows
+    if dry_run:
+        return [(month, None) for month in months]
+    return [(month, archive(model, column, month, archive_dir, detach_only)) for month in months]
+
+
+def _archive_partition(model, column, month, archive_dir, detach_only):
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    partition = partition_name(table, month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(partition)}")
+        if detach_only:
+            return None
+        path = archive_path(table, month, archive_dir)
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as file:
+            cursor.copy_expert(f"COPY {qn(partition)} TO STDOUT WITH (FORMAT csv, HEADER)", file)
+        cursor.execute(f"DROP TABLE {qn(partition)}")
+    logger.info(f"Archived {partition} to {path}")
+    return path
+
+
+def _archive_rows(model, column, month, archive_dir, detach_only):
+    table = model._meta.db_table
+    rows = model.objects.filter(**{f"{column}__gte": month, f"{column}__lt": add_months(month, 1)})
+    fields = [field.attname for field in model._meta.concrete_fields]
+    path = archive_path(table, month, archive_dir)
+    with transaction.atomic():
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(fields)
+            writer.writerows(rows.order_by(column).values_list(*fields).iterator(chunk_size=2000))
+        deleted, _ = rows.delete()
+    logger.info(f"Archived {deleted} rows of {table} for {month:%Y-%m} to {path}")
+    return path
+
+
+def compact():
+    """Give the space freed by archiving back to the filesystem where that takes a command"""
+    # VACUUM cannot run inside a transaction
+    if connection.vendor == "sqlite" and not connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM")
+
+
+def partitioned_models():
+    return [apps.get_model(label) for label in PARTITIONED_TABLES]
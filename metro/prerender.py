@@ -0,0 +1,114 @@
+# metro/prerender.py
+"""
+Pre-rendered JSON for reference endpoints that every app launch fetches.
+
+``@prerendered`` wraps a view handler. The first 200 response of each
+version and parameter set is encoded once to bytes (metro/codec.py) and
+stored with a strong ETag in the ``reference`` cache alias. Later requests
+get those bytes with ETag and Cache-Control headers, and a matching
+If-None-Match gets a 304 before the handler runs. A request with a query
+parameter outside ``vary`` (a filter or ordering the endpoint also accepts)
+skips the cache, so it never gets the payload stored for other parameters.
+
+A payload's version comes from a string (e.g. a content hash of constants)
+or a callable, typically reading a scope counter that signals bump when the
+underlying data changes.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+
+from . import codec
+from .cache import incr_resets_timeout
+
+
+def _cache():
+    return caches['reference']
+
+
+def content_version(*values):
+    """Version string for payloads built from constants: changes when they do"""
+    return hashlib.sha256(repr(values).encode()).hexdigest()[:12]
+
+
+def _new_version():
+    # A lost counter restarts from the clock, never from a version an old payload may use
+    return time.time_ns() // 1000
+
+
+def scope_version(scope):
+    """Current version of a data scope, e.g. 'network'"""
+    key = f"prerendered_version:{scope}"
+    version = _cache().get(key)
+    if version is None:
+        _cache().add(key, _new_version(), None)
+        version = _cache().get(key)
+    return version
+
+
+def bump_scope(scope):
+    """Make every payload versioned by ``scope`` stale"""
+    key = f"prerendered_version:{scope}"
+    try:
+        _cache().incr(key)
+    except ValueError:
+        _cache().set(key, _new_version(), None)
+    else:
+        if incr_resets_timeout(_cache()):
+            _cache().touch(key, None)
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return header.strip() == '*' or etag in (tag.strip() for tag in header.split(','))
+
+
+def prerendered(name, version='', vary=(), max_age=300, public=True, timeout=60 * 60):
+    """
+    Serve a handler's JSON from pre-rendered bytes
+
+    Args:
+        name: Cache namespace of the endpoint
+        version: String, or callable returning one, that changes with the data
+        vary: Query parameters that select the payload; URL kwargs always do.
+            Requests with any other query parameter are not cached
+        max_age: Seconds clients may reuse the response without revalidating
+        public: Whether shared caches may keep it (False for authenticated endpoints)
+        timeout: Seconds the rendered bytes stay in the cache
+    """
+    cache_control = f"{'public' if public else 'private'}, max-age={max_age}"
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if hasattr(arg, 'META'))
+            if not set(request.GET).issubset(vary):
+                return func(*args, **kwargs)
+            params = [(param, request.GET.get(param, '')) for param in vary]
+            params += sorted((key, str(value)) for key, value in kwargs.items())
+            current = version() if callable(version) else version
+            digest = hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+            key = f"prerendered:{name}:{current}:{digest}"
+
+            entry = _cache().get(key)
+            if entry is None:
+                response = func(*args, **kwargs)
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    return response
+                body = codec.dumps(response.data)
+                entry = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+                _cache().set(key, entry, timeout)
+
+            etag, body = entry
+            if _etag_matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(body, content_type='application/json')
+            response['ETag'] = etag
+            response['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+# metro/query_budget.py
+"""
+Query budgets: the most database queries a view may run per request.
+
+Views declare their budget with ``@max_queries(n)`` on the handler or
+action, or with a ``query_budget`` class attribute: an int for every
+handler, or a dict keyed by handler name for inherited viewset actions
+such as ``list`` and ``retrieve``.
+
+InstrumentationMiddleware already counts each request's queries and checks
+them against the budget of the view that served it. What happens on overrun
+depends on ``settings.QUERY_BUDGET_MODE``:
+
+- ``off``: nothing
+- ``warn``: log a warning and count it in ``query_budget_exceeded_total``
+- ``raise``: raise QueryBudgetExceeded, which is how tests enforce budgets
+
+The budget covers the whole request, authentication and session lookups
+included.
+"""
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def max_queries(limit):
+    """Declare the most queries a view handler may run per request"""
+    def decorator(func):
+        func.query_budget = limit
+        return func
+    return decorator
+
+
+def get_query_budget(view_func, method):
+    """Find the budget of the handler that will serve ``method``, or None"""
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+
+    # DRF sets .cls (and .actions for viewsets), Django sets .view_class
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return None
+
+    actions = getattr(view_func, 'actions', None) or {}
+    handler_name = actions.get(method.lower(), method.lower())
+    budget = getattr(getattr(view_class, handler_name, None), 'query_budget', None)
+    if budget is None:
+        budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(handler_name)
+    return budget
+
+
+def check_query_budget(view, budget, count):
+    """Apply QUERY_BUDGET_MODE to a request that ran ``count`` queries"""
+    if budget is None or count <= budget:
+        return
+
+    mode = getattr(settings, 'QUERY_BUDGET_MODE', 'off')
+    message = f"{view} ran {count} queries, its budget is {budget}"
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message)
+    if mode == 'warn':
+        metrics.inc('query_budget_exceeded_total', (view,))
+        logger.warning(message)
+
+
+@contextmanager
+def assert_max_queries(limit, using='default'):
+    """
+    Test helper: fail if the block runs more than ``limit`` queries
+
+    Unlike assertNumQueries the budget is an upper bound, so it does not
+    break when a view gets cheaper.
+    """
+    from django.test.utils import CaptureQueriesContext  # Test-only import
+
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) > limit:
+        queries = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1))
+        raise QueryBudgetExceeded(f"{len(context)} queries run, budget is {limit}:\n{queries}")
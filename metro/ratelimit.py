@@ -0,0 +1,115 @@
+# metro/ratelimit.py
+"""
+Sliding-window rate limiting on the ``throttles`` cache alias.
+
+Each key counts hits in fixed windows of ``duration`` seconds with an
+atomic ``incr``. The previous window's count is weighted by how much of it
+still overlaps the sliding window, so a burst at a window boundary can no
+longer get twice the limit through. A hit costs two cache round trips
+(incr, then get of the previous window), plus a decr when it is refused.
+
+incr is atomic on Redis and LocMem. Without Redis, prod keeps ``throttles``
+in the database cache, which (like the file cache) has no incr of its own:
+Django's fallback is a get followed by a set, so concurrent hits on one key
+can be undercounted there, and the set gives the key the default 300 second
+timeout. ``hit`` puts the window's expiry back after each count on such
+backends, so day and hour windows outlive five idle minutes.
+
+Used by the ``rate_limit`` view decorator and the DRF throttles in
+metro/throttling.py.
+"""
+import hashlib
+import time
+from collections import namedtuple
+from functools import wraps
+
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .cache import incr_resets_timeout
+
+API_KEY_HEADER = 'HTTP_X_SCANNER_API_KEY'
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'remaining', 'retry_after'])
+
+
+def client_identity(request):
+    """
+    Identify who a request counts against: the user, else the API key,
+    else the client IP (honouring DRF's NUM_PROXIES)
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    api_key = request.META.get(API_KEY_HEADER)
+    if api_key:
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+    return f"ip:{BaseThrottle().get_ident(request)}"
+
+
+def _keep_expiry(cache, key, timeout):
+    """Restore ``key``'s timeout where incr/decr is BaseCache's get and set"""
+    if incr_resets_timeout(cache):
+        cache.touch(key, timeout)
+
+
+def hit(key, limit, duration, cache_alias='throttles', now=None):
+    """
+    Count one request against ``limit`` per ``duration`` seconds
+
+    Returns:
+        RateLimitResult: Whether it is allowed, how many requests remain and
+        how many seconds to wait before retrying when refused
+    """
+    cache = caches[cache_alias]
+    now = time.time() if now is None else now
+    window = int(now // duration)
+    elapsed = now - window * duration
+    current_key = f"rl:{key}:{window}"
+
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # First hit in this window; add() loses gracefully to a concurrent first hit
+        cache.add(current_key, 0, duration * 2)
+        count = cache.incr(current_key)
+    _keep_expiry(cache, current_key, duration * 2)
+    previous = cache.get(f"rl:{key}:{window - 1}", 0)
+
+    weight = 1 - elapsed / duration
+    estimate = previous * weight + count
+    if estimate <= limit:
+        return RateLimitResult(True, int(limit - estimate), 0)
+
+    # Refused requests do not use up the window
+    try:
+        count = cache.decr(current_key)
+        _keep_expiry(cache, current_key, duration * 2)
+    except ValueError:
+        count -= 1
+    headroom = limit - count - 1
+    if headroom < 0 or not previous:
+        retry_after = duration - elapsed
+    else:
+        # Until the previous window's weight has decayed enough to fit one more
+        retry_after = max(0.0, duration * (1 - headroom / previous) - elapsed)
+    return RateLimitResult(False, 0, retry_after)
+
+
+def rate_limit(requests=5, duration=300):
+    """
+    Limit a view to ``requests`` per ``duration`` seconds per client and path
+
+    Works on function views and on view methods.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if hasattr(arg, 'META'))
+            result = hit(f"{request.path}:{client_identity(request)}", requests, duration)
+            if not result.allowed:
+                raise Throttled(wait=result.retry_after)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
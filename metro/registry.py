@@ -0,0 +1,143 @@
+# metro/registry.py
+"""
+Lazy registry for expensive, process-wide service singletons.
+
+Services such as MetroRouteService build their state from the database in
+``__init__``. Creating them as class attributes meant that work (and its
+queries) ran while URLs were imported, in every worker and every
+``manage.py`` call. Views now declare ``LazyService('<name>')`` instead and
+the instance is built on first use or by ``registry.warm_up()``.
+
+``warm_up_before_fork()`` does that in the gunicorn master (``--preload``), so
+workers start with the route graph and zone index already in memory and share
+those pages copy-on-write instead of each building their own.
+"""
+import gc
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVICES = {
+    'route_service': 'apps.routes.services.route_service.MetroRouteService',
+    'subscription_service': 'apps.tickets.services.subscription_service.SubscriptionService',
+    'ticket_service': 'apps.tickets.services.ticket_service.TicketService',
+}
+
+# Process-wide structures that manage their own refresh, loaded before fork
+WARM_UP_HOOKS = [
+    'apps.routes.services.network_snapshot.get_network_snapshot',
+    'apps.tickets.services.zone_index.get_zone_index',
+]
+
+
+class ServiceRegistry:
+    """Builds registered services once per process, on first use"""
+
+    def __init__(self, services=None):
+        self._factories = dict(services or {})
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        """Register a factory (callable or dotted import path) under a name"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name):
+        """Return the service instance, building it on first use"""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories[name]
+                if isinstance(factory, str):
+                    factory = import_string(factory)
+
+                started = time.perf_counter()
+                self._instances[name] = factory()
+                logger.info(f"Built service {name} in {(time.perf_counter() - started) * 1000:.1f}ms")
+            return self._instances[name]
+
+    def is_built(self, name):
+        return name in self._instances
+
+    def reset(self, name=None):
+        """Drop one or all instances so they are rebuilt on next use"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def warm_up(self, names=None):
+        """
+        Build services ahead of the first request
+
+        Returns:
+            dict: Build time in milliseconds per service name
+        """
+        timings = {}
+        for name in names or list(self._factories):
+            started = time.perf_counter()
+            self.get(name)
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        return timings
+
+
+class LazyService:
+    """
+    Class attribute that resolves to a registry service on instance access.
+
+    Accessed on the class itself it returns the descriptor, so class
+    introspection (e.g. DRF's extra action discovery) does not build anything.
+    """
+
+    def __init__(self, name, registry=None):
+        self.name = name
+        self._registry = registry
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return (self._registry or registry).get(self.name)
+
+
+registry = ServiceRegistry(DEFAULT_SERVICES)
+
+
+def warm_up_before_fork(names=None):
+    """
+    Load shared read-only state in the server process before workers fork
+
+    Failures are logged, not raised: workers then build lazily as before.
+
+    Returns:
+        dict: Build time in milliseconds per service name or hook path
+    """
+    timings = {}
+    try:
+        for path in WARM_UP_HOOKS:
+            started = time.perf_counter()
+            import_string(path)()
+            timings[path] = round((time.perf_counter() - started) * 1000, 1)
+        timings.update(registry.warm_up(names))
+    except Exception as e:
+        logger.warning(f"Pre-fork warm-up failed, services will build on first use: {str(e)}")
+    finally:
+        # Forked workers must not share the parent's database sockets
+        connections.close_all()
+
+    # Move everything loaded so far out of the collector's reach, so its
+    # passes do not touch (and copy) those pages in every worker
+    gc.freeze()
+    logger.info(f"Pre-fork warm-up: {timings}")
+    return timings
@@ -0,0 +1,20 @@
+# metro/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+from . import codec
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer writing through metro.codec (orjson when installed)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        ret = codec.dumps(data, indent=indent)
+
+        # Like JSONRenderer: keep the output safe to embed in <script> tags
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
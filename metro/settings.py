@@ -11,6 +11,7 @@
 """
 
 import os  # Operating system dependent functionality
+import tempfile  # Default location of runtime files
 
 # from decouple import config  # Configuration helper
 from datetime import datetime  # Date and time utilities
@@ -81,12 +82,14 @@
     "apps.dashboard.apps.DashboardConfig",  # Dashboard app
     "apps.analytics.apps.AnalyticsConfig",  # Analytics app
     "apps.authentication.apps.AuthenticationConfig",    # Authentication app
+    "apps.jobs.apps.JobsConfig",  # Background jobs
 ]
 
 # Middleware configuration
 MIDDLEWARE = [
+    "metro.middleware.InstrumentationMiddleware",  # Request latency and query metrics
     "django.middleware.security.SecurityMiddleware",  # Security middleware
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # WhiteNoise middleware
+    "metro.middleware.AsyncWhiteNoiseMiddleware",  # WhiteNoise static files, ASGI-capable
     "django.contrib.sessions.middleware.SessionMiddleware",  # Session middleware
     "django.middleware.common.CommonMiddleware",  # Common middleware
     "django.middleware.csrf.CsrfViewMiddleware",  # CSRF middleware
@@ -101,6 +104,19 @@
 ROOT_URLCONF = "metro.urls"  # Root URL configuration
 WSGI_APPLICATION = "metro.wsgi.application"  # WSGI application
 
+# Request metrics (exposed at /metrics/, see metro/metrics.py)
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "metro_metrics"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Bearer token for /metrics/; required in prod, where it is off without one
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", 200))  # Queries at least this slow are counted
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 0.1))  # Share of slow queries logged
+# What to do when a view exceeds its query budget: off, warn or raise (see metro/query_budget.py)
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off" if ENVIRONMENT == "prod" else "warn")
+
+# Memory-mapped route network snapshot shared by the workers on a node
+NETWORK_SNAPSHOT_PATH = os.getenv(
+    "NETWORK_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "metro_network.snapshot")
+)
+
 # Single API key for all scanners
 SCANNER_API_KEY = "egypt_metro_scanner_123456"  # API key for scanner devices
 
@@ -145,7 +161,12 @@
 os.makedirs(DASHBOARD_CONFIG['REPORT_STORAGE_PATH'], exist_ok=True)
 
 # Email Configuration (Production-focused with Mailgun)
-EMAIL_BACKEND = 'anymail.backends.mailgun.EmailBackend'
+# For local testing point it at an SMTP stub instead, e.g.
+# EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend EMAIL_PORT=1025
+# with `python -m smtpd -n -c DebuggingServer localhost:1025` printing the mails
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", 'anymail.backends.mailgun.EmailBackend')
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 25))
 ANYMAIL = {
     "MAILGUN_API_KEY": os.getenv("MAILGUN_API_KEY"),
     "MAILGUN_SENDER_DOMAIN": os.getenv("MAILGUN_DOMAIN"),
@@ -157,6 +178,23 @@
 EMAIL_TIMEOUT = 30
 EMAIL_SUBJECT_PREFIX = '[Metro] '
 
+# Background jobs (apps/jobs), run by `manage.py run_jobs`
+JOBS_EAGER = os.getenv("JOBS_EAGER", "False") == "True"  # Run jobs in-process at commit instead of queueing
+JOBS_LOCK_TIMEOUT = int(os.getenv("JOBS_LOCK_TIMEOUT", 600))  # Seconds before a running job counts as abandoned
+JOBS_DONE_RETENTION_DAYS = int(os.getenv("JOBS_DONE_RETENTION_DAYS", 7))  # Days purge_jobs keeps finished jobs
+JOBS_FAILED_RETENTION_DAYS = int(os.getenv("JOBS_FAILED_RETENTION_DAYS", 30))  # Failed jobs are kept longer for inspection
+
+# Monthly partitions of usage records and transactions (metro/partitioning.py), kept by `manage.py partitions`
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))  # Future months to create partitions for
+PARTITION_RETAIN_MONTHS = int(os.getenv("PARTITION_RETAIN_MONTHS", 24))  # Months kept in the database
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR")  # Persistent disk for archived months; unset refuses to archive
+
+# Columnar analytics snapshots (apps/analytics/snapshots.py), written on the web host by
+# `manage.py snapshot_analytics` or POST /api/analytics/snapshots/, which serves them
+# In prod it must be set to a persistent disk: the app directory is replaced on every deploy
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", None if ENVIRONMENT == "prod" else os.path.join(BASE_DIR, "snapshots"))
+SNAPSHOT_LAG = int(os.getenv("SNAPSHOT_LAG", 300))  # Seconds; newer rows wait for the next snapshot
+
 # Password Reset Settings
 DJANGO_REST_PASSWORDRESET_TOKEN_CONFIG = {
     "CLASS": "django_rest_passwordreset.tokens.RandomStringTokenGenerator",
@@ -286,7 +324,7 @@
 AUTH_USER_MODEL = "users.User"
 
 # Add ASGI application
-ASGI_APPLICATION = "config.asgi.application"
+ASGI_APPLICATION = "metro.asgi.application"
 
 # Add Channel Layers configuration
 CHANNEL_LAYERS = {
@@ -407,28 +445,31 @@
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",    # For JWT-based authentication
-        "rest_framework.authentication.TokenAuthentication",    # For token-based authentication
-        "rest_framework.authentication.SessionAuthentication",  # For session-based authentication
-        "rest_framework.authentication.BasicAuthentication",    # For basic authentication
+        "apps.users.authentication.CachedJWTAuthentication",    # JWT with a per-process user cache
+        "rest_framework.authentication.SessionAuthentication",  # For the browsable API and admin staff
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",  # Default to authenticated users
     ),
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",  # Default renderer
+        "metro.renderers.ORJSONRenderer",  # Default renderer (orjson when installed)
         "rest_framework.renderers.BrowsableAPIRenderer",  # Browsable API renderer
         # 'drf_yasg.renderers.SwaggerJSONRenderer',   # Swagger JSON renderer
         # 'drf_yasg.renderers.OpenAPIRenderer',   # OpenAPI renderer
     ],
+    "DEFAULT_PARSER_CLASSES": [
+        "metro.parsers.ORJSONParser",  # JSON bodies (orjson when installed)
+        "rest_framework.parsers.FormParser",  # Form bodies
+        "rest_framework.parsers.MultiPartParser",  # File uploads
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",    # Django filters backend
         "rest_framework.filters.SearchFilter",  # Search filter
         "rest_framework.filters.OrderingFilter",    # Ordering filter
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",   # User rate throttle
-        "rest_framework.throttling.AnonRateThrottle",   # Anonymous rate throttle
+        "metro.throttling.UserRateThrottle",   # User rate throttle
+        "metro.throttling.AnonRateThrottle",   # Anonymous rate throttle
     ],
     "DEFAULT_THROTTLE_RATES": {
         'anon': '100/day',  # Anonymous user rate limit (100 requests per day)
@@ -467,8 +508,12 @@
     "USER_ID_CLAIM": "user_id",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
+    "CHECK_REVOKE_TOKEN": True,  # Tokens carry a password hash claim and die on password change
 }
 
+# Seconds CachedJWTAuthentication reuses a user without querying the database
+AUTH_PRINCIPAL_TTL = int(os.getenv("AUTH_PRINCIPAL_TTL", 60))
+
 # Create logs directory if it doesn't exist
 LOGS_DIR = BASE_DIR / "logs"
 LOGS_DIR.mkdir(exist_ok=True)
@@ -519,45 +564,74 @@
 # ACCOUNT_EMAIL_VERIFICATION = 'none'  # for development
 # ACCOUNT_EMAIL_REQUIRED = True
 
-# Add Cache configuration
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-#         'LOCATION': f"redis://{os.getenv('REDIS_HOST', '127.0.0.1')}:6379/1",
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#             'PARSER_CLASS': 'redis.connection.HiredisParser',
-#             'SOCKET_TIMEOUT': 5,
-#             'SOCKET_CONNECT_TIMEOUT': 5,
-#             'CONNECTION_POOL_CLASS': 'redis.connection.BlockingConnectionPool',
-#             'CONNECTION_POOL_CLASS_KWARGS': {
-#                 'max_connections': 50,
-#                 'timeout': 20,
-#             },
-#             'MAX_CONNECTIONS': 1000,
-#             'RETRY_ON_TIMEOUT': True,
-#         },
-#     }
-# }
-
 # Cache time to live is 15 minutes
 CACHE_TTL = 60 * 15
 
 # Cache configuration
-if ENVIRONMENT == "prod":
-    CACHES = {
-        "default": {
-            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
-            "LOCATION": os.getenv("CACHE_LOCATION", "my_cache_table"),
+# One alias per kind of traffic, so each can be sized, flushed and moved on
+# its own. The shared tier is Redis when CACHE_URL is set (e.g.
+# redis://host:6379/1, aliases told apart by KEY_PREFIX). Without Redis in
+# prod, the aliases whose keys every service must see (see _cache_alias) use
+# the database cache table and the rest a file cache shared by the workers on
+# the host; elsewhere every alias is per-process memory, unless CACHE_BACKEND
+# names another backend for development (at CACHE_LOCATION, told apart by
+# KEY_PREFIX).
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "metro_cache"))
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "my_cache_table")  # Database cache table (manage.py createcachetable)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND")  # Development override of the per-process default
+
+
+def _cache_alias(name, shared=False):
+    """
+    ``shared`` aliases hold state that must agree across hosts and services:
+    wallet summaries, entitlements and idempotency keys the jobs worker
+    invalidates, throttle counters that would multiply per host, and gate
+    status every instance serving the gates must agree on.
+    """
+    if CACHE_URL:
+        return {
+            "BACKEND": "metro.cache.InstrumentedRedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": name,
+            "OPTIONS": {"socket_timeout": 5, "socket_connect_timeout": 5},
         }
-    }
-else:
-    CACHES = {
-        "default": {
-            "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
-            "LOCATION": os.getenv("CACHE_LOCATION", "unique-snowflake"),
+    if ENVIRONMENT == "prod" and shared:
+        return {
+            "BACKEND": "metro.cache.InstrumentedDatabaseCache",
+            "LOCATION": CACHE_LOCATION,
+            "KEY_PREFIX": name,
         }
-    }
+    if ENVIRONMENT == "prod":
+        return {
+            "BACKEND": "metro.cache.InstrumentedFileBasedCache",
+            "LOCATION": os.path.join(CACHE_DIR, name),
+            "KEY_PREFIX": name,
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        }
+    if CACHE_BACKEND:
+        return {"BACKEND": CACHE_BACKEND, "LOCATION": CACHE_LOCATION, "KEY_PREFIX": name}
+    return {"BACKEND": "metro.cache.InstrumentedLocMemCache", "LOCATION": name}
+
+
+CACHES = {
+    "default": _cache_alias("default", shared=True),  # Wallet summaries, entitlements, idempotency
+    "routes_shared": _cache_alias("routes"),
+    "routes": {  # Computed routes, read through a per-process L1
+        "BACKEND": "metro.cache.TieredCache",
+        "LOCATION": "routes_shared",
+        "OPTIONS": {"L1_TIMEOUT": 30},
+    },
+    "sessions": _cache_alias("sessions"),
+    "throttles": _cache_alias("throttles", shared=True),  # DRF throttles and rate_limit
+    "gates": _cache_alias("gates", shared=True),  # Hardware gate status
+    "reference_shared": _cache_alias("reference"),
+    "reference": {  # Pre-rendered reference payloads (metro/prerender.py)
+        "BACKEND": "metro.cache.TieredCache",
+        "LOCATION": "reference_shared",
+        "OPTIONS": {"L1_TIMEOUT": 30},
+    },
+}
 
 # Constance Settings
 CONSTANCE_BACKEND = "constance.backends.database.DatabaseBackend"
@@ -568,10 +642,10 @@
 
 # Session Configuration
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"  # Cached database session engine
-SESSION_CACHE_ALIAS = "default"  # Cache alias for sessions
+SESSION_CACHE_ALIAS = "sessions"  # Cache alias for sessions
 SESSION_COOKIE_AGE = 86400   # Session cookie age in seconds (24 hours)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # True for development, False for production
-SESSION_SAVE_EVERY_REQUEST = True  # Save session data on every request
+SESSION_SAVE_EVERY_REQUEST = False  # Only save sessions that changed
 
 HANDLER404 = "metro.views.custom_404"  # Custom 404 handler
 HANDLER500 = "metro.views.custom_500"  # Custom 500 handler
@@ -620,3 +694,7 @@
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"  # Default primary key field type
+
+# ticket_user_live_idx is a covering index (INCLUDE), which only PostgreSQL builds;
+# SQLite in development and tests creates it without the included column
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
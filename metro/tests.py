@@ -0,0 +1,500 @@
+# metro/tests.py
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import codec
+from .benchmarks import SCENARIOS, compare_results, run_scenario
+from .cache import InstrumentedLocMemCache, TieredCache
+from .metrics import metrics
+from .parsers import ORJSONParser
+from .ratelimit import client_identity, hit
+from .registry import LazyService, ServiceRegistry
+from .query_budget import QueryBudgetExceeded, check_query_budget, get_query_budget, max_queries
+from .renderers import ORJSONRenderer
+
+
+@override_settings(METRICS_DIR=None, METRICS_TOKEN=None)
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_request_metrics_exposed(self):
+        self.client.get("/health/")
+        response = self.client.get("/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{method="GET",view="health_check",status="2xx"} 1', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",view="health_check",le="1"} 1', body)
+
+    def test_cache_hits_and_misses_counted(self):
+        cache = InstrumentedLocMemCache("metrics-test", {})
+        cache.set("present", 1)
+        cache.get("present")
+        cache.get_many(["present", "absent"])
+
+        counters = dict((tuple(labels), value) for labels, value in metrics.state()['counters']['cache_requests_total'])
+        self.assertEqual(counters[("metrics-test", "hit")], 2)
+        self.assertEqual(counters[("metrics-test", "miss")], 1)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 401)
+        response = self.client.get("/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ENVIRONMENT="prod")
+    def test_disabled_in_prod_without_token(self):
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+
+    def test_files_of_exited_workers_are_pruned(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        exited = subprocess.Popen(["true"])
+        exited.wait()
+        for pid, count in ((os.getppid(), 2), (exited.pid, 5)):
+            with open(os.path.join(directory, f"{pid}.json"), "w") as f:
+                json.dump({'histograms': {}, 'counters': {'db_slow_queries_total': [[["home"], count]]}}, f)
+        abandoned = os.path.join(directory, ".metrics-abandoned")
+        open(abandoned, "w").close()
+        os.utime(abandoned, (0, 0))
+
+        with override_settings(METRICS_DIR=directory):
+            counters = metrics.collect()['counters']['db_slow_queries_total']
+        self.assertEqual(counters, [[["home"], 2]])
+        self.assertEqual(sorted(os.listdir(directory)), sorted([f"{os.getpid()}.json", f"{os.getppid()}.json"]))
+
+
+@override_settings(METRICS_DIR=None)
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.shared = caches['routes_shared']
+        self.tiered = TieredCache('routes_shared', {'OPTIONS': {'L1_TIMEOUT': 30}})
+        self.tiered.clear()
+
+    def test_reads_are_served_from_l1(self):
+        self.tiered.set('key', 'value')
+        self.shared.delete('key')  # As another worker would
+        self.assertEqual(self.tiered.get('key'), 'value')
+
+    def test_l2_hits_fill_l1(self):
+        self.shared.set('key', 'value')
+        self.assertEqual(self.tiered.get_many(['key', 'absent']), {'key': 'value'})
+        self.shared.delete('key')
+        self.assertEqual(self.tiered.get('key'), 'value')
+
+    def test_writes_reach_l2(self):
+        self.tiered.set('key', 'value')
+        self.tiered.add('counter', 1)
+        self.assertEqual(self.shared.get('key'), 'value')
+        self.assertEqual(self.tiered.incr('counter'), 2)
+        self.assertEqual(self.tiered.get('counter'), 2)
+
+        self.tiered.delete('key')
+        self.assertIsNone(self.tiered.get('key'))
+        self.assertIsNone(self.shared.get('key'))
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['throttles'].clear()
+
+    def test_limit_within_window(self):
+        results = [hit('test', 3, 60, now=1200.0) for _ in range(4)]
+        self.assertEqual([result.allowed for result in results], [True, True, True, False])
+        self.assertEqual(results[0].remaining, 2)
+        self.assertEqual(results[3].retry_after, 60)
+
+    def test_previous_window_still_counts(self):
+        for _ in range(3):
+            hit('test', 3, 60, now=1250.0)
+        # A quarter into the next window three quarters of the old hits still count
+        self.assertFalse(hit('test', 3, 60, now=1275.0).allowed)
+        self.assertTrue(hit('test', 3, 60, now=1300.0).allowed)
+
+    def test_refused_hits_do_not_use_up_the_window(self):
+        for _ in range(5):
+            hit('test', 2, 60, now=1200.0)
+        # Halfway into the next window: 2 accepted hits weigh 1, the 3 refused ones nothing
+        self.assertTrue(hit('test', 2, 60, now=1290.0).allowed)
+
+    def test_database_cache_keeps_the_window_expiry(self):
+        from django.core.management import call_command
+        from django.db import connection
+        from django.utils.dateparse import parse_datetime
+
+        database_cache = {'BACKEND': 'metro.cache.InstrumentedDatabaseCache', 'LOCATION': 'ratelimit_test_cache'}
+        with override_settings(CACHES={**settings.CACHES, 'db_throttles': database_cache}):
+            call_command('createcachetable', 'ratelimit_test_cache')
+            for _ in range(2):
+                hit('ip:1', 100, 86400, cache_alias='db_throttles')
+            self.assertFalse(hit('ip:1', 1, 86400, cache_alias='db_throttles').allowed)  # Refused: decr path
+
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT expires FROM ratelimit_test_cache")
+                expires = cursor.fetchone()[0]
+        if isinstance(expires, str):
+            expires = parse_datetime(expires)
+        if timezone.is_naive(expires):
+            expires = timezone.make_aware(expires, dt_timezone.utc)
+        self.assertGreater(expires, timezone.now() + timedelta(days=2) - timedelta(minutes=5))
+
+    def test_client_identity(self):
+        from django.contrib.auth.models import AnonymousUser
+        from django.test import RequestFactory
+
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+        self.assertEqual(client_identity(request), 'ip:10.0.0.1')
+
+        request.META['HTTP_X_SCANNER_API_KEY'] = 'scanner'
+        self.assertTrue(client_identity(request).startswith('key:'))
+
+        request.user = get_user_model()(pk=7)
+        self.assertEqual(client_identity(request), 'user:7')
+
+
+@override_settings(METRICS_DIR=None)
+class PrerenderedResponseTests(TestCase):
+    def setUp(self):
+        caches['reference'].clear()
+
+    def test_etag_and_not_modified(self):
+        from apps.tickets.constants.choices import TicketChoices
+
+        response = self.client.get('/api/tickets/types/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], TicketChoices.TICKET_TYPES)
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        cached = self.client.get('/api/tickets/types/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_network_edits_refresh_station_list(self):
+        from apps.stations.models import Station
+
+        station = Station.objects.create(name='Old Name', latitude=30.0, longitude=31.0)
+        self.assertEqual(self.client.get('/api/stations/list/').json()['results'][0]['name'], 'Old Name')
+
+        station.name = 'New Name'
+        with self.captureOnCommitCallbacks(execute=True):
+            station.save()
+        self.assertEqual(self.client.get('/api/stations/list/').json()['results'][0]['name'], 'New Name')
+
+    def test_lost_version_does_not_bring_back_old_payloads(self):
+        from apps.stations.models import Station
+
+        station = Station.objects.create(name='Old Name', latitude=30.0, longitude=31.0)
+        old = self.client.get('/api/stations/list/')
+        station.name = 'New Name'
+        with self.captureOnCommitCallbacks(execute=True):
+            station.save()
+        self.client.get('/api/stations/list/')
+
+        # Evicted, or expired after a non-native incr
+        caches['reference'].delete('prerendered_version:network')
+        response = self.client.get('/api/stations/list/')
+        self.assertEqual(response.json()['results'][0]['name'], 'New Name')
+        self.assertNotEqual(response['ETag'], old['ETag'])
+
+    def test_unknown_parameters_skip_the_cache(self):
+        from apps.stations.models import Station
+
+        Station.objects.create(name='Attaba', latitude=30.0, longitude=31.0)
+        Station.objects.create(name='Bab El Shaaria', latitude=30.1, longitude=31.1)
+
+        def names(query):
+            return [s['name'] for s in self.client.get(f'/api/stations/list/{query}').json()['results']]
+
+        self.assertEqual(names('?ordering=name'), ['Attaba', 'Bab El Shaaria'])
+        self.assertEqual(names('?ordering=-name'), ['Bab El Shaaria', 'Attaba'])
+        response = self.client.get('/api/stations/list/?ordering=-name&unknown=1')
+        self.assertNotIn('ETag', response)
+        self.assertEqual([s['name'] for s in response.json()['results']], ['Bab El Shaaria', 'Attaba'])
+
+
+class CodecTests(TestCase):
+    payload = {
+        'amount': Decimal('12.50'),
+        'created_at': datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'station': 'السادات',
+        'stops': [1, 2, 3],
+    }
+
+    def test_renderer_matches_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_indented_output_still_decodes(self):
+        rendered = ORJSONRenderer().render(self.payload, 'application/json; indent=2')
+        self.assertIn(b'\n', rendered)
+        self.assertEqual(codec.loads(rendered)['amount'], 12.5)
+
+    def test_line_separators_are_escaped(self):
+        self.assertEqual(ORJSONRenderer().render({'text': 'a\u2028b'}), b'{"text":"a\\u2028b"}')
+
+    def test_parser_round_trip(self):
+        body = ORJSONRenderer().render(self.payload)
+        parsed = ORJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parsed['created_at'], '2025-01-02T03:04:05.123456Z')
+        self.assertEqual(parsed['id'], '12345678-1234-5678-1234-567812345678')
+
+    def test_parser_rejects_invalid_json(self):
+        from rest_framework.exceptions import ParseError
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"broken":'))
+
+
+class BenchmarkTests(TestCase):
+    def test_run_scenario_counts_queries_and_errors(self):
+        calls = []
+
+        def flaky(data):
+            calls.append(1)
+            get_user_model().objects.count()
+            if len(calls) % 2:
+                raise ValueError("odd call")
+
+        SCENARIOS["test_flaky"] = flaky
+        try:
+            result = run_scenario("test_flaky", data=None, iterations=4, warmup=1)
+        finally:
+            del SCENARIOS["test_flaky"]
+
+        self.assertEqual(result["iterations"], 4)
+        self.assertEqual(result["queries_per_op"], 1)
+        self.assertEqual(result["errors"], 2)
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {"scenarios": {"fast": {"median_ms": 10.0}, "slow": {"median_ms": 10.0}}}
+        current = {"scenarios": {"fast": {"median_ms": 10.5}, "slow": {"median_ms": 12.0}, "new": {"median_ms": 1.0}}}
+
+        rows = {row[0]: row for row in compare_results(baseline, current, threshold=0.10)}
+        self.assertFalse(rows["fast"][4])
+        self.assertTrue(rows["slow"][4])
+        self.assertNotIn("new", rows)
+
+    def test_command_isolates_caches_and_shared_files(self):
+        from apps.stations.management.commands.benchmark import Command
+
+        scratch = Command._scratch_settings("/scratch")
+
+        self.assertEqual(set(scratch["CACHES"]), set(settings.CACHES))
+        for alias, config in scratch["CACHES"].items():
+            if config["BACKEND"] != "metro.cache.TieredCache":
+                self.assertEqual(config["BACKEND"], "metro.cache.InstrumentedLocMemCache")
+                self.assertNotEqual(config["LOCATION"], settings.CACHES[alias].get("LOCATION"))
+        self.assertEqual(scratch["NETWORK_SNAPSHOT_PATH"], "/scratch/network.snapshot")
+        self.assertEqual(scratch["METRICS_DIR"], "/scratch/metrics")
+
+
+class QueryBudgetTests(TestCase):
+    def test_budget_lookup(self):
+        class View:
+            query_budget = {'list': 4}
+
+            @max_queries(2)
+            def types(self):
+                pass
+
+        def view_func():
+            pass
+        view_func.cls = View
+        view_func.actions = {'get': 'list'}
+        self.assertEqual(get_query_budget(view_func, 'GET'), 4)
+        self.assertIsNone(get_query_budget(view_func, 'POST'))
+
+        view_func.actions = {'get': 'types'}
+        self.assertEqual(get_query_budget(view_func, 'GET'), 2)
+
+    @override_settings(QUERY_BUDGET_MODE='raise')
+    def test_raise_mode(self):
+        check_query_budget('view', 3, 3)
+        with self.assertRaises(QueryBudgetExceeded):
+            check_query_budget('view', 3, 4)
+
+    @override_settings(QUERY_BUDGET_MODE='warn', METRICS_DIR=None)
+    def test_warn_mode_counts_overruns(self):
+        metrics.reset()
+        with self.assertLogs('metro.query_budget', level='WARNING'):
+            check_query_budget('view', 3, 4)
+        counters = dict((tuple(labels), value) for labels, value in metrics.state()['counters']['query_budget_exceeded_total'])
+        self.assertEqual(counters[('view',)], 1)
+
+
+@override_settings(QUERY_BUDGET_MODE='raise', METRICS_DIR=None)
+class EndpointQueryBudgetTests(TestCase):
+    """Hot endpoints stay within their declared budgets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from apps.stations.management.commands.populate_metro_data import Command as MetroDataCommand
+        from apps.stations.models import Line, Station
+        from apps.tickets.models import Ticket
+        from apps.wallet.services.wallet_service import WalletService
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            MetroDataCommand().handle()
+        cls.sadat = Station.objects.get(name='Sadat')
+        cls.helwan = Station.objects.get(name='Helwan')
+        cls.first_line = Line.objects.get(name='First Line')
+
+        cls.user = get_user_model().objects.create_user(email='budget@example.com', username='budget', password='x')
+        WalletService.get_or_create_wallet(cls.user)
+        WalletService.add_funds(cls.user, 100)
+        for _ in range(3):
+            Ticket.objects.create(user=cls.user, ticket_type='BASIC', valid_until=timezone.now() + timedelta(days=1))
+
+    def setUp(self):
+        for backend in caches.all():
+            backend.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_train(self, number):
+        from apps.trains.models import Schedule, Train
+        train = Train.objects.create(
+            train_number=number, line=self.first_line, direction='HELWAN', current_station=self.sadat, has_ac=True
+        )
+        Schedule.objects.create(
+            train=train,
+            station=self.sadat,
+            arrival_time=timezone.now() + timedelta(minutes=5),
+            departure_time=timezone.now() + timedelta(minutes=7),
+            status='ON_TIME',
+        )
+
+    def test_read_endpoints(self):
+        urls = [
+            '/api/stations/list/',
+            '/api/stations/nearest/?latitude=30.04&longitude=31.23',
+            f'/api/stations/trip/{self.sadat.id}/{self.helwan.id}/',
+            '/api/routes/find/?start=Sadat&end=Helwan',
+            '/api/tickets/',
+            '/api/tickets/types/',
+            '/api/tickets/dashboard/',
+            '/api/tickets/subscriptions/',
+            '/api/wallet/wallet/my_wallet/',
+            '/api/wallet/wallet/summary/',
+            '/api/wallet/transactions/',
+            '/api/wallet/transactions/history/',
+            '/api/trains/',
+            f'/api/analytics/line/?line_id={self.first_line.id}',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_schedules_cost_does_not_grow_with_trains(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        data = {'start_station': self.sadat.id, 'end_station': self.helwan.id}
+        counts = []
+        for number in ('B1', 'B2', 'B3'):
+            self.add_train(number)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post('/api/trains/get-schedules/', data, format='json')
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(context))
+        self.assertEqual(len(set(counts)), 1, counts)
+
+
+# Run in a fresh interpreter: the test process has long since imported the URLconf
+IMPORT_URLCONF = """
+import json
+
+import django
+from django.db.backends.signals import connection_created
+
+opened = []
+connection_created.connect(lambda connection, **kwargs: opened.append(connection.alias))
+django.setup()
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+
+from metro.registry import DEFAULT_SERVICES, registry
+print(json.dumps({
+    "connections": opened,
+    "built": [name for name in DEFAULT_SERVICES if registry.is_built(name)],
+}))
+"""
+
+
+class ServiceRegistryTests(TestCase):
+    def setUp(self):
+        self.built = []
+
+        def factory():
+            self.built.append(object())
+            return self.built[-1]
+
+        self.registry = ServiceRegistry({"svc": factory})
+
+        class View:
+            svc = LazyService("svc", registry=self.registry)
+
+        self.view_class = View
+
+    def test_service_built_once_on_first_use(self):
+        self.assertFalse(self.registry.is_built("svc"))
+
+        first, second = self.view_class(), self.view_class()
+
+        self.assertIs(first.svc, second.svc)
+        self.assertIs(first.svc, self.built[0])
+        self.assertEqual(len(self.built), 1)
+        self.assertTrue(self.registry.is_built("svc"))
+
+    def test_class_access_returns_descriptor(self):
+        self.assertIsInstance(self.view_class.svc, LazyService)
+        self.assertEqual(self.built, [])
+
+    def test_reset_rebuilds_on_next_use(self):
+        view = self.view_class()
+        old = view.svc
+
+        self.registry.reset("svc")
+
+        self.assertFalse(self.registry.is_built("svc"))
+        self.assertIsNot(view.svc, old)
+        self.assertEqual(len(self.built), 2)
+
+    def test_register_replaces_built_instance(self):
+        view = self.view_class()
+        view.svc
+        replacement = object()
+
+        self.registry.register("svc", lambda: replacement)
+
+        self.assertIs(view.svc, replacement)
+
+    def test_importing_urls_runs_no_queries(self):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_URLCONF],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True,
+        )
+        output = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.assertEqual(output["connections"], [])
+        self.assertEqual(output["built"], [])
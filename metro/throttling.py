@@ -0,0 +1,50 @@
+# metro/throttling.py
+"""
+DRF throttles backed by the sliding-window limiter in metro/ratelimit.py
+
+Rates and scopes come from DEFAULT_THROTTLE_RATES as with DRF's own
+throttles, but instead of a cached list of timestamps read and rewritten on
+every request they use the limiter's atomic counters on the ``throttles``
+cache alias. Clients without a user are told apart by API key before IP.
+"""
+from rest_framework import throttling
+
+from .ratelimit import client_identity, hit
+
+
+class SlidingWindowMixin:
+    result = None
+
+    def get_ident(self, request):
+        return client_identity(request)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.result = hit(self.key, self.num_requests, self.duration)
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after if self.result else None
+
+
+class UserRateThrottle(SlidingWindowMixin, throttling.UserRateThrottle):
+    pass
+
+
+class AnonRateThrottle(SlidingWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(SlidingWindowMixin, throttling.ScopedRateThrottle):
+    def allow_request(self, request, view):
+        # DRF resolves the view's scope in its allow_request, which the mixin replaces
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
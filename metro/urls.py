@@ -32,7 +32,7 @@
 
 from metro import settings
 
-from .views import check_dependencies, health_check, home
+from .views import check_dependencies, health_check, home, metrics_view
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -89,6 +89,7 @@
     path("api/auth/", include("apps.authentication.urls")),  # Authentication
     # Miscellaneous
     path("health/", health_check, name="health_check"),  # Health check
+    path("metrics/", metrics_view, name="metrics"),  # Prometheus metrics
     path('dependencies/', check_dependencies, name='check_dependencies'),  # Check dependencies
     # Documentation
     path("swagger.json", schema_view.without_ui(cache_timeout=0), name="schema-json"),  # Swagger JSON
@@ -6,14 +6,19 @@
 
 import platform
 import sys
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
+from django.conf import settings
 from django.db import connection
 from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.csrf import csrf_exempt
 from django.template.loader import render_to_string
 
+from .metrics import metrics, render_prometheus
+
 logger = logging.getLogger(__name__)
 
 # API Configuration
@@ -89,8 +94,9 @@ class APIRoutes:
     """Class to manage API routes and documentation"""
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def get_routes() -> Dict[str, Dict[str, Any]]:
-        """Get all API routes with metadata"""
+        """Get all API routes with metadata, built once per process (do not mutate)"""
         return {
             "authentication": {
                 "title": "Authentication",
@@ -441,6 +447,26 @@ def health_check(request):
         }, status=500)
 
 
+def metrics_view(request):
+    """
+    Prometheus metrics for every worker on this node
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` when METRICS_TOKEN is set.
+    In production the endpoint is disabled until a token is set.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token and settings.ENVIRONMENT == "prod":
+        logger.warning("Refusing /metrics/ request: METRICS_TOKEN is not set")
+        return HttpResponse(status=403)
+    if token and not constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+
+    return HttpResponse(
+        render_prometheus(metrics.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 def check_dependencies(request):
     """
     Comprehensive dependency check
@@ -14,3 +14,10 @@
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "metro.settings")
 
 application = get_wsgi_application()
+
+# With gunicorn --preload this module is imported once in the master, so the
+# shared network state is loaded before the workers fork (see metro/registry.py)
+if os.environ.get("WARM_UP_ON_START", "True") == "True":
+    from metro.registry import warm_up_before_fork
+
+    warm_up_before_fork()